@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Booking lifecycle script.
+Moves confirmed bookings to ongoing and completed as their dates pass.
+Run it from cron when BOOKING_LIFECYCLE_INTERVAL is 0.
+"""
+from app.services.lifecycle import booking_lifecycle
+
+
+def advance_bookings():
+    """Run one lifecycle pass."""
+    counts = booking_lifecycle.run_once()
+    print(f"Bookings started: {counts['started']}, completed: {counts['completed']}")
+
+
+if __name__ == "__main__":
+    advance_bookings()
@@ -0,0 +1,34 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 3f9a5be27c41
+Revises: d6e2c1cf324a
+Create Date: 2025-11-04 09:31:17.842960
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a5be27c41'
+down_revision: Union[str, None] = 'd6e2c1cf324a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['bookings', 'payments', 'notifications', 'customers', 'audit_logs']
+
+
+def upgrade() -> None:
+    # Composite indexes backing (created_at, id) keyset pagination per tenant
+    for table in TABLES:
+        op.create_index(
+            f'ix_{table}_account_id_created_at_id', table,
+            ['account_id', 'created_at', 'id'], unique=False
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(f'ix_{table}_account_id_created_at_id', table_name=table)
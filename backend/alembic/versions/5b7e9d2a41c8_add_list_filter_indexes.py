@@ -0,0 +1,75 @@
+"""add_list_filter_indexes
+
+Revision ID: 5b7e9d2a41c8
+Revises: a4c1e7f09b62
+Create Date: 2025-11-06 11:24:08.391552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e9d2a41c8'
+down_revision: Union[str, None] = 'a4c1e7f09b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Foreign keys usable in eq/in filters
+FOREIGN_KEYS = [
+    ('bookings', 'template_id'),
+    ('bookings', 'customer_id'),
+    ('bookings', 'tour_rep_id'),
+    ('bookings', 'car_id'),
+    ('bookings', 'driver_id'),
+    ('payments', 'booking_id'),
+    ('notifications', 'booking_id'),
+]
+
+# Columns sorted and range-filtered within a tenant
+SORT_KEYS = [
+    ('bookings', 'start_date'),
+    ('payments', 'payment_date'),
+    ('customers', 'full_name'),
+]
+
+# Columns matched by case-insensitive prefix filters
+PREFIX_COLUMNS = [
+    ('bookings', 'booking_number'),
+    ('customers', 'full_name'),
+    ('customers', 'email'),
+    ('customers', 'phone'),
+    ('cars', 'registration_number'),
+    ('drivers', 'full_name'),
+    ('tour_reps', 'full_name'),
+]
+
+
+def upgrade() -> None:
+    for table, column in FOREIGN_KEYS:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+    for table, column in SORT_KEYS:
+        op.create_index(
+            f'ix_{table}_account_id_{column}_id', table,
+            ['account_id', column, 'id'], unique=False
+        )
+
+    for table, column in PREFIX_COLUMNS:
+        op.execute(
+            f"CREATE INDEX ix_{table}_{column}_prefix ON {table} "
+            f"(lower({column}) text_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    for table, column in reversed(PREFIX_COLUMNS):
+        op.drop_index(f'ix_{table}_{column}_prefix', table_name=table)
+
+    for table, column in reversed(SORT_KEYS):
+        op.drop_index(f'ix_{table}_account_id_{column}_id', table_name=table)
+
+    for table, column in reversed(FOREIGN_KEYS):
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
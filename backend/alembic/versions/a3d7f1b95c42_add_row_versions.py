@@ -0,0 +1,31 @@
+"""add_row_versions
+
+Revision ID: a3d7f1b95c42
+Revises: f8c2e4a6b913
+Create Date: 2025-11-14 09:42:18.215734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d7f1b95c42'
+down_revision: Union[str, None] = 'f8c2e4a6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ('bookings', 'payments', 'cars', 'drivers', 'tour_reps')
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog, so existing rows are not rewritten
+    for table in VERSIONED_TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.drop_column(table, 'version')
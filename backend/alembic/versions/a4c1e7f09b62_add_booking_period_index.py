@@ -0,0 +1,51 @@
+"""add_booking_period_index
+
+Revision ID: a4c1e7f09b62
+Revises: 3f9a5be27c41
+Create Date: 2025-11-05 14:02:55.117384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c1e7f09b62'
+down_revision: Union[str, None] = '3f9a5be27c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Bookings listed when some end before they start
+REPORTED_BOOKINGS = 20
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    # tstzrange() rejects a period that ends before it starts, so such
+    # bookings must be corrected before the period can be indexed
+    inverted = connection.execute(sa.text(
+        "SELECT account_id, booking_number FROM bookings "
+        "WHERE end_date < start_date ORDER BY account_id, id"
+    )).all()
+    if inverted:
+        listed = ", ".join(f"{number} ({account})" for account, number in inverted[:REPORTED_BOOKINGS])
+        raise RuntimeError(
+            f"{len(inverted)} bookings end before they start: {listed}. "
+            f"Correct their start_date or end_date before running this migration."
+        )
+    op.create_check_constraint('ck_bookings_end_date_after_start_date', 'bookings', 'end_date >= start_date')
+
+    # GiST index over the booking period for calendar overlap queries
+    op.execute(
+        "CREATE INDEX ix_bookings_period ON bookings "
+        "USING gist (tstzrange(start_date, end_date, '[)'))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_period', table_name='bookings')
+    op.drop_constraint('ck_bookings_end_date_after_start_date', 'bookings', type_='check')
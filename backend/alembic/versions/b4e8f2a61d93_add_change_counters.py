@@ -0,0 +1,86 @@
+"""add_change_counters
+
+Revision ID: b4e8f2a61d93
+Revises: d93b5a7e2c16
+Create Date: 2025-11-18 10:12:40.517903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8f2a61d93'
+down_revision: Union[str, None] = 'd93b5a7e2c16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTED_TABLES = ['bookings', 'templates', 'customers', 'tour_reps', 'cars', 'drivers']
+
+# Tables whose (account_id, updated_at) index only served the old watermark
+WATERMARK_INDEX_TABLES = ['bookings', 'customers']
+
+# Trigger suffix, event and transition tables
+TRIGGERS = [
+    ('insert', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('update', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('delete', 'DELETE', 'OLD TABLE AS old_rows'),
+]
+
+
+def counter_bump(rows: str) -> str:
+    return f"""
+        INSERT INTO change_counters AS c (account_id, table_name, changes)
+        SELECT DISTINCT account_id, TG_TABLE_NAME, 1 FROM {rows}
+        ORDER BY account_id
+        ON CONFLICT (account_id, table_name) DO UPDATE SET changes = c.changes + 1
+    """
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_counters',
+        sa.Column('account_id', sa.String(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('changes', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('account_id', 'table_name')
+    )
+
+    op.execute(f"""
+        CREATE FUNCTION change_counters_bump() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {counter_bump("new_rows")};
+            ELSIF TG_OP = 'DELETE' THEN
+                {counter_bump("old_rows")};
+            ELSE
+                {counter_bump("(SELECT account_id FROM old_rows UNION SELECT account_id FROM new_rows) AS changed")};
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+
+    # Tenants start at 0; list ETags issued under the old watermark simply miss once
+    for table in COUNTED_TABLES:
+        for suffix, event, transitions in TRIGGERS:
+            op.execute(
+                f"CREATE TRIGGER {table}_changes_{suffix} AFTER {event} ON {table} "
+                f"REFERENCING {transitions} FOR EACH STATEMENT EXECUTE FUNCTION change_counters_bump()"
+            )
+
+    for table in WATERMARK_INDEX_TABLES:
+        op.drop_index(f'ix_{table}_account_id_updated_at', table_name=table)
+
+
+def downgrade() -> None:
+    for table in reversed(WATERMARK_INDEX_TABLES):
+        op.create_index(f'ix_{table}_account_id_updated_at', table, ['account_id', 'updated_at'], unique=False)
+
+    for table in reversed(COUNTED_TABLES):
+        for suffix, _, _ in TRIGGERS:
+            op.execute(f"DROP TRIGGER {table}_changes_{suffix} ON {table}")
+    op.execute("DROP FUNCTION change_counters_bump()")
+    op.drop_table('change_counters')
@@ -0,0 +1,80 @@
+"""add_booking_field_data
+
+Revision ID: b83f2c6d1a95
+Revises: f1c6a8e2b357
+Create Date: 2025-11-11 14:06:52.731904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83f2c6d1a95'
+down_revision: Union[str, None] = 'f1c6a8e2b357'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Bookings converted per UPDATE; each batch commits on its own
+BATCH_SIZE = 1000
+
+# Field value rows of a batch of bookings as {field_name: {id, value, created_at}}.
+# Rows are aggregated in id order, so a name stored twice keeps its latest value.
+BACKFILL = sa.text("""
+    WITH batch AS (
+        SELECT id FROM bookings
+        WHERE field_data IS NULL AND id > :last_id
+        ORDER BY id
+        LIMIT :batch_size
+    )
+    UPDATE bookings SET field_data = coalesce((
+        SELECT jsonb_object_agg(entries.field_name, entries.entry)
+        FROM (
+            SELECT field_name,
+                   jsonb_build_object('id', id, 'value', field_value, 'created_at', created_at) AS entry
+            FROM booking_field_values
+            WHERE booking_id = bookings.id
+            ORDER BY id
+        ) AS entries
+    ), '{}'::jsonb)
+    FROM batch
+    WHERE bookings.id = batch.id
+    RETURNING bookings.id
+""")
+
+
+def upgrade() -> None:
+    op.add_column('bookings', sa.Column('field_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_index(
+        'ix_bookings_field_data', 'bookings', ['field_data'],
+        unique=False, postgresql_using='gin', postgresql_ops={'field_data': 'jsonb_path_ops'}
+    )
+
+    # Backfill outside the migration transaction, so each batch only locks
+    # its own bookings briefly and a large table is not rewritten at once.
+    # The rows are kept: in "rows" mode the first write of a booking patches
+    # them and drops its document again.
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        last_id = 0
+        while True:
+            ids = connection.execute(BACKFILL, {"last_id": last_id, "batch_size": BATCH_SIZE}).scalars().all()
+            if not ids:
+                break
+            last_id = max(ids)
+
+
+def downgrade() -> None:
+    # Bookings written in jsonb mode only have their document; give them rows back
+    op.execute("""
+        INSERT INTO booking_field_values (booking_id, field_name, field_value, created_at)
+        SELECT bookings.id, entry.key, entry.value ->> 'value', (entry.value ->> 'created_at')::timestamptz
+        FROM bookings, jsonb_each(bookings.field_data) AS entry
+        WHERE bookings.field_data IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM booking_field_values WHERE booking_id = bookings.id)
+    """)
+    op.drop_index('ix_bookings_field_data', table_name='bookings')
+    op.drop_column('bookings', 'field_data')
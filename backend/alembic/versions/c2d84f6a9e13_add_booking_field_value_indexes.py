@@ -0,0 +1,43 @@
+"""add_booking_field_value_indexes
+
+Revision ID: c2d84f6a9e13
+Revises: 5b7e9d2a41c8
+Create Date: 2025-11-07 09:48:36.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d84f6a9e13'
+down_revision: Union[str, None] = '5b7e9d2a41c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (field_name, value) expression indexes for filtering bookings by
+    # dynamic field values: as text, as numbers and as ISO dates
+    op.execute(
+        "CREATE INDEX ix_booking_field_values_name_text ON booking_field_values "
+        "(field_name, lower(left(field_value, 200)) text_pattern_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_booking_field_values_name_number ON booking_field_values "
+        "(field_name, (CASE WHEN field_value ~ '^-?[0-9]+(\\.[0-9]+)?$' "
+        "THEN CAST(field_value AS NUMERIC) END))"
+    )
+    op.execute(
+        "CREATE INDEX ix_booking_field_values_name_moment ON booking_field_values "
+        "(field_name, (CASE WHEN field_value ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}' "
+        "THEN replace(left(field_value, 19), ' ', 'T') END))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_booking_field_values_name_moment', table_name='booking_field_values')
+    op.drop_index('ix_booking_field_values_name_number', table_name='booking_field_values')
+    op.drop_index('ix_booking_field_values_name_text', table_name='booking_field_values')
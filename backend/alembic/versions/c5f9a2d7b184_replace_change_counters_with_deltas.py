@@ -0,0 +1,119 @@
+"""replace_change_counters_with_deltas
+
+Revision ID: c5f9a2d7b184
+Revises: b4e8f2a61d93
+Create Date: 2025-11-19 09:27:14.803516
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f9a2d7b184'
+down_revision: Union[str, None] = 'b4e8f2a61d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTED_TABLES = ['bookings', 'templates', 'customers', 'tour_reps', 'cars', 'drivers']
+
+# Trigger suffix, event and transition tables
+TRIGGERS = [
+    ('insert', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('update', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('delete', 'DELETE', 'OLD TABLE AS old_rows'),
+]
+
+
+def delta_append(rows: str) -> str:
+    return f"""
+        INSERT INTO change_deltas (account_id, table_name)
+        SELECT DISTINCT account_id, TG_TABLE_NAME FROM {rows}
+    """
+
+
+def counter_bump(rows: str) -> str:
+    return f"""
+        INSERT INTO change_counters AS c (account_id, table_name, changes)
+        SELECT DISTINCT account_id, TG_TABLE_NAME, 1 FROM {rows}
+        ORDER BY account_id
+        ON CONFLICT (account_id, table_name) DO UPDATE SET changes = c.changes + 1
+    """
+
+
+def create_function(name: str, statement) -> None:
+    op.execute(f"""
+        CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {statement("new_rows")};
+            ELSIF TG_OP = 'DELETE' THEN
+                {statement("old_rows")};
+            ELSE
+                {statement("(SELECT account_id FROM old_rows UNION SELECT account_id FROM new_rows) AS changed")};
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+
+
+def replace_triggers(function: str) -> None:
+    for table in COUNTED_TABLES:
+        for suffix, event, transitions in TRIGGERS:
+            op.execute(f"DROP TRIGGER {table}_changes_{suffix} ON {table}")
+            op.execute(
+                f"CREATE TRIGGER {table}_changes_{suffix} AFTER {event} ON {table} "
+                f"REFERENCING {transitions} FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+            )
+
+
+def upgrade() -> None:
+    # Writers bumped one counter row per tenant and table and held its
+    # lock until commit; deltas are only ever inserted
+    op.create_table(
+        'change_deltas',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('account_id', sa.String(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('changes', sa.BigInteger(), server_default='1', nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_change_deltas_account_id_table_name', 'change_deltas', ['account_id', 'table_name'],
+        unique=False, postgresql_include=['changes']
+    )
+
+    # The counters become the first deltas, so list ETags stay valid
+    op.execute("""
+        INSERT INTO change_deltas (account_id, table_name, changes)
+        SELECT account_id, table_name, changes FROM change_counters
+    """)
+
+    create_function('change_deltas_append', delta_append)
+    replace_triggers('change_deltas_append')
+    op.execute("DROP FUNCTION change_counters_bump()")
+    op.drop_table('change_counters')
+
+
+def downgrade() -> None:
+    op.create_table(
+        'change_counters',
+        sa.Column('account_id', sa.String(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('changes', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('account_id', 'table_name')
+    )
+    op.execute("""
+        INSERT INTO change_counters (account_id, table_name, changes)
+        SELECT account_id, table_name, sum(changes) FROM change_deltas
+        GROUP BY account_id, table_name
+    """)
+
+    create_function('change_counters_bump', counter_bump)
+    replace_triggers('change_counters_bump')
+    op.execute("DROP FUNCTION change_deltas_append()")
+    op.drop_index('ix_change_deltas_account_id_table_name', table_name='change_deltas')
+    op.drop_table('change_deltas')
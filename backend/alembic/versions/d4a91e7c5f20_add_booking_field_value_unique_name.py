@@ -0,0 +1,39 @@
+"""add_booking_field_value_unique_name
+
+Revision ID: d4a91e7c5f20
+Revises: b83f2c6d1a95
+Create Date: 2025-11-12 09:17:44.205318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a91e7c5f20'
+down_revision: Union[str, None] = 'b83f2c6d1a95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A field stored twice for a booking keeps its latest value
+    op.execute("""
+        DELETE FROM booking_field_values older
+        USING booking_field_values newer
+        WHERE older.booking_id = newer.booking_id
+          AND older.field_name = newer.field_name
+          AND older.id < newer.id
+    """)
+    op.create_unique_constraint(
+        'uq_booking_field_values_booking_id_field_name', 'booking_field_values', ['booking_id', 'field_name']
+    )
+    # Lookups by booking are served by the leading column of the unique index
+    op.drop_index('ix_booking_field_values_booking_id', table_name='booking_field_values')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_booking_field_values_booking_id'), 'booking_field_values', ['booking_id'], unique=False)
+    op.drop_constraint('uq_booking_field_values_booking_id_field_name', 'booking_field_values', type_='unique')
@@ -0,0 +1,31 @@
+"""add_booking_relation_indexes
+
+Revision ID: d6e2c1cf324a
+Revises: 7186d14bc0af
+Create Date: 2025-11-03 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6e2c1cf324a'
+down_revision: Union[str, None] = '7186d14bc0af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Foreign keys used by eager loading of booking collections
+    op.create_index(op.f('ix_booking_field_values_booking_id'), 'booking_field_values', ['booking_id'], unique=False)
+    op.create_index(op.f('ix_booking_photos_booking_id'), 'booking_photos', ['booking_id'], unique=False)
+    op.create_index(op.f('ix_template_fields_template_id'), 'template_fields', ['template_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_template_fields_template_id'), table_name='template_fields')
+    op.drop_index(op.f('ix_booking_photos_booking_id'), table_name='booking_photos')
+    op.drop_index(op.f('ix_booking_field_values_booking_id'), table_name='booking_field_values')
@@ -0,0 +1,106 @@
+"""add_booking_daily_rollups
+
+Revision ID: d93b5a7e2c16
+Revises: c62e9d4f8a17
+Create Date: 2025-11-17 11:06:52.384120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93b5a7e2c16'
+down_revision: Union[str, None] = 'c62e9d4f8a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_KEY = "account_id, day, status, template_id, tour_rep_id, car_id, driver_id"
+ROLLUP_ROWS = (
+    "SELECT account_id, (start_date AT TIME ZONE 'UTC')::date AS day, status, template_id, "
+    "tour_rep_id, car_id, driver_id, {sign} AS sign, total_amount, paid_amount FROM {rows}"
+)
+
+
+def rollup_upsert(*changes: str) -> str:
+    return f"""
+        WITH changes AS ({" UNION ALL ".join(changes)})
+        INSERT INTO booking_daily_rollups AS r ({ROLLUP_KEY}, booking_count, total_amount, paid_amount)
+        SELECT {ROLLUP_KEY}, sum(sign), coalesce(sum(sign * total_amount), 0), coalesce(sum(sign * paid_amount), 0)
+        FROM changes
+        GROUP BY {ROLLUP_KEY}
+        HAVING sum(sign) <> 0 OR sum(sign * total_amount) <> 0 OR sum(sign * paid_amount) <> 0
+        ORDER BY {ROLLUP_KEY}
+        ON CONFLICT ({ROLLUP_KEY}) DO UPDATE SET
+            booking_count = r.booking_count + excluded.booking_count,
+            total_amount = r.total_amount + excluded.total_amount,
+            paid_amount = r.paid_amount + excluded.paid_amount
+    """
+
+
+INSERTED_ROWS = ROLLUP_ROWS.format(sign=1, rows="new_rows")
+DELETED_ROWS = ROLLUP_ROWS.format(sign=-1, rows="old_rows")
+
+# Trigger name, event and transition tables
+TRIGGERS = [
+    ('bookings_rollup_insert', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('bookings_rollup_update', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('bookings_rollup_delete', 'DELETE', 'OLD TABLE AS old_rows'),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'booking_daily_rollups',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('account_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='bookingstatus', create_type=False), nullable=False),
+        sa.Column('template_id', sa.Integer(), nullable=False),
+        sa.Column('tour_rep_id', sa.Integer(), nullable=False),
+        sa.Column('car_id', sa.Integer(), nullable=True),
+        sa.Column('driver_id', sa.Integer(), nullable=True),
+        sa.Column('booking_count', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('paid_amount', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'account_id', 'day', 'status', 'template_id', 'tour_rep_id', 'car_id', 'driver_id',
+            name='uq_booking_daily_rollups_key',
+            postgresql_nulls_not_distinct=True
+        )
+    )
+
+    op.execute(f"""
+        CREATE FUNCTION booking_daily_rollups_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {rollup_upsert(INSERTED_ROWS)};
+            ELSIF TG_OP = 'DELETE' THEN
+                {rollup_upsert(DELETED_ROWS)};
+            ELSE
+                {rollup_upsert(DELETED_ROWS, INSERTED_ROWS)};
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+
+    # Bookings cannot change between the backfill and the triggers taking over
+    op.execute("LOCK TABLE bookings IN SHARE MODE")
+    for name, event, transitions in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON bookings REFERENCING {transitions} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION booking_daily_rollups_apply()"
+        )
+    op.execute(rollup_upsert(ROLLUP_ROWS.format(sign=1, rows="bookings")))
+
+
+def downgrade() -> None:
+    for name, _, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON bookings")
+    op.execute("DROP FUNCTION booking_daily_rollups_apply()")
+    op.drop_table('booking_daily_rollups')
@@ -0,0 +1,41 @@
+"""add_booking_number_sequences
+
+Revision ID: e5b07d3c9a21
+Revises: d4a91e7c5f20
+Create Date: 2025-11-12 16:32:08.917465
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b07d3c9a21'
+down_revision: Union[str, None] = 'd4a91e7c5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'booking_number_sequences',
+        sa.Column('account_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('last_value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('account_id', 'day')
+    )
+
+    # Booking numbers are unique per tenant. Existing numbers carry a random
+    # suffix and never collide with the new all-digit ones.
+    op.create_unique_constraint(
+        'uq_bookings_account_id_booking_number', 'bookings', ['account_id', 'booking_number']
+    )
+    op.drop_index('ix_bookings_booking_number', table_name='bookings')
+
+
+def downgrade() -> None:
+    op.create_index('ix_bookings_booking_number', 'bookings', ['booking_number'], unique=True)
+    op.drop_constraint('uq_bookings_account_id_booking_number', 'bookings', type_='unique')
+    op.drop_table('booking_number_sequences')
@@ -0,0 +1,34 @@
+"""add_updated_at_watermark_indexes
+
+Revision ID: e7a3b5c19d40
+Revises: c2d84f6a9e13
+Create Date: 2025-11-08 15:06:12.770431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3b5c19d40'
+down_revision: Union[str, None] = 'c2d84f6a9e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['bookings', 'customers']
+
+
+def upgrade() -> None:
+    # Latest update per tenant, read by list ETags
+    for table in TABLES:
+        op.create_index(
+            f'ix_{table}_account_id_updated_at', table,
+            ['account_id', 'updated_at'], unique=False
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(f'ix_{table}_account_id_updated_at', table_name=table)
@@ -0,0 +1,72 @@
+"""add_booking_overlap_constraints
+
+Revision ID: f1c6a8e2b357
+Revises: e7a3b5c19d40
+Create Date: 2025-11-10 10:41:29.518846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6a8e2b357'
+down_revision: Union[str, None] = 'e7a3b5c19d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Constraint name and resource column
+RESOURCES = [
+    ('ex_bookings_car_overlap', 'car_id'),
+    ('ex_bookings_driver_overlap', 'driver_id'),
+]
+
+
+# Bookings listed when some end before they start
+REPORTED_BOOKINGS = 20
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    # The overlap checks and constraints build tstzrange() over every booking,
+    # which fails for a period that ends before it starts. a4c1e7f09b62 adds
+    # a CHECK against these; databases that ran it before it did are checked here.
+    inverted = connection.execute(sa.text(
+        "SELECT account_id, booking_number FROM bookings "
+        "WHERE end_date < start_date ORDER BY account_id, id"
+    )).all()
+    if inverted:
+        listed = ", ".join(f"{number} ({account})" for account, number in inverted[:REPORTED_BOOKINGS])
+        raise RuntimeError(
+            f"{len(inverted)} bookings end before they start: {listed}. "
+            f"Correct their start_date or end_date before running this migration."
+        )
+
+    for name, column in RESOURCES:
+        # Existing double-bookings must be resolved before the constraint can exist
+        overlaps = connection.execute(sa.text(
+            f"SELECT count(*) FROM bookings a JOIN bookings b "
+            f"ON a.{column} = b.{column} AND a.id < b.id "
+            f"AND tstzrange(a.start_date, a.end_date, '[)') && tstzrange(b.start_date, b.end_date, '[)') "
+            f"WHERE a.status <> 'CANCELLED' AND b.status <> 'CANCELLED'"
+        )).scalar()
+        if overlaps:
+            raise RuntimeError(
+                f"{overlaps} pairs of active bookings share a {column} over overlapping "
+                f"periods. Reassign or cancel them before running this migration."
+            )
+
+        op.execute(
+            f"ALTER TABLE bookings ADD CONSTRAINT {name} EXCLUDE USING gist ("
+            f"int4range({column}, {column}, '[]') WITH &&, "
+            f"tstzrange(start_date, end_date, '[)') WITH &&"
+            f") WHERE ({column} IS NOT NULL AND status <> 'CANCELLED')"
+        )
+
+
+def downgrade() -> None:
+    for name, _ in reversed(RESOURCES):
+        op.drop_constraint(name, 'bookings')
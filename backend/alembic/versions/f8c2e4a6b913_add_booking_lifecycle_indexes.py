@@ -0,0 +1,31 @@
+"""add_booking_lifecycle_indexes
+
+Revision ID: f8c2e4a6b913
+Revises: e5b07d3c9a21
+Create Date: 2025-11-13 11:05:47.382610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c2e4a6b913'
+down_revision: Union[str, None] = 'e5b07d3c9a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bookings_status_start_date', 'bookings', ['status', 'start_date'], unique=False)
+    op.create_index('ix_bookings_status_end_date', 'bookings', ['status', 'end_date'], unique=False)
+    # Status lookups are served by the leading column of the new indexes
+    op.drop_index('ix_bookings_status', table_name='bookings')
+
+
+def downgrade() -> None:
+    op.create_index('ix_bookings_status', 'bookings', ['status'], unique=False)
+    op.drop_index('ix_bookings_status_end_date', table_name='bookings')
+    op.drop_index('ix_bookings_status_start_date', table_name='bookings')
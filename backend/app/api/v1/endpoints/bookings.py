@@ -1,42 +1,326 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime
-import uuid
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, UploadFile, File, Request, Response
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import DateTime, column, func, insert, literal_column, or_, select, update, values
+from sqlalchemy.exc import DBAPIError
+from typing import List, Optional, Tuple, Union
+from datetime import datetime, timezone
+from dateutil.rrule import rrulestr
+from itertools import islice
 import os
+from contextlib import contextmanager
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_permission
 from app.core.config import settings
 from app.models.user import User
-from app.models.booking import Booking, BookingFieldValue, BookingPhoto, BookingStatus
-from app.schemas.booking import BookingCreate, BookingUpdate, BookingResponse, BookingPhotoResponse
+from app.models.booking import (
+    Booking, BookingPhoto, BookingStatus, BOOKING_STATUS_TRANSITIONS, booking_period, resource_blocked,
+    EXCLUSION_VIOLATION, DEADLOCK_DETECTED
+)
+from app.models.template import Template
+from app.models.customer import Customer
+from app.models.resource import Car, Driver, TourRep
+from app.schemas.booking import (
+    BookingCreate, BookingUpdate, BookingResponse, BookingPhotoResponse,
+    BookingListResponse, BookingListView, BookingCalendarResponse,
+    BookingIncludedListResponse, BookingAssignmentRequest, BookingAssignmentResponse,
+    BookingBulkStatusRequest, BookingBulkStatusResponse, BookingStatusOutcome,
+    BookingSeriesCreate, BookingSeriesResponse, BookingImportResponse
+)
 from app.services.storage import storage_service
+from app.services.assignment import assignment_service
+from app.services.booking_import import booking_importer
+from app.services.booking_numbers import booking_numbers
+from app.services.field_values import field_value_store
+from app.services.field_validation import field_validators
+from app.services.idempotency import idempotency_keys, request_fingerprint
+from app.utils.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate
+from app.utils.fields import parse_fields, load_only_columns, sparse_response
+from app.utils.batch import MAX_BATCH_IDS, parse_ids, in_id_order
+from app.utils.etag import (
+    row_version, request_etag, entity_etag, tenant_watermark, not_modified, check_version, version_conflicts
+)
+from app.utils.filters import ListSpec, apply_filters, sort_keys
 
 router = APIRouter()
 
+# Eager loading for everything BookingResponse serializes. Many-to-one
+# relationships are joined into the main SELECT and collections are loaded
+# with one SELECT ... IN per relationship, so reading a page of bookings
+# costs a fixed number of queries regardless of the page size.
+BOOKING_RELATIONSHIP_LOADERS = {
+    "customer": joinedload(Booking.customer),
+    "tour_rep": joinedload(Booking.tour_rep),
+    "car": joinedload(Booking.car),
+    "driver": joinedload(Booking.driver),
+    "template": joinedload(Booking.template).selectinload(Template.fields),
+    "field_values": field_value_store.loader(),
+    "photos": selectinload(Booking.photos),
+}
+BOOKING_LOAD_OPTIONS = tuple(BOOKING_RELATIONSHIP_LOADERS.values())
+
+# Loaders for the included list view. Many-to-one relationships are loaded
+# with SELECT ... IN over the distinct foreign keys of the page, so each
+# related entity is fetched and serialized once however many bookings share it.
+BOOKING_INCLUDED_LOAD_OPTIONS = (
+    selectinload(Booking.customer),
+    selectinload(Booking.tour_rep),
+    selectinload(Booking.car),
+    selectinload(Booking.driver),
+    selectinload(Booking.template).selectinload(Template.fields),
+    field_value_store.loader(),
+    selectinload(Booking.photos),
+)
+
+# Side table key of the included view for each related entity
+BOOKING_INCLUDED_RELATIONSHIPS = (
+    ("templates", "template"),
+    ("customers", "customer"),
+    ("tour_reps", "tour_rep"),
+    ("cars", "car"),
+    ("drivers", "driver"),
+)
+
+# Columns for the summary list view, selected straight into rows so no ORM
+# objects are built.
+BOOKING_SUMMARY_COLUMNS = (
+    Booking.id,
+    Booking.booking_number,
+    Booking.template_id,
+    Booking.customer_id,
+    Customer.full_name.label("customer_name"),
+    Booking.tour_rep_id,
+    TourRep.full_name.label("tour_rep_name"),
+    Booking.start_date,
+    Booking.end_date,
+    Booking.status,
+    Booking.total_amount,
+    Booking.paid_amount,
+    Booking.created_at,
+)
+
+# Filters and sort keys accepted by the list endpoint, all backed by indexes
+BOOKING_LIST_SPEC = ListSpec(
+    Booking,
+    filters={
+        "status": ("eq", "in"),
+        "template_id": ("eq", "in"),
+        "customer_id": ("eq", "in"),
+        "tour_rep_id": ("eq", "in"),
+        "car_id": ("eq", "in"),
+        "driver_id": ("eq", "in"),
+        "start_date": ("range",),
+        "booking_number": ("eq", "prefix"),
+    },
+    sorts=("created_at", "start_date"),
+)
+
+def booking_load_options(
+    field_names: Optional[List[str]] = None,
+    extra: Tuple[str, ...] = ("created_at",)
+) -> list:
+    """Loader options for a full booking or for a sparse fieldset.
+
+    A fieldset selects only its columns and loads only the relationships
+    it names. ``extra`` columns are loaded as well, e.g. pagination keys.
+    """
+    if not field_names:
+        return list(BOOKING_LOAD_OPTIONS)
+
+    # Field values may be held in the field_data column
+    if "field_values" in field_names:
+        extra = (*extra, "field_data")
+
+    return [load_only_columns(Booking, field_names, extra)] + [
+        BOOKING_RELATIONSHIP_LOADERS[name]
+        for name in field_names
+        if name in BOOKING_RELATIONSHIP_LOADERS
+    ]
+
+
+def collect_included(bookings: List[Booking]) -> dict:
+    """Group the distinct related entities of a list of bookings by type."""
+    included = {key: {} for key, _ in BOOKING_INCLUDED_RELATIONSHIPS}
+    for booking in bookings:
+        for key, attribute in BOOKING_INCLUDED_RELATIONSHIPS:
+            entity = getattr(booking, attribute)
+            if entity is not None:
+                included[key][entity.id] = entity
+
+    return {key: list(entities.values()) for key, entities in included.items()}
+
+# Tables whose rows appear in a booking representation. Field value and
+# photo changes bump the booking's own updated_at.
+BOOKING_VERSION_MODELS = (Booking, Template, Customer, TourRep, Car, Driver)
+
+
+def booking_versions(db: Session, booking_id: int, account_id: str):
+    """Version of a booking and write times of it and the entities embedded in it, in one query."""
+    return db.query(Booking.version, *[row_version(model) for model in BOOKING_VERSION_MODELS]).select_from(
+        Booking
+    ).join(
+        Template, Booking.template_id == Template.id
+    ).join(
+        Customer, Booking.customer_id == Customer.id
+    ).join(
+        TourRep, Booking.tour_rep_id == TourRep.id
+    ).outerjoin(
+        Car, Booking.car_id == Car.id
+    ).outerjoin(
+        Driver, Booking.driver_id == Driver.id
+    ).filter(
+        Booking.id == booking_id,
+        Booking.account_id == account_id
+    ).first()
+
+
+def load_booking(db: Session, booking_id: int, account_id: str) -> Optional[Booking]:
+    """Load a booking with all relationships needed for BookingResponse."""
+    return db.query(Booking).options(*BOOKING_LOAD_OPTIONS).filter(
+        Booking.id == booking_id,
+        Booking.account_id == account_id
+    ).first()
+
+
+def touch_booking(db: Session, booking_id: int) -> None:
+    """Mark a booking changed when something embedded in it changes.
+
+    A single UPDATE bumping updated_at and the version, so it never fails
+    on a concurrent edit of the booking itself.
+    """
+    db.execute(
+        update(Booking).where(Booking.id == booking_id).values(
+            updated_at=func.now(),
+            version=Booking.version + 1
+        ),
+        execution_options={"synchronize_session": False}
+    )
+
+
+# Exclusion constraints rejecting overlapping bookings of one car or driver
+BOOKING_OVERLAP_CONSTRAINTS = {
+    "ex_bookings_car_overlap": "Car is already booked for an overlapping period",
+    "ex_bookings_driver_overlap": "Driver is already booked for an overlapping period",
+}
+
+
+@contextmanager
+def overlap_conflicts(db: Session):
+    """Report a resource double-booking rejected by the database as 409.
+
+    Two transactions inserting conflicting bookings at the same time can
+    wait on each other's exclusion check; Postgres then aborts one of them
+    as a deadlock, which is reported the same way.
+    """
+    try:
+        yield
+    except DBAPIError as exc:
+        code = getattr(exc.orig, "pgcode", None)
+        diag = getattr(exc.orig, "diag", None)
+        if code == EXCLUSION_VIOLATION and diag.constraint_name in BOOKING_OVERLAP_CONSTRAINTS:
+            detail = BOOKING_OVERLAP_CONSTRAINTS[diag.constraint_name]
+        elif code == DEADLOCK_DETECTED and "exclusion constraint" in (diag.context or ""):
+            detail = "Car or driver is already booked for an overlapping period"
+        else:
+            raise
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+# Upper bound on the bookings one series creates
+MAX_SERIES_BOOKINGS = 500
+
+
+def expand_series(start_date: datetime, end_date: datetime, rule: str) -> List[Tuple[datetime, datetime]]:
+    """(start, end) of each occurrence of a recurrence rule, starting at start_date.
+
+    Naive dates are taken as UTC, as Postgres stores them, so that a UTC
+    UNTIL and the rule's start agree on having a timezone.
+    """
+    if start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+    if end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+
+    try:
+        occurrences = list(islice(rrulestr(rule, dtstart=start_date), MAX_SERIES_BOOKINGS + 1))
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid recurrence rule: {e}"
+        )
 
-def generate_booking_number() -> str:
-    """Generate a unique booking number."""
-    timestamp = datetime.now().strftime("%Y%m%d")
-    random_part = str(uuid.uuid4())[:8].upper()
-    return f"BK{timestamp}{random_part}"
+    if not occurrences:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Recurrence rule has no occurrences"
+        )
+    if len(occurrences) > MAX_SERIES_BOOKINGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A series can create at most {MAX_SERIES_BOOKINGS} bookings"
+        )
 
+    duration = end_date - start_date
+    return [(occurrence, occurrence + duration) for occurrence in occurrences]
 
-@router.get("/", response_model=List[BookingResponse])
+
+@router.get(
+    "/",
+    response_model=Union[List[BookingResponse], List[BookingListResponse], BookingIncludedListResponse]
+)
 def list_bookings(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    view: BookingListView = Query(BookingListView.FULL, description="Response shape: full, summary or included"),
     status_filter: Optional[BookingStatus] = Query(None, description="Filter by status"),
     start_date: Optional[datetime] = Query(None, description="Filter bookings starting from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter bookings ending before this date"),
     customer_id: Optional[int] = Query(None, description="Filter by customer"),
     tour_rep_id: Optional[int] = Query(None, description="Filter by tour rep"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return (full view only)"),
+    filters: List[str] = Query([], alias="filter", description="Filters as field:operator:value"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort keys, prefix with - for descending"),
+    field: List[str] = Query([], description="Template field filters as name:operator:value"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all bookings with filters."""
-    query = db.query(Booking).filter(Booking.account_id == current_user.account_id)
+    field_names = parse_fields(fields, BookingResponse)
+    if field_names and view != BookingListView.FULL:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fields can only be used with the full view"
+        )
+    keys = sort_keys(BOOKING_LIST_SPEC, sort)
+
+    etag = request_etag(
+        request,
+        current_user.account_id,
+        *tenant_watermark(db, current_user.account_id, *BOOKING_VERSION_MODELS)
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    if view == BookingListView.SUMMARY:
+        query = db.query(*BOOKING_SUMMARY_COLUMNS).join(
+            Customer, Booking.customer_id == Customer.id
+        ).join(
+            TourRep, Booking.tour_rep_id == TourRep.id
+        )
+    elif view == BookingListView.INCLUDED:
+        query = db.query(Booking).options(*BOOKING_INCLUDED_LOAD_OPTIONS)
+    else:
+        query = db.query(Booking).options(
+            *booking_load_options(field_names, tuple(column.key for column, _ in keys))
+        )
+
+    query = query.filter(Booking.account_id == current_user.account_id)
+    query = apply_filters(query, BOOKING_LIST_SPEC, filters)
+    query = query.filter(*field_value_store.filters(db, current_user.account_id, field))
 
     if status_filter:
         query = query.filter(Booking.status == status_filter)
@@ -53,22 +337,120 @@ def list_bookings(
     if tour_rep_id:
         query = query.filter(Booking.tour_rep_id == tour_rep_id)
 
-    # Order by most recent first
-    query = query.order_by(Booking.created_at.desc())
+    # Most recent first unless sorted otherwise, paged by the sort keys
+    bookings, next_cursor = paginate(query, keys, limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    if view == BookingListView.SUMMARY:
+        return [row._asdict() for row in bookings]
+
+    if view == BookingListView.INCLUDED:
+        return {"bookings": bookings, "included": collect_included(bookings)}
+
+    if field_names:
+        return sparse_response(bookings, BookingResponse, field_names, response)
 
-    bookings = query.offset(skip).limit(limit).all()
     return bookings
 
 
+@router.get("/batch", response_model=List[BookingResponse])
+def get_bookings_batch(
+    ids: str = Query(..., description="Comma-separated booking ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get many bookings by ID in one query. Unknown ids are skipped."""
+    booking_ids = parse_ids(ids)
+    field_names = parse_fields(fields, BookingResponse)
+
+    bookings = db.query(Booking).options(*booking_load_options(field_names)).filter(
+        Booking.id.in_(booking_ids),
+        Booking.account_id == current_user.account_id
+    ).all()
+    bookings = in_id_order(bookings, booking_ids)
+
+    if field_names:
+        return sparse_response(bookings, BookingResponse, field_names)
+
+    return bookings
+
+
+@router.get("/calendar", response_model=BookingCalendarResponse)
+def get_bookings_calendar(
+    window_start: datetime = Query(..., alias="from", description="Start of the calendar window"),
+    window_end: datetime = Query(..., alias="to", description="End of the calendar window"),
+    car_id: Optional[int] = Query(None, description="Filter by car"),
+    driver_id: Optional[int] = Query(None, description="Filter by driver"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List bookings overlapping a time window as compact event tuples."""
+    if window_end <= window_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
+        )
+
+    window = func.tstzrange(window_start, window_end, literal_column("'[)'"))
+
+    # Overlap test on booking_period is answered by the GiST index
+    query = db.query(
+        Booking.id,
+        Booking.booking_number,
+        Booking.start_date,
+        Booking.end_date,
+        Booking.status,
+        Customer.full_name,
+        Booking.car_id,
+        Booking.driver_id,
+    ).join(
+        Customer, Booking.customer_id == Customer.id
+    ).filter(
+        Booking.account_id == current_user.account_id,
+        booking_period.op("&&")(window)
+    )
+
+    if car_id:
+        query = query.filter(Booking.car_id == car_id)
+
+    if driver_id:
+        query = query.filter(Booking.driver_id == driver_id)
+
+    events = query.order_by(Booking.start_date, Booking.id).all()
+    return {"events": [tuple(event) for event in events]}
+
+
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
 def create_booking(
     booking_data: BookingCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("can_create_bookings"))
 ):
-    """Create a new booking."""
+    """Create a new booking.
+
+    Retries sent with the same Idempotency-Key get the stored response of
+    the first request instead of creating another booking.
+    """
+    if idempotency_key:
+        replay = idempotency_keys.claim(
+            db, current_user.account_id, idempotency_key, request_fingerprint("POST /bookings", booking_data)
+        )
+        if replay:
+            return replay
+
+    if booking_data.end_date < booking_data.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must not be before start date"
+        )
+
+    field_validators.validate(db, booking_data.template_id, current_user.account_id, booking_data.field_values)
+
     # Generate booking number
-    booking_number = generate_booking_number()
+    booking_number = booking_numbers.next(current_user.account_id)
 
     # Create booking
     booking_dict = booking_data.dict(exclude={"field_values"})
@@ -80,31 +462,268 @@ def create_booking(
         status=BookingStatus.PENDING
     )
 
+    field_value_store.write(db, booking, booking_data.field_values)
+
     db.add(booking)
-    db.flush()  # Get booking ID
+    with overlap_conflicts(db):
+        if idempotency_key:
+            # The response is stored in the key row, committed with the booking.
+            # Expiring reloads the defaults applied at flush as the database has them.
+            db.flush()
+            db.expire(booking)
+            created = BookingResponse.model_validate(load_booking(db, booking.id, current_user.account_id))
+            return idempotency_keys.complete(db, current_user.account_id, idempotency_key, created)
+        db.commit()
+
+    return load_booking(db, booking.id, current_user.account_id)
+
+
+@router.post("/assign", response_model=BookingAssignmentResponse)
+def assign_resources(
+    assignment_data: BookingAssignmentRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("can_edit_bookings"))
+):
+    """Assign free cars and drivers to pending bookings in a date range."""
+    if assignment_data.end_date <= assignment_data.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must be after start date"
+        )
+
+    assignments, unassigned = assignment_service.assign_pending(
+        db,
+        current_user.account_id,
+        assignment_data.start_date,
+        assignment_data.end_date,
+        booking_ids=assignment_data.booking_ids,
+        dry_run=assignment_data.dry_run
+    )
+
+    if assignment_data.dry_run:
+        db.rollback()
+    else:
+        # Assignments made concurrently by hand are caught by the overlap constraints
+        with overlap_conflicts(db):
+            db.commit()
+
+    return {
+        "assigned": [
+            {"booking_id": booking_id, **values} for booking_id, values in assignments.items()
+        ],
+        "unassigned": [
+            {"booking_id": booking_id, "reasons": reasons} for booking_id, reasons in unassigned.items()
+        ],
+        "dry_run": assignment_data.dry_run,
+    }
+
+
+@router.post("/bulk-status", response_model=BookingBulkStatusResponse)
+def bulk_update_status(
+    status_data: BookingBulkStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("can_edit_bookings"))
+):
+    """Move many bookings to one status, reporting the outcome per booking.
 
-    # Create field values
-    for field_value_data in booking_data.field_values:
-        field_value = BookingFieldValue(
-            **field_value_data.dict(),
-            booking_id=booking.id
+    The bookings are locked, checked against the allowed transitions and
+    updated by a single UPDATE ... RETURNING.
+    """
+    booking_ids = list(dict.fromkeys(status_data.booking_ids))
+    if len(booking_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_IDS} bookings can be updated at once"
         )
-        db.add(field_value)
 
+    target = status_data.status
+    allowed_from = [
+        current_status for current_status, targets in BOOKING_STATUS_TRANSITIONS.items()
+        if target in targets
+    ]
+
+    # Status before the update, read under lock so it is the one the UPDATE sees
+    current = select(Booking.id, Booking.status).where(
+        Booking.account_id == current_user.account_id,
+        Booking.id.in_(booking_ids)
+    ).with_for_update().cte("current")
+    changed = update(Booking).where(
+        Booking.id == current.c.id,
+        current.c.status.in_(allowed_from)
+    ).values(
+        status=target,
+        updated_at=func.now(),
+        version=Booking.version + 1
+    ).returning(Booking.id).cte("changed")
+
+    previous = {}
+    updated = set()
+    for booking_id, previous_status, changed_id in db.execute(
+        select(current.c.id, current.c.status, changed.c.id).select_from(
+            current.outerjoin(changed, changed.c.id == current.c.id)
+        )
+    ):
+        previous[booking_id] = previous_status
+        if changed_id is not None:
+            updated.add(booking_id)
     db.commit()
-    db.refresh(booking)
 
-    return booking
+    results = []
+    for booking_id in booking_ids:
+        if booking_id not in previous:
+            results.append({"booking_id": booking_id, "outcome": BookingStatusOutcome.NOT_FOUND})
+            continue
+
+        if booking_id in updated:
+            outcome, new_status = BookingStatusOutcome.UPDATED, target
+        elif previous[booking_id] == target:
+            outcome, new_status = BookingStatusOutcome.UNCHANGED, target
+        else:
+            outcome, new_status = BookingStatusOutcome.NOT_ALLOWED, previous[booking_id]
+        results.append({
+            "booking_id": booking_id,
+            "outcome": outcome,
+            "previous_status": previous[booking_id],
+            "status": new_status,
+        })
+
+    return {"updated": len(updated), "results": results}
+
+
+@router.post("/series", response_model=BookingSeriesResponse, status_code=status.HTTP_201_CREATED)
+def create_booking_series(
+    series_data: BookingSeriesCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("can_create_bookings"))
+):
+    """Create one booking per occurrence of a recurrence rule.
+
+    The whole series is checked for car and driver conflicts with one
+    query and written with multi-row INSERTs, all in one transaction.
+    """
+    if series_data.end_date < series_data.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must not be before start date"
+        )
+
+    periods = expand_series(series_data.start_date, series_data.end_date, series_data.rrule)
+    field_validators.validate(db, series_data.template_id, current_user.account_id, series_data.field_values)
+
+    resources = [
+        (resource_column, resource_id)
+        for resource_column, resource_id in ((Booking.car_id, series_data.car_id), (Booking.driver_id, series_data.driver_id))
+        if resource_id is not None
+    ]
+    if resources:
+        # Occurrences of a series must not overlap each other...
+        for (_, previous_end), (next_start, _) in zip(periods, periods[1:]):
+            if next_start < previous_end:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Occurrences of the series overlap each other"
+                )
+
+        # ...nor existing bookings of the car or driver, checked for all of them at once
+        occurrences = values(
+            column("starts", DateTime(timezone=True)), column("ends", DateTime(timezone=True)),
+            name="occurrences"
+        ).data(periods)
+        window = func.tstzrange(occurrences.c.starts, occurrences.c.ends, literal_column("'[)'"))
+        conflicts = db.query(occurrences.c.starts).join(
+            Booking, booking_period.op("&&")(window)
+        ).filter(
+            Booking.account_id == current_user.account_id,
+            or_(*[
+                (resource_column == resource_id) & resource_blocked(resource_column)
+                for resource_column, resource_id in resources
+            ])
+        ).distinct().order_by(occurrences.c.starts).all()
+        if conflicts:
+            dates = ", ".join(starts.isoformat() for starts, in conflicts[:10])
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Car or driver is already booked for {len(conflicts)} occurrence(s): {dates}"
+            )
+
+    field_values = {field_value.field_name: field_value.field_value for field_value in series_data.field_values}
+    document = field_value_store.new_document(field_values)
+    booking_fields = series_data.dict(exclude={"field_values", "rrule", "start_date", "end_date"})
+    numbers = booking_numbers.allocate(current_user.account_id, len(periods))
+
+    with overlap_conflicts(db):
+        # insertmanyvalues sends these as multi-row INSERT ... RETURNING statements
+        created = db.execute(
+            insert(Booking).returning(
+                Booking.id, Booking.booking_number, Booking.start_date, Booking.end_date,
+                sort_by_parameter_order=True
+            ),
+            [
+                {
+                    **booking_fields,
+                    "booking_number": number,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "account_id": current_user.account_id,
+                    "created_by": current_user.id,
+                    "status": BookingStatus.PENDING,
+                    "field_data": document,
+                }
+                for number, (start_date, end_date) in zip(numbers, periods)
+            ]
+        ).all()
+        field_value_store.insert_many(db, {booking.id: field_values for booking in created})
+        db.commit()
+
+    return {
+        "count": len(created),
+        "bookings": [booking._asdict() for booking in created],
+    }
+
+
+@router.post("/import", response_model=BookingImportResponse)
+def import_bookings(
+    template_id: int = Query(..., description="Template the file's field columns belong to"),
+    dry_run: bool = Query(False, description="Check the file without creating bookings"),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("can_create_bookings"))
+):
+    """Create bookings from the rows of a CSV or XLSX file.
+
+    Customers, tour reps, cars and drivers are named by email, name,
+    registration and license number. Rows with problems are skipped and
+    reported by row number; the others are imported in batches.
+    """
+    return booking_importer.import_file(
+        db, current_user.account_id, current_user.id, template_id, file, dry_run=dry_run
+    )
 
 
 @router.get("/{booking_id}", response_model=BookingResponse)
 def get_booking(
     booking_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get booking by ID."""
-    booking = db.query(Booking).filter(
+    field_names = parse_fields(fields, BookingResponse)
+
+    versions = booking_versions(db, booking_id, current_user.account_id)
+    if versions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+
+    cached = not_modified(request, response, entity_etag(request, current_user.account_id, *versions))
+    if cached:
+        return cached
+
+    booking = db.query(Booking).options(*booking_load_options(field_names)).filter(
         Booking.id == booking_id,
         Booking.account_id == current_user.account_id
     ).first()
@@ -115,6 +734,9 @@ def get_booking(
             detail="Booking not found"
         )
 
+    if field_names:
+        return sparse_response(booking, BookingResponse, field_names, response)
+
     return booking
 
 
@@ -122,10 +744,15 @@ def get_booking(
 def update_booking(
     booking_id: int,
     booking_data: BookingUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("can_edit_bookings"))
 ):
-    """Update booking."""
+    """Update booking.
+
+    Send the ETag of the booking read back in ``If-Match`` to update only
+    that version; a booking changed since then is answered with 409.
+    """
     booking = db.query(Booking).filter(
         Booking.id == booking_id,
         Booking.account_id == current_user.account_id
@@ -137,29 +764,36 @@ def update_booking(
             detail="Booking not found"
         )
 
+    check_version(request, booking, "Booking")
+
     update_data = booking_data.dict(exclude_unset=True, exclude={"field_values"})
+
+    template_id = update_data.get("template_id") or booking.template_id
+    if booking_data.field_values is not None:
+        field_validators.validate(db, template_id, current_user.account_id, booking_data.field_values)
+    elif template_id != booking.template_id:
+        # The new template's rules apply to the values the booking keeps
+        field_validators.check_values(db, template_id, current_user.account_id, booking.field_value_map)
+
     for field, value in update_data.items():
         setattr(booking, field, value)
 
-    # Update field values if provided
-    if booking_data.field_values is not None:
-        # Delete existing field values
-        db.query(BookingFieldValue).filter(
-            BookingFieldValue.booking_id == booking_id
-        ).delete()
-
-        # Create new field values
-        for field_value_data in booking_data.field_values:
-            field_value = BookingFieldValue(
-                **field_value_data.dict(),
-                booking_id=booking.id
-            )
-            db.add(field_value)
+    if booking.end_date < booking.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must not be before start date"
+        )
 
-    db.commit()
-    db.refresh(booking)
+    with version_conflicts(db, "Booking"), overlap_conflicts(db):
+        # Update field values if provided, writing only the fields that changed
+        if booking_data.field_values is not None:
+            if field_value_store.write(db, booking, booking_data.field_values):
+                # Field values are part of the booking's representation and ETag
+                booking.updated_at = func.now()
 
-    return booking
+        db.commit()
+
+    return load_booking(db, booking.id, current_user.account_id)
 
 
 @router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -181,7 +815,8 @@ def delete_booking(
         )
 
     db.delete(booking)
-    db.commit()
+    with version_conflicts(db, "Booking"):
+        db.commit()
 
     return None
 
@@ -242,6 +877,7 @@ async def upload_booking_photo(
     )
 
     db.add(photo)
+    touch_booking(db, booking_id)
     db.commit()
     db.refresh(photo)
 
@@ -310,6 +946,7 @@ async def delete_booking_photo(
 
     # Delete database record
     db.delete(photo)
+    touch_booking(db, booking_id)
     db.commit()
 
     return None
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
@@ -6,21 +6,60 @@ from app.core.deps import get_current_user
 from app.models.user import User
 from app.models.customer import Customer
 from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
+from app.utils.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate
+from app.utils.fields import parse_fields, load_only_columns, sparse_response
+from app.utils.batch import parse_ids, in_id_order
+from app.utils.filters import ListSpec, apply_filters, sort_keys
+from app.utils.etag import row_version, request_etag, tenant_watermark, not_modified
 
 router = APIRouter()
 
+# Filters and sort keys accepted by the list endpoint, all backed by indexes
+CUSTOMER_LIST_SPEC = ListSpec(
+    Customer,
+    filters={
+        "full_name": ("eq", "prefix"),
+        "email": ("eq", "prefix"),
+        "phone": ("eq", "prefix"),
+    },
+    sorts=("created_at", "full_name"),
+)
+
 
 @router.get("/", response_model=List[CustomerResponse])
 def list_customers(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     search: Optional[str] = Query(None, description="Search by name, email, or phone"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    filters: List[str] = Query([], alias="filter", description="Filters as field:operator:value"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort keys, prefix with - for descending"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all customers with optional search."""
+    field_names = parse_fields(fields, CustomerResponse)
+    keys = sort_keys(CUSTOMER_LIST_SPEC, sort)
+
+    etag = request_etag(
+        request,
+        current_user.account_id,
+        *tenant_watermark(db, current_user.account_id, Customer)
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
     query = db.query(Customer).filter(Customer.account_id == current_user.account_id)
 
+    if field_names:
+        query = query.options(
+            load_only_columns(Customer, field_names, [column.key for column, _ in keys])
+        )
+
     if search:
         search_term = f"%{search}%"
         query = query.filter(
@@ -29,7 +68,15 @@ def list_customers(
             (Customer.phone.ilike(search_term))
         )
 
-    customers = query.offset(skip).limit(limit).all()
+    query = apply_filters(query, CUSTOMER_LIST_SPEC, filters)
+
+    customers, next_cursor = paginate(query, keys, limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    if field_names:
+        return sparse_response(customers, CustomerResponse, field_names, response)
+
     return customers
 
 
@@ -47,17 +94,68 @@ def create_customer(
     return customer
 
 
+@router.get("/batch", response_model=List[CustomerResponse])
+def get_customers_batch(
+    ids: str = Query(..., description="Comma-separated customer ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get many customers by ID in one query. Unknown ids are skipped."""
+    customer_ids = parse_ids(ids)
+    field_names = parse_fields(fields, CustomerResponse)
+
+    query = db.query(Customer).filter(
+        Customer.id.in_(customer_ids),
+        Customer.account_id == current_user.account_id
+    )
+
+    if field_names:
+        query = query.options(load_only_columns(Customer, field_names))
+
+    customers = in_id_order(query.all(), customer_ids)
+
+    if field_names:
+        return sparse_response(customers, CustomerResponse, field_names)
+
+    return customers
+
+
 @router.get("/{customer_id}", response_model=CustomerResponse)
 def get_customer(
     customer_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get customer by ID."""
-    customer = db.query(Customer).filter(
+    field_names = parse_fields(fields, CustomerResponse)
+
+    version = db.query(row_version(Customer)).filter(
         Customer.id == customer_id,
         Customer.account_id == current_user.account_id
-    ).first()
+    ).scalar()
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Customer not found"
+        )
+
+    cached = not_modified(request, response, request_etag(request, current_user.account_id, version))
+    if cached:
+        return cached
+
+    query = db.query(Customer).filter(
+        Customer.id == customer_id,
+        Customer.account_id == current_user.account_id
+    )
+
+    if field_names:
+        query = query.options(load_only_columns(Customer, field_names))
+
+    customer = query.first()
 
     if not customer:
         raise HTTPException(
@@ -65,6 +163,9 @@ def get_customer(
             detail="Customer not found"
         )
 
+    if field_names:
+        return sparse_response(customer, CustomerResponse, field_names, response)
+
     return customer
 
 
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import Integer, and_, case, cast, func, literal, null, or_, select, tuple_
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_permission
 from app.models.user import User
@@ -11,9 +11,15 @@ from app.models.resource import Car, Driver, TourRep
 from app.models.customer import Customer
 from app.models.payment import Payment
 from app.models.audit_log import AuditLog
+from app.services.booking_rollups import as_utc, booking_rollups
+from app.utils.pagination import paginate, recency_keys
 
 router = APIRouter()
 
+# Up to this many matching bookings, the dashboard's recent bookings are
+# found by ranking the matches instead of scanning all bookings by recency
+RECENT_BOOKINGS_RANKED_LIMIT = 50000
+
 
 @router.get("/stats")
 def get_dashboard_stats(
@@ -36,11 +42,11 @@ def get_dashboard_stats(
             detail="Only administrators can access the dashboard"
         )
 
-    # Default to last 30 days if no dates provided
-    if not start_date:
-        start_date = datetime.now() - timedelta(days=30)
-    if not end_date:
-        end_date = datetime.now()
+    # Default to last 30 days if no dates provided. Naive dates are taken as
+    # UTC, as the rollup does, so both queries below cover the same period.
+    now = datetime.now(timezone.utc)
+    start_date = as_utc(start_date) if start_date else now - timedelta(days=30)
+    end_date = as_utc(end_date) if end_date else now
 
     # Build filters
     filters = [Booking.account_id == current_user.account_id]
@@ -56,130 +62,146 @@ def get_dashboard_stats(
 
     combined_filter = and_(*filters)
 
-    # Total bookings
-    total_bookings = db.query(func.count(Booking.id)).filter(
-        combined_filter
-    ).scalar()
-
-    # Bookings by status
-    bookings_by_status = {}
-    for status in BookingStatus:
-        count = db.query(func.count(Booking.id)).filter(
-            combined_filter,
-            Booking.status == status
-        ).scalar()
-        bookings_by_status[status.value] = count
-
-    # Revenue stats
-    total_revenue = db.query(func.sum(Booking.total_amount)).filter(
-        combined_filter
-    ).scalar() or 0
-
-    total_paid = db.query(func.sum(Booking.paid_amount)).filter(
-        combined_filter
-    ).scalar() or 0
-
-    total_outstanding = total_revenue - total_paid
-
-    # Top performing tour reps (skip if filtering by specific tour rep)
-    top_tour_reps = []
-    if not tour_rep_id:
-        top_tour_reps = db.query(
-            TourRep.id,
-            TourRep.full_name,
-            func.count(Booking.id).label("booking_count"),
-            func.sum(Booking.total_amount).label("total_revenue")
-        ).join(Booking, Booking.tour_rep_id == TourRep.id).filter(
-            combined_filter
-        ).group_by(TourRep.id, TourRep.full_name).order_by(
-            func.count(Booking.id).desc()
-        ).limit(10).all()
-
-    top_tour_reps_data = [
-        {
-            "id": rep.id,
-            "name": rep.full_name,
-            "booking_count": rep.booking_count,
-            "total_revenue": float(rep.total_revenue) if rep.total_revenue else 0
-        }
-        for rep in top_tour_reps
-    ]
-
-    # Most used cars (skip if filtering by specific car)
-    top_cars = []
-    if not car_id:
-        top_cars = db.query(
-            Car.id,
-            Car.registration_number,
-            Car.make,
-            Car.model,
-            func.count(Booking.id).label("booking_count")
-        ).join(Booking, Booking.car_id == Car.id).filter(
-            combined_filter, Booking.car_id.isnot(None)
-        ).group_by(Car.id, Car.registration_number, Car.make, Car.model).order_by(
-            func.count(Booking.id).desc()
-        ).limit(10).all()
-
-    top_cars_data = [
-        {
-            "id": car.id,
-            "registration_number": car.registration_number,
-            "name": f"{car.make} {car.model}",
-            "booking_count": car.booking_count
-        }
-        for car in top_cars
-    ]
-
-    # Most used drivers (skip if filtering by specific driver)
-    top_drivers = []
-    if not driver_id:
-        top_drivers = db.query(
-            Driver.id,
-            Driver.full_name,
-            func.count(Booking.id).label("booking_count")
-        ).join(Booking, Booking.driver_id == Driver.id).filter(
-            combined_filter, Booking.driver_id.isnot(None)
-        ).group_by(Driver.id, Driver.full_name).order_by(
-            func.count(Booking.id).desc()
-        ).limit(10).all()
-
-    top_drivers_data = [
-        {
-            "id": driver.id,
-            "name": driver.full_name,
-            "booking_count": driver.booking_count
-        }
-        for driver in top_drivers
+    # One pass groups the bookings by tour rep, car and driver (except the
+    # one filtered to a single id) and, through the empty grouping set, gives
+    # the totals by status and revenue as well. Whole days of the period are
+    # read from the daily rollup rather than booking by booking.
+    source = booking_rollups.bookings(
+        current_user.account_id,
+        start_date,
+        end_date,
+        **{name: value for name, value in (
+            ("driver_id", driver_id), ("tour_rep_id", tour_rep_id), ("car_id", car_id)
+        ) if value}
+    )
+    grouped_by = [
+        (kind, column)
+        for kind, column, filtered in (
+            ("tour_rep", source.c.tour_rep_id, tour_rep_id),
+            ("car", source.c.car_id, car_id),
+            ("driver", source.c.driver_id, driver_id),
+        )
+        if not filtered
     ]
+    columns = [column for _, column in grouped_by]
+
+    # In each grouping set the other columns are NULL, so coalesce picks the grouped id
+    if grouped_by:
+        kind = case(*[(func.grouping(column) == 0, kind) for kind, column in grouped_by], else_="total")
+        resource_id = func.coalesce(*columns)
+    else:
+        kind, resource_id = literal("total"), cast(null(), Integer)
+
+    booking_count = func.sum(source.c.booking_count)
+    groups = db.query(
+        kind.label("kind"),
+        resource_id.label("resource_id"),
+        func.coalesce(booking_count, 0).label("booking_count"),
+        *[
+            func.coalesce(booking_count.filter(source.c.status == status), 0).label(status.value)
+            for status in BookingStatus
+        ],
+        func.sum(source.c.total_amount).label("total_revenue"),
+        func.sum(source.c.paid_amount).label("total_paid")
+    ).group_by(
+        func.grouping_sets(*[tuple_(column) for column in columns], tuple_())
+    ).subquery()
+
+    ranked = select(
+        groups,
+        func.row_number().over(
+            partition_by=groups.c.kind,
+            order_by=(groups.c.booking_count.desc(), groups.c.resource_id)
+        ).label("rank")
+    ).where(or_(groups.c.kind == "total", groups.c.resource_id.isnot(None))).subquery()
+
+    def resource_count(model, *conditions):
+        return select(func.count(model.id)).where(
+            model.account_id == current_user.account_id, *conditions
+        ).scalar_subquery()
+
+    # Top 10 of each kind with their names, and the resource counts computed once
+    rows = db.query(
+        ranked,
+        TourRep.full_name.label("tour_rep_name"),
+        Car.registration_number,
+        Car.make,
+        Car.model,
+        Driver.full_name.label("driver_name"),
+        resource_count(Car).label("total_cars"),
+        resource_count(Car, Car.is_available == True).label("available_cars"),
+        resource_count(Driver).label("total_drivers"),
+        resource_count(Driver, Driver.is_available == True).label("available_drivers")
+    ).outerjoin(
+        TourRep, (ranked.c.kind == "tour_rep") & (TourRep.id == ranked.c.resource_id)
+    ).outerjoin(
+        Car, (ranked.c.kind == "car") & (Car.id == ranked.c.resource_id)
+    ).outerjoin(
+        Driver, (ranked.c.kind == "driver") & (Driver.id == ranked.c.resource_id)
+    ).filter(ranked.c.rank <= 10).order_by(ranked.c.kind, ranked.c.rank).all()
+
+    top_tour_reps_data = []
+    top_cars_data = []
+    top_drivers_data = []
+    for row in rows:
+        if row.kind == "total":
+            totals = row
+        elif row.kind == "tour_rep":
+            top_tour_reps_data.append({
+                "id": row.resource_id,
+                "name": row.tour_rep_name,
+                "booking_count": row.booking_count,
+                "total_revenue": float(row.total_revenue) if row.total_revenue else 0
+            })
+        elif row.kind == "car":
+            top_cars_data.append({
+                "id": row.resource_id,
+                "registration_number": row.registration_number,
+                "name": f"{row.make} {row.model}",
+                "booking_count": row.booking_count
+            })
+        else:
+            top_drivers_data.append({
+                "id": row.resource_id,
+                "name": row.driver_name,
+                "booking_count": row.booking_count
+            })
+
+    total_bookings = totals.booking_count
+    bookings_by_status = {status.value: getattr(totals, status.value) for status in BookingStatus}
+    total_revenue = totals.total_revenue or 0
+    total_paid = totals.total_paid or 0
+    total_outstanding = total_revenue - total_paid
 
-    # Resource availability
-    total_cars = db.query(func.count(Car.id)).filter(
-        Car.account_id == current_user.account_id
-    ).scalar()
-    available_cars = db.query(func.count(Car.id)).filter(
-        Car.account_id == current_user.account_id,
-        Car.is_available == True
-    ).scalar()
-
-    total_drivers = db.query(func.count(Driver.id)).filter(
-        Driver.account_id == current_user.account_id
-    ).scalar()
-    available_drivers = db.query(func.count(Driver.id)).filter(
-        Driver.account_id == current_user.account_id,
-        Driver.is_available == True
-    ).scalar()
-
-    # Recent bookings
-    recent_bookings = db.query(Booking).filter(
-        combined_filter
-    ).order_by(Booking.created_at.desc()).limit(10).all()
+    # Recent bookings with their customer and tour rep names joined in. Walking
+    # the created_at index backwards suits filters matching many bookings; a
+    # narrower filter is answered from its own matches, ranked by created_at.
+    recent = db.query(Booking.id, Booking.created_at).filter(combined_filter)
+    if total_bookings <= RECENT_BOOKINGS_RANKED_LIMIT:
+        recent = recent.cte("matching").prefix_with("MATERIALIZED")
+    else:
+        recent = recent.subquery("matching")
+
+    recent_bookings = db.query(
+        Booking.id,
+        Booking.booking_number,
+        Customer.full_name.label("customer_name"),
+        TourRep.full_name.label("tour_rep_name"),
+        Booking.status,
+        Booking.start_date,
+        Booking.total_amount
+    ).join(recent, recent.c.id == Booking.id).outerjoin(
+        Customer, Customer.id == Booking.customer_id
+    ).outerjoin(
+        TourRep, TourRep.id == Booking.tour_rep_id
+    ).order_by(recent.c.created_at.desc()).limit(10).all()
 
     recent_bookings_data = [
         {
             "id": booking.id,
             "booking_number": booking.booking_number,
-            "customer_name": booking.customer.full_name if booking.customer else None,
-            "tour_rep_name": booking.tour_rep.full_name if booking.tour_rep else None,
+            "customer_name": booking.customer_name,
+            "tour_rep_name": booking.tour_rep_name,
             "status": booking.status.value,
             "start_date": booking.start_date,
             "total_amount": float(booking.total_amount) if booking.total_amount else 0
@@ -208,12 +230,12 @@ def get_dashboard_stats(
         },
         "resources": {
             "cars": {
-                "total": total_cars,
-                "available": available_cars
+                "total": totals.total_cars,
+                "available": totals.available_cars
             },
             "drivers": {
-                "total": total_drivers,
-                "available": available_drivers
+                "total": totals.total_drivers,
+                "available": totals.available_drivers
             }
         },
         "recent_bookings": recent_bookings_data
@@ -286,6 +308,7 @@ def get_tour_rep_stats(
 def get_audit_logs(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor of the previous page"),
     start_date: Optional[datetime] = Query(None, description="Filter from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter until this date"),
     user_id: Optional[int] = Query(None, description="Filter by user"),
@@ -323,10 +346,11 @@ def get_audit_logs(
     total = query.count()
 
     # Get paginated results
-    logs = query.order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
+    logs, next_cursor = paginate(query, recency_keys(AuditLog), limit, cursor=cursor, skip=skip)
 
     return {
         "total": total,
+        "next_cursor": next_cursor,
         "items": [
             {
                 "id": log.id,
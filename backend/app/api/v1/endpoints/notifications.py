@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.core.deps import get_db, get_current_user
 from app.models.user import User
@@ -12,9 +12,20 @@ from app.schemas.notification import (
     BookingNotificationRequest
 )
 from app.services.notification import notification_service
+from app.utils.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate
+from app.utils.filters import ListSpec, apply_filters, sort_keys
 
 router = APIRouter()
 
+# Filters and sort keys accepted by the list endpoint, all backed by indexes
+NOTIFICATION_LIST_SPEC = ListSpec(
+    Notification,
+    filters={
+        "booking_id": ("eq", "in"),
+    },
+    sorts=("created_at",),
+)
+
 
 @router.post("/send-email", response_model=NotificationResponse)
 async def send_email_notification(
@@ -76,10 +87,14 @@ async def send_booking_notification(
 
 @router.get("", response_model=List[NotificationResponse])
 def list_notifications(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     booking_id: int = None,
     notification_type: NotificationType = None,
+    filters: List[str] = Query([], alias="filter", description="Filters as field:operator:value"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort keys, prefix with - for descending"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -92,7 +107,12 @@ def list_notifications(
     if notification_type:
         query = query.filter(Notification.notification_type == notification_type)
 
-    notifications = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+    query = apply_filters(query, NOTIFICATION_LIST_SPEC, filters)
+
+    notifications, next_cursor = paginate(query, sort_keys(NOTIFICATION_LIST_SPEC, sort), limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
     return notifications
 
 
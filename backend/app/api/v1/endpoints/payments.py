@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, Header, HTTPException, status, UploadFile, File, Query, Request, Response
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
+from decimal import Decimal
 from typing import List, Optional
 import uuid
 import os
@@ -10,15 +12,49 @@ from app.models.user import User
 from app.models.payment import Payment
 from app.models.booking import Booking
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
+from app.utils.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate
+from app.utils.filters import ListSpec, apply_filters, sort_keys
+from app.utils.etag import check_version, version_conflicts
+from app.services.idempotency import idempotency_keys, request_fingerprint
 
 router = APIRouter()
 
+# Filters and sort keys accepted by the list endpoint, all backed by indexes
+PAYMENT_LIST_SPEC = ListSpec(
+    Payment,
+    filters={
+        "booking_id": ("eq", "in"),
+        "payment_date": ("range",),
+        "receipt_number": ("eq",),
+    },
+    sorts=("created_at", "payment_date"),
+)
+
+
+def adjust_paid_amount(db: Session, booking_id: int, delta: Decimal) -> None:
+    """Add ``delta`` to a booking's paid amount in one UPDATE.
+
+    The addition happens in the database, so concurrent payments on a
+    booking all count and never conflict with an edit of the booking.
+    """
+    db.execute(
+        update(Booking).where(Booking.id == booking_id).values(
+            paid_amount=func.coalesce(Booking.paid_amount, 0) + delta,
+            version=Booking.version + 1
+        ),
+        execution_options={"synchronize_session": False}
+    )
+
 
 @router.get("/", response_model=List[PaymentResponse])
 def list_payments(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     booking_id: Optional[int] = None,
+    filters: List[str] = Query([], alias="filter", description="Filters as field:operator:value"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort keys, prefix with - for descending"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -28,17 +64,34 @@ def list_payments(
     if booking_id:
         query = query.filter(Payment.booking_id == booking_id)
 
-    payments = query.order_by(Payment.created_at.desc()).offset(skip).limit(limit).all()
+    query = apply_filters(query, PAYMENT_LIST_SPEC, filters)
+
+    payments, next_cursor = paginate(query, sort_keys(PAYMENT_LIST_SPEC, sort), limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
     return payments
 
 
 @router.post("/", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
 def create_payment(
     payment_data: PaymentCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Create a new payment record."""
+    """Create a new payment record.
+
+    Retries sent with the same Idempotency-Key get the stored response of
+    the first request, so the booking's paid amount is only raised once.
+    """
+    if idempotency_key:
+        replay = idempotency_keys.claim(
+            db, current_user.account_id, idempotency_key, request_fingerprint("POST /payments", payment_data)
+        )
+        if replay:
+            return replay
+
     # Verify booking exists and belongs to user's account
     booking = db.query(Booking).filter(
         Booking.id == payment_data.booking_id,
@@ -61,7 +114,15 @@ def create_payment(
     db.add(payment)
 
     # Update booking paid amount
-    booking.paid_amount = (booking.paid_amount or 0) + payment.amount
+    adjust_paid_amount(db, booking.id, payment.amount)
+
+    if idempotency_key:
+        # The response is stored in the key row, committed with the payment
+        db.flush()
+        db.refresh(payment)
+        return idempotency_keys.complete(
+            db, current_user.account_id, idempotency_key, PaymentResponse.model_validate(payment)
+        )
 
     db.commit()
     db.refresh(payment)
@@ -94,10 +155,11 @@ def get_payment(
 def update_payment(
     payment_id: int,
     payment_data: PaymentUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Update payment."""
+    """Update payment. Honours If-Match like booking updates."""
     payment = db.query(Payment).filter(
         Payment.id == payment_id,
         Payment.account_id == current_user.account_id
@@ -109,6 +171,8 @@ def update_payment(
             detail="Payment not found"
         )
 
+    check_version(request, payment, "Payment")
+
     # Store old amount for booking update
     old_amount = payment.amount
 
@@ -118,11 +182,10 @@ def update_payment(
 
     # Update booking paid amount if payment amount changed
     if payment_data.amount is not None and payment_data.amount != old_amount:
-        booking = db.query(Booking).filter(Booking.id == payment.booking_id).first()
-        if booking:
-            booking.paid_amount = (booking.paid_amount or 0) - old_amount + payment.amount
+        adjust_paid_amount(db, payment.booking_id, payment.amount - old_amount)
 
-    db.commit()
+    with version_conflicts(db, "Payment"):
+        db.commit()
     db.refresh(payment)
 
     return payment
@@ -147,16 +210,15 @@ def delete_payment(
         )
 
     # Update booking paid amount
-    booking = db.query(Booking).filter(Booking.id == payment.booking_id).first()
-    if booking:
-        booking.paid_amount = (booking.paid_amount or 0) - payment.amount
+    adjust_paid_amount(db, payment.booking_id, -payment.amount)
 
     # Delete file if exists
     if payment.receipt_file_path and os.path.exists(payment.receipt_file_path):
         os.remove(payment.receipt_file_path)
 
     db.delete(payment)
-    db.commit()
+    with version_conflicts(db, "Payment"):
+        db.commit()
 
     return None
 
@@ -213,7 +275,8 @@ async def upload_payment_receipt(
     # Update payment
     payment.receipt_file_path = file_path
 
-    db.commit()
+    with version_conflicts(db, "Payment"):
+        db.commit()
     db.refresh(payment)
 
     return payment
@@ -1,39 +1,163 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import exists, func, literal_column, select
+from typing import List, Optional, Union
+from datetime import datetime
 import os
 import uuid
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_permission
 from app.models.user import User
 from app.models.resource import Car, Driver, TourRep
+from app.models.booking import Booking, booking_period, resource_blocked
 from app.schemas.resource import (
     CarCreate, CarUpdate, CarResponse,
     DriverCreate, DriverUpdate, DriverResponse,
-    TourRepCreate, TourRepUpdate, TourRepResponse
+    TourRepCreate, TourRepUpdate, TourRepResponse,
+    ResourceType
 )
 from app.core.config import settings
 from app.services.storage import storage_service
+from app.utils.fields import parse_fields, load_only_columns, sparse_response
+from app.utils.batch import parse_ids, in_id_order
+from app.utils.filters import ListSpec, apply_filters, sort_keys
+from app.utils.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate
+from app.utils.etag import (
+    row_version, request_etag, entity_etag, tenant_watermark, not_modified, check_version, version_conflicts
+)
 
 router = APIRouter()
 
+# Filters and sort keys accepted by the list endpoints, all backed by indexes.
+# Resources are listed in creation order (by id) unless sorted otherwise.
+CAR_LIST_SPEC = ListSpec(
+    Car,
+    filters={"registration_number": ("eq", "prefix")},
+    sorts=("id", "registration_number"),
+    default_sort=((Car.id, False),),
+)
+DRIVER_LIST_SPEC = ListSpec(
+    Driver,
+    filters={"full_name": ("eq", "prefix"), "license_number": ("eq",)},
+    sorts=("id", "full_name"),
+    default_sort=((Driver.id, False),),
+)
+TOUR_REP_LIST_SPEC = ListSpec(
+    TourRep,
+    filters={"full_name": ("eq", "prefix")},
+    sorts=("id", "full_name"),
+    default_sort=((TourRep.id, False),),
+)
+
+
+# Availability search: model, booking column and status flag per resource type
+AVAILABILITY_RESOURCES = {
+    ResourceType.CAR: (Car, Booking.car_id, Car.is_available),
+    ResourceType.DRIVER: (Driver, Booking.driver_id, Driver.is_available),
+    ResourceType.TOUR_REP: (TourRep, Booking.tour_rep_id, TourRep.is_active),
+}
+
+
+@router.get("/availability", response_model=Union[List[CarResponse], List[DriverResponse], List[TourRepResponse]])
+def get_available_resources(
+    response: Response,
+    window_start: datetime = Query(..., alias="from", description="Start of the window"),
+    window_end: datetime = Query(..., alias="to", description="End of the window (exclusive)"),
+    type: ResourceType = Query(ResourceType.CAR, description="Resource type: car, driver or tour_rep"),
+    min_seats: Optional[int] = Query(None, description="Minimum seating capacity (cars only)"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List resources with no active booking overlapping the window."""
+    if window_end <= window_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
+        )
+
+    if min_seats is not None and type != ResourceType.CAR:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_seats only applies to cars"
+        )
+
+    model, column, status_flag = AVAILABILITY_RESOURCES[type]
+    window = func.tstzrange(window_start, window_end, literal_column("'[)'"))
+
+    # Resources booked during the window, from one scan of the period GiST
+    # index. Materializing it keeps the planner from walking every booking
+    # of each resource in id order to satisfy a small LIMIT.
+    booked = select(column.label("resource_id")).where(
+        booking_period.op("&&")(window),
+        resource_blocked(column),
+        Booking.account_id == current_user.account_id
+    ).cte("booked").prefix_with("MATERIALIZED")
+
+    query = db.query(model).filter(
+        model.account_id == current_user.account_id,
+        status_flag == True,
+        ~exists().where(booked.c.resource_id == model.id)
+    )
+
+    if min_seats is not None:
+        query = query.filter(Car.seating_capacity >= min_seats)
+
+    resources, next_cursor = paginate(query, ((model.id, False),), limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return resources
+
 
 # Car Endpoints
 @router.get("/cars", response_model=List[CarResponse])
 def list_cars(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     available_only: bool = Query(False, description="Show only available cars"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    filters: List[str] = Query([], alias="filter", description="Filters as field:operator:value"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort keys, prefix with - for descending"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all cars."""
+    field_names = parse_fields(fields, CarResponse)
+    keys = sort_keys(CAR_LIST_SPEC, sort)
+
+    etag = request_etag(
+        request,
+        current_user.account_id,
+        *tenant_watermark(db, current_user.account_id, Car)
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
     query = db.query(Car).filter(Car.account_id == current_user.account_id)
 
+    if field_names:
+        query = query.options(
+            load_only_columns(Car, field_names, [column.key for column, _ in keys])
+        )
+
     if available_only:
         query = query.filter(Car.is_available == True)
 
-    cars = query.offset(skip).limit(limit).all()
+    query = apply_filters(query, CAR_LIST_SPEC, filters)
+
+    cars, next_cursor = paginate(query, keys, limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    if field_names:
+        return sparse_response(cars, CarResponse, field_names, response)
+
     return cars
 
 
@@ -63,17 +187,68 @@ def create_car(
     return car
 
 
+@router.get("/cars/batch", response_model=List[CarResponse])
+def get_cars_batch(
+    ids: str = Query(..., description="Comma-separated car ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get many cars by ID in one query. Unknown ids are skipped."""
+    car_ids = parse_ids(ids)
+    field_names = parse_fields(fields, CarResponse)
+
+    query = db.query(Car).filter(
+        Car.id.in_(car_ids),
+        Car.account_id == current_user.account_id
+    )
+
+    if field_names:
+        query = query.options(load_only_columns(Car, field_names))
+
+    cars = in_id_order(query.all(), car_ids)
+
+    if field_names:
+        return sparse_response(cars, CarResponse, field_names)
+
+    return cars
+
+
 @router.get("/cars/{car_id}", response_model=CarResponse)
 def get_car(
     car_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get car by ID."""
-    car = db.query(Car).filter(
+    field_names = parse_fields(fields, CarResponse)
+
+    versions = db.query(Car.version, row_version(Car)).filter(
         Car.id == car_id,
         Car.account_id == current_user.account_id
     ).first()
+    if versions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Car not found"
+        )
+
+    cached = not_modified(request, response, entity_etag(request, current_user.account_id, *versions))
+    if cached:
+        return cached
+
+    query = db.query(Car).filter(
+        Car.id == car_id,
+        Car.account_id == current_user.account_id
+    )
+
+    if field_names:
+        query = query.options(load_only_columns(Car, field_names))
+
+    car = query.first()
 
     if not car:
         raise HTTPException(
@@ -81,6 +256,9 @@ def get_car(
             detail="Car not found"
         )
 
+    if field_names:
+        return sparse_response(car, CarResponse, field_names, response)
+
     return car
 
 
@@ -88,6 +266,7 @@ def get_car(
 def update_car(
     car_id: int,
     car_data: CarUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("can_manage_resources"))
 ):
@@ -103,11 +282,14 @@ def update_car(
             detail="Car not found"
         )
 
+    check_version(request, car, "Car")
+
     update_data = car_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(car, field, value)
 
-    db.commit()
+    with version_conflicts(db, "Car"):
+        db.commit()
     db.refresh(car)
 
     return car
@@ -132,7 +314,8 @@ def delete_car(
         )
 
     db.delete(car)
-    db.commit()
+    with version_conflicts(db, "Car"):
+        db.commit()
 
     return None
 
@@ -182,7 +365,8 @@ async def upload_car_image(
 
     # Update car with image path
     car.image_path = file_path
-    db.commit()
+    with version_conflicts(db, "Car"):
+        db.commit()
     db.refresh(car)
 
     return car
@@ -191,19 +375,50 @@ async def upload_car_image(
 # Driver Endpoints
 @router.get("/drivers", response_model=List[DriverResponse])
 def list_drivers(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     available_only: bool = Query(False, description="Show only available drivers"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    filters: List[str] = Query([], alias="filter", description="Filters as field:operator:value"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort keys, prefix with - for descending"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all drivers."""
+    field_names = parse_fields(fields, DriverResponse)
+    keys = sort_keys(DRIVER_LIST_SPEC, sort)
+
+    etag = request_etag(
+        request,
+        current_user.account_id,
+        *tenant_watermark(db, current_user.account_id, Driver)
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
     query = db.query(Driver).filter(Driver.account_id == current_user.account_id)
 
+    if field_names:
+        query = query.options(
+            load_only_columns(Driver, field_names, [column.key for column, _ in keys])
+        )
+
     if available_only:
         query = query.filter(Driver.is_available == True)
 
-    drivers = query.offset(skip).limit(limit).all()
+    query = apply_filters(query, DRIVER_LIST_SPEC, filters)
+
+    drivers, next_cursor = paginate(query, keys, limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    if field_names:
+        return sparse_response(drivers, DriverResponse, field_names, response)
+
     return drivers
 
 
@@ -233,17 +448,68 @@ def create_driver(
     return driver
 
 
+@router.get("/drivers/batch", response_model=List[DriverResponse])
+def get_drivers_batch(
+    ids: str = Query(..., description="Comma-separated driver ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get many drivers by ID in one query. Unknown ids are skipped."""
+    driver_ids = parse_ids(ids)
+    field_names = parse_fields(fields, DriverResponse)
+
+    query = db.query(Driver).filter(
+        Driver.id.in_(driver_ids),
+        Driver.account_id == current_user.account_id
+    )
+
+    if field_names:
+        query = query.options(load_only_columns(Driver, field_names))
+
+    drivers = in_id_order(query.all(), driver_ids)
+
+    if field_names:
+        return sparse_response(drivers, DriverResponse, field_names)
+
+    return drivers
+
+
 @router.get("/drivers/{driver_id}", response_model=DriverResponse)
 def get_driver(
     driver_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get driver by ID."""
-    driver = db.query(Driver).filter(
+    field_names = parse_fields(fields, DriverResponse)
+
+    versions = db.query(Driver.version, row_version(Driver)).filter(
         Driver.id == driver_id,
         Driver.account_id == current_user.account_id
     ).first()
+    if versions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Driver not found"
+        )
+
+    cached = not_modified(request, response, entity_etag(request, current_user.account_id, *versions))
+    if cached:
+        return cached
+
+    query = db.query(Driver).filter(
+        Driver.id == driver_id,
+        Driver.account_id == current_user.account_id
+    )
+
+    if field_names:
+        query = query.options(load_only_columns(Driver, field_names))
+
+    driver = query.first()
 
     if not driver:
         raise HTTPException(
@@ -251,6 +517,9 @@ def get_driver(
             detail="Driver not found"
         )
 
+    if field_names:
+        return sparse_response(driver, DriverResponse, field_names, response)
+
     return driver
 
 
@@ -258,6 +527,7 @@ def get_driver(
 def update_driver(
     driver_id: int,
     driver_data: DriverUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("can_manage_resources"))
 ):
@@ -273,11 +543,14 @@ def update_driver(
             detail="Driver not found"
         )
 
+    check_version(request, driver, "Driver")
+
     update_data = driver_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(driver, field, value)
 
-    db.commit()
+    with version_conflicts(db, "Driver"):
+        db.commit()
     db.refresh(driver)
 
     return driver
@@ -302,7 +575,8 @@ def delete_driver(
         )
 
     db.delete(driver)
-    db.commit()
+    with version_conflicts(db, "Driver"):
+        db.commit()
 
     return None
 
@@ -310,19 +584,50 @@ def delete_driver(
 # Tour Rep Endpoints
 @router.get("/tour-reps", response_model=List[TourRepResponse])
 def list_tour_reps(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     active_only: bool = Query(False, description="Show only active tour reps"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    filters: List[str] = Query([], alias="filter", description="Filters as field:operator:value"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort keys, prefix with - for descending"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all tour reps."""
+    field_names = parse_fields(fields, TourRepResponse)
+    keys = sort_keys(TOUR_REP_LIST_SPEC, sort)
+
+    etag = request_etag(
+        request,
+        current_user.account_id,
+        *tenant_watermark(db, current_user.account_id, TourRep)
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
     query = db.query(TourRep).filter(TourRep.account_id == current_user.account_id)
 
+    if field_names:
+        query = query.options(
+            load_only_columns(TourRep, field_names, [column.key for column, _ in keys])
+        )
+
     if active_only:
         query = query.filter(TourRep.is_active == True)
 
-    tour_reps = query.offset(skip).limit(limit).all()
+    query = apply_filters(query, TOUR_REP_LIST_SPEC, filters)
+
+    tour_reps, next_cursor = paginate(query, keys, limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    if field_names:
+        return sparse_response(tour_reps, TourRepResponse, field_names, response)
+
     return tour_reps
 
 
@@ -340,17 +645,68 @@ def create_tour_rep(
     return tour_rep
 
 
+@router.get("/tour-reps/batch", response_model=List[TourRepResponse])
+def get_tour_reps_batch(
+    ids: str = Query(..., description="Comma-separated tour rep ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get many tour reps by ID in one query. Unknown ids are skipped."""
+    tour_rep_ids = parse_ids(ids)
+    field_names = parse_fields(fields, TourRepResponse)
+
+    query = db.query(TourRep).filter(
+        TourRep.id.in_(tour_rep_ids),
+        TourRep.account_id == current_user.account_id
+    )
+
+    if field_names:
+        query = query.options(load_only_columns(TourRep, field_names))
+
+    tour_reps = in_id_order(query.all(), tour_rep_ids)
+
+    if field_names:
+        return sparse_response(tour_reps, TourRepResponse, field_names)
+
+    return tour_reps
+
+
 @router.get("/tour-reps/{tour_rep_id}", response_model=TourRepResponse)
 def get_tour_rep(
     tour_rep_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get tour rep by ID."""
-    tour_rep = db.query(TourRep).filter(
+    field_names = parse_fields(fields, TourRepResponse)
+
+    versions = db.query(TourRep.version, row_version(TourRep)).filter(
         TourRep.id == tour_rep_id,
         TourRep.account_id == current_user.account_id
     ).first()
+    if versions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tour rep not found"
+        )
+
+    cached = not_modified(request, response, entity_etag(request, current_user.account_id, *versions))
+    if cached:
+        return cached
+
+    query = db.query(TourRep).filter(
+        TourRep.id == tour_rep_id,
+        TourRep.account_id == current_user.account_id
+    )
+
+    if field_names:
+        query = query.options(load_only_columns(TourRep, field_names))
+
+    tour_rep = query.first()
 
     if not tour_rep:
         raise HTTPException(
@@ -358,6 +714,9 @@ def get_tour_rep(
             detail="Tour rep not found"
         )
 
+    if field_names:
+        return sparse_response(tour_rep, TourRepResponse, field_names, response)
+
     return tour_rep
 
 
@@ -365,6 +724,7 @@ def get_tour_rep(
 def update_tour_rep(
     tour_rep_id: int,
     tour_rep_data: TourRepUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("can_manage_resources"))
 ):
@@ -380,11 +740,14 @@ def update_tour_rep(
             detail="Tour rep not found"
         )
 
+    check_version(request, tour_rep, "Tour rep")
+
     update_data = tour_rep_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(tour_rep, field, value)
 
-    db.commit()
+    with version_conflicts(db, "Tour rep"):
+        db.commit()
     db.refresh(tour_rep)
 
     return tour_rep
@@ -409,6 +772,7 @@ def delete_tour_rep(
         )
 
     db.delete(tour_rep)
-    db.commit()
+    with version_conflicts(db, "Tour rep"):
+        db.commit()
 
     return None
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
@@ -6,19 +6,33 @@ from app.core.deps import get_current_user, require_permission
 from app.models.user import User
 from app.models.template import Template, TemplateField
 from app.schemas.template import TemplateCreate, TemplateUpdate, TemplateResponse, TemplateFieldCreate
+from app.services.field_validation import field_validators
+from app.utils.etag import row_version, request_etag, tenant_watermark, not_modified
+from app.utils.pagination import MAX_PAGE_SIZE
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TemplateResponse])
 def list_templates(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
     active_only: bool = True,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all templates."""
+    etag = request_etag(
+        request,
+        current_user.account_id,
+        *tenant_watermark(db, current_user.account_id, Template)
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
     query = db.query(Template).filter(Template.account_id == current_user.account_id)
 
     if active_only:
@@ -55,10 +69,26 @@ def create_template(
 @router.get("/{template_id}", response_model=TemplateResponse)
 def get_template(
     template_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get template by ID."""
+    version = db.query(row_version(Template)).filter(
+        Template.id == template_id,
+        Template.account_id == current_user.account_id
+    ).scalar()
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Template not found"
+        )
+
+    cached = not_modified(request, response, request_etag(request, current_user.account_id, version))
+    if cached:
+        return cached
+
     template = db.query(Template).filter(
         Template.id == template_id,
         Template.account_id == current_user.account_id
@@ -97,6 +127,7 @@ def update_template(
         setattr(template, field, value)
 
     db.commit()
+    field_validators.invalidate(template.id)
     db.refresh(template)
 
     return template
@@ -122,5 +153,6 @@ def delete_template(
 
     db.delete(template)
     db.commit()
+    field_validators.invalidate(template_id)
 
     return None
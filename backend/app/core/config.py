@@ -22,6 +22,35 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 10485760  # 10MB
     ALLOWED_EXTENSIONS: set = {".jpg", ".jpeg", ".png", ".pdf"}
 
+    # Automatic car/driver assignment: booking fields holding the party size
+    # and the language the driver should speak
+    ASSIGNMENT_SEATS_FIELD: str = "passengers"
+    ASSIGNMENT_LANGUAGE_FIELD: str = "language"
+
+    # Where booking field values are written and filtered: "rows" keeps one
+    # booking_field_values row per field, "jsonb" a document on the booking.
+    # Reads work with either. After switching to "jsonb", run
+    # backfill_field_data.py to move bookings written in "rows" mode.
+    BOOKING_FIELD_STORAGE: str = "rows"
+
+    # Booking numbers each worker reserves per round trip to the database.
+    # Numbers left in a block when a worker stops are never used.
+    BOOKING_NUMBER_BLOCK_SIZE: int = 20
+
+    # Seconds between passes moving confirmed bookings to ongoing and
+    # completed as their dates pass. 0 disables the in-process job, e.g.
+    # when advance_bookings.py runs from cron instead.
+    BOOKING_LIFECYCLE_INTERVAL: int = 60
+
+    # Seconds a worker keeps a template's compiled field validator. Template
+    # writes refresh it at once in the worker that made them; other workers
+    # pick the change up within this time.
+    FIELD_VALIDATOR_TTL_SECONDS: int = 60
+
+    # Hours a create request's Idempotency-Key is remembered; older keys
+    # may be reused and are deleted by purge_idempotency_keys.py
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:5173", "http://localhost:3000"]
 
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -16,3 +16,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def prefix_index(name: str, column) -> Index:
+    """Index serving case-insensitive prefix filters (lower(column) LIKE 'x%')."""
+    expression = func.lower(column).label(f"lower_{column.key}")
+    return Index(name, expression, postgresql_ops={expression.name: "text_pattern_ops"})
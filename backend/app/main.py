@@ -1,11 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
+import contextlib
 import os
 
 from app.core.config import settings
 from app.core.database import engine, Base
 from app.api.v1.router import api_router
+from app.services.lifecycle import booking_lifecycle
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -24,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Create uploads directory
@@ -37,6 +42,28 @@ if os.path.exists(settings.UPLOAD_DIR):
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.on_event("startup")
+async def start_booking_lifecycle():
+    """Advance booking statuses in the background."""
+    # The event loop only keeps a weak reference to tasks
+    app.state.booking_lifecycle_task = None
+    if settings.BOOKING_LIFECYCLE_INTERVAL > 0:
+        app.state.booking_lifecycle_task = asyncio.create_task(
+            booking_lifecycle.run_forever(settings.BOOKING_LIFECYCLE_INTERVAL)
+        )
+
+
+@app.on_event("shutdown")
+async def stop_booking_lifecycle():
+    """Cancel the background lifecycle job and wait for it to stop."""
+    task = getattr(app.state, "booking_lifecycle_task", None)
+    if task is None:
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
 @app.get("/")
 def root():
     """Root endpoint."""
@@ -2,11 +2,13 @@ from app.models.company import Company
 from app.models.user import User
 from app.models.customer import Customer
 from app.models.template import Template, TemplateField
-from app.models.booking import Booking, BookingPhoto, BookingFieldValue
+from app.models.booking import Booking, BookingPhoto, BookingFieldValue, BookingNumberSequence, BookingDailyRollup
 from app.models.resource import Car, Driver, TourRep
 from app.models.payment import Payment
 from app.models.notification import Notification, NotificationType, NotificationStatus
 from app.models.audit_log import AuditLog, AuditAction, AuditResourceType
+from app.models.idempotency import IdempotencyKey
+from app.models.change_delta import ChangeDelta
 
 __all__ = [
     "Company",
@@ -17,6 +19,8 @@ __all__ = [
     "Booking",
     "BookingPhoto",
     "BookingFieldValue",
+    "BookingNumberSequence",
+    "BookingDailyRollup",
     "Car",
     "Driver",
     "TourRep",
@@ -27,4 +31,6 @@ __all__ = [
     "AuditLog",
     "AuditAction",
     "AuditResourceType",
+    "IdempotencyKey",
+    "ChangeDelta",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -26,6 +26,10 @@ class AuditResourceType(str, enum.Enum):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_audit_logs_account_id_created_at_id", "account_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Numeric, Enum, JSON
+from sqlalchemy import BigInteger, Column, DDL, Integer, String, Date, DateTime, Text, ForeignKey, Numeric, Enum, JSON, Index, UniqueConstraint, CheckConstraint, event
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from app.core.database import Base
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, JSONB
+from sqlalchemy.sql import case, cast, func, literal_column
+from sqlalchemy.sql.elements import Grouping
+from app.core.database import Base, prefix_index
 import enum
 
 
@@ -13,30 +15,54 @@ class BookingStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+# Statuses a booking may move to from each status. Completed and cancelled
+# bookings are final.
+BOOKING_STATUS_TRANSITIONS = {
+    BookingStatus.PENDING: {BookingStatus.CONFIRMED, BookingStatus.CANCELLED},
+    BookingStatus.CONFIRMED: {BookingStatus.ONGOING, BookingStatus.COMPLETED, BookingStatus.CANCELLED},
+    BookingStatus.ONGOING: {BookingStatus.COMPLETED, BookingStatus.CANCELLED},
+    BookingStatus.COMPLETED: set(),
+    BookingStatus.CANCELLED: set(),
+}
+
+
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_bookings_account_id_created_at_id", "account_id", "created_at", "id"),
+        # Filtering and sorting by start date
+        Index("ix_bookings_account_id_start_date_id", "account_id", "start_date", "id"),
+        # Lifecycle job: confirmed bookings whose start or end has passed
+        Index("ix_bookings_status_start_date", "status", "start_date"),
+        Index("ix_bookings_status_end_date", "status", "end_date"),
+        # Booking numbers are allocated per tenant
+        UniqueConstraint("account_id", "booking_number", name="uq_bookings_account_id_booking_number"),
+        # A booking's period must be a valid range for booking_period
+        CheckConstraint("end_date >= start_date", name="ck_bookings_end_date_after_start_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(String, default="default", nullable=False, index=True)
-    booking_number = Column(String, unique=True, nullable=False, index=True)
+    booking_number = Column(String, nullable=False)
 
     # Template
-    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
     template = relationship("Template")
 
     # Customer
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
     customer = relationship("Customer")
 
     # Tour Rep
-    tour_rep_id = Column(Integer, ForeignKey("tour_reps.id"), nullable=False)
+    tour_rep_id = Column(Integer, ForeignKey("tour_reps.id"), nullable=False, index=True)
     tour_rep = relationship("TourRep")
 
     # Resources (optional, depending on template)
-    car_id = Column(Integer, ForeignKey("cars.id"), nullable=True)
+    car_id = Column(Integer, ForeignKey("cars.id"), nullable=True, index=True)
     car = relationship("Car")
 
-    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=True, index=True)
     driver = relationship("Driver")
 
     # Dates
@@ -44,7 +70,7 @@ class Booking(Base):
     end_date = Column(DateTime(timezone=True), nullable=False)
 
     # Status
-    status = Column(Enum(BookingStatus), default=BookingStatus.PENDING, nullable=False, index=True)
+    status = Column(Enum(BookingStatus), default=BookingStatus.PENDING, nullable=False)
 
     # Financial
     total_amount = Column(Numeric(10, 2))
@@ -58,8 +84,10 @@ class Booking(Base):
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User")
 
-    # Dynamic field values
+    # Dynamic field values, either one row per field or, when field_data is
+    # set, a JSONB document {field_name: {"id", "value", "created_at"}}
     field_values = relationship("BookingFieldValue", back_populates="booking", cascade="all, delete-orphan")
+    field_data = Column(JSONB(none_as_null=True), nullable=True)
 
     # Photos
     photos = relationship("BookingPhoto", back_populates="booking", cascade="all, delete-orphan")
@@ -67,9 +95,95 @@ class Booking(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Optimistic concurrency: each UPDATE checks the version it read and bumps it
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    @property
+    def field_value_list(self) -> list:
+        """Field values in API form, from whichever storage holds them."""
+        if self.field_data is not None:
+            return sorted((
+                {
+                    "id": entry["id"],
+                    "field_name": name,
+                    "field_value": entry["value"],
+                    "created_at": entry["created_at"],
+                }
+                for name, entry in self.field_data.items()
+            ), key=lambda entry: entry["id"])
+        return sorted(self.field_values, key=lambda field_value: field_value.id)
+
+    @property
+    def field_value_map(self) -> dict:
+        """Field values by name, from whichever storage holds them."""
+        if self.field_data is not None:
+            return {name: entry["value"] for name, entry in self.field_data.items()}
+        return {field_value.field_name: field_value.field_value for field_value in self.field_values}
+
+
+# Containment lookups (field_data @> '{"name": {"value": ...}}') on field documents
+Index(
+    "ix_bookings_field_data",
+    Booking.field_data,
+    postgresql_using="gin",
+    postgresql_ops={"field_data": "jsonb_path_ops"},
+)
+
+# Half-open [start_date, end_date) period of a booking. Overlap queries must
+# use this exact expression so Postgres can answer them from the GiST index.
+booking_period = func.tstzrange(Booking.start_date, Booking.end_date, literal_column("'[)'"))
+
+Index("ix_bookings_period", booking_period, postgresql_using="gist")
+
+
+def resource_key(column):
+    """Single-point int4range of a resource id.
+
+    Wrapping the id in a range lets the overlap constraints index it with
+    the built-in GiST range operator classes.
+    """
+    return func.int4range(column, column, literal_column("'[]'"))
+
+
+def resource_blocked(column):
+    """Condition for bookings that occupy their resource, as the overlap constraints see them."""
+    return (column.isnot(None)) & (Booking.status != BookingStatus.CANCELLED)
+
+
+def resource_overlap_constraint(name: str, column) -> ExcludeConstraint:
+    """Reject two active bookings of the same resource with overlapping periods.
+
+    Postgres checks it with one index probe per write and serializes
+    concurrent writers on the conflicting key, so overlaps cannot slip in
+    between two transactions.
+    """
+    return ExcludeConstraint(
+        (resource_key(column), "&&"),
+        (booking_period, "&&"),
+        name=name,
+        using="gist",
+        where=resource_blocked(column),
+    )
+
+
+Booking.__table__.append_constraint(resource_overlap_constraint("ex_bookings_car_overlap", Booking.car_id))
+Booking.__table__.append_constraint(resource_overlap_constraint("ex_bookings_driver_overlap", Booking.driver_id))
+
+# Errors Postgres raises when a write breaks, or races on, the overlap constraints
+EXCLUSION_VIOLATION = "23P01"
+DEADLOCK_DETECTED = "40P01"
+
+prefix_index("ix_bookings_booking_number_prefix", Booking.booking_number)
+
 
 class BookingFieldValue(Base):
     __tablename__ = "booking_field_values"
+    __table_args__ = (
+        # One value per field; the target of field value upserts
+        UniqueConstraint("booking_id", "field_name", name="uq_booking_field_values_booking_id_field_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False)
@@ -84,11 +198,177 @@ class BookingFieldValue(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+# Indexed expressions for filtering bookings by dynamic field values. Values
+# are stored as text, so numbers and dates only take part in typed
+# comparisons when the stored text parses as one. Dates and datetimes are
+# compared as ISO-8601 text, which sorts chronologically.
+FIELD_VALUE_TEXT_LENGTH = 200
+NUMBER_PATTERN = r"^-?[0-9]+(\.[0-9]+)?$"
+DATE_PATTERN = r"^[0-9]{4}-[0-9]{2}-[0-9]{2}"
+
+
+def field_text(value):
+    """Lowercased leading part of a field value, for exact and prefix matches."""
+    return func.lower(func.left(value, literal_column(str(FIELD_VALUE_TEXT_LENGTH))))
+
+
+def field_number(value):
+    """A field value as a number, or NULL when it is not numeric."""
+    return case((value.op("~")(literal_column(f"'{NUMBER_PATTERN}'")), cast(value, Numeric)))
+
+
+def field_moment(value):
+    """A date or datetime field value as sortable ISO text, or NULL."""
+    return case(
+        (
+            value.op("~")(literal_column(f"'{DATE_PATTERN}'")),
+            func.replace(
+                func.left(value, literal_column("19")),
+                literal_column("' '"),
+                literal_column("'T'"),
+            ),
+        )
+    )
+
+
+field_value_text = field_text(BookingFieldValue.field_value)
+field_value_number = field_number(BookingFieldValue.field_value)
+field_value_moment = field_moment(BookingFieldValue.field_value)
+
+Index(
+    "ix_booking_field_values_name_text",
+    BookingFieldValue.field_name,
+    field_value_text.label("field_value_text"),
+    postgresql_ops={"field_value_text": "text_pattern_ops"},
+)
+Index("ix_booking_field_values_name_number", BookingFieldValue.field_name, Grouping(field_value_number))
+Index("ix_booking_field_values_name_moment", BookingFieldValue.field_name, Grouping(field_value_moment))
+
+
+class BookingNumberSequence(Base):
+    """Last booking number handed out per tenant and day."""
+    __tablename__ = "booking_number_sequences"
+
+    account_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+
+
+# UTC calendar day a booking starts on, the day it is rolled up under
+booking_day = cast(func.timezone("UTC", Booking.start_date), Date)
+
+
+class BookingDailyRollup(Base):
+    """Count and amounts of a tenant's bookings per start day and dimension.
+
+    Triggers on bookings keep the rollup in step with every write, so
+    sums over it match sums over the bookings they cover. Buckets that
+    empty out stay behind with zero counts until the rollup is rebuilt.
+    """
+    __tablename__ = "booking_daily_rollups"
+    __table_args__ = (
+        # One bucket per key; the target of the triggers' upserts
+        UniqueConstraint(
+            "account_id", "day", "status", "template_id", "tour_rep_id", "car_id", "driver_id",
+            name="uq_booking_daily_rollups_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    account_id = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+    status = Column(Enum(BookingStatus), nullable=False)
+    template_id = Column(Integer, nullable=False)
+    tour_rep_id = Column(Integer, nullable=False)
+    car_id = Column(Integer, nullable=True)
+    driver_id = Column(Integer, nullable=True)
+
+    booking_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    paid_amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+ROLLUP_KEY = "account_id, day, status, template_id, tour_rep_id, car_id, driver_id"
+ROLLUP_ROWS = (
+    "SELECT account_id, (start_date AT TIME ZONE 'UTC')::date AS day, status, template_id, "
+    "tour_rep_id, car_id, driver_id, {sign} AS sign, total_amount, paid_amount FROM {rows}"
+)
+
+
+def rollup_upsert(*changes: str) -> str:
+    """Statement adding signed booking rows to their rollup buckets.
+
+    Net-zero changes, such as updates to notes, write nothing. Buckets
+    are upserted in key order so concurrent statements lock them in the
+    same order.
+    """
+    return f"""
+        WITH changes AS ({" UNION ALL ".join(changes)})
+        INSERT INTO booking_daily_rollups AS r ({ROLLUP_KEY}, booking_count, total_amount, paid_amount)
+        SELECT {ROLLUP_KEY}, sum(sign), coalesce(sum(sign * total_amount), 0), coalesce(sum(sign * paid_amount), 0)
+        FROM changes
+        GROUP BY {ROLLUP_KEY}
+        HAVING sum(sign) <> 0 OR sum(sign * total_amount) <> 0 OR sum(sign * paid_amount) <> 0
+        ORDER BY {ROLLUP_KEY}
+        ON CONFLICT ({ROLLUP_KEY}) DO UPDATE SET
+            booking_count = r.booking_count + excluded.booking_count,
+            total_amount = r.total_amount + excluded.total_amount,
+            paid_amount = r.paid_amount + excluded.paid_amount
+    """
+
+
+inserted_rows = ROLLUP_ROWS.format(sign=1, rows="new_rows")
+deleted_rows = ROLLUP_ROWS.format(sign=-1, rows="old_rows")
+
+# Statement-level triggers see each statement's rows as transition tables,
+# so a bulk insert or set-based update costs one upsert per touched bucket
+CREATE_ROLLUP_TRIGGERS = f"""
+CREATE FUNCTION booking_daily_rollups_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {rollup_upsert(inserted_rows)};
+    ELSIF TG_OP = 'DELETE' THEN
+        {rollup_upsert(deleted_rows)};
+    ELSE
+        {rollup_upsert(deleted_rows, inserted_rows)};
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER bookings_rollup_insert AFTER INSERT ON bookings
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION booking_daily_rollups_apply();
+
+CREATE TRIGGER bookings_rollup_update AFTER UPDATE ON bookings
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION booking_daily_rollups_apply();
+
+CREATE TRIGGER bookings_rollup_delete AFTER DELETE ON bookings
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION booking_daily_rollups_apply();
+"""
+
+DROP_ROLLUP_TRIGGERS = """
+DROP TRIGGER IF EXISTS bookings_rollup_insert ON bookings;
+DROP TRIGGER IF EXISTS bookings_rollup_update ON bookings;
+DROP TRIGGER IF EXISTS bookings_rollup_delete ON bookings;
+DROP FUNCTION IF EXISTS booking_daily_rollups_apply();
+"""
+
+# Tables made by create_all get the triggers, and existing bookings, with the rollup
+BookingDailyRollup.__table__.add_is_dependent_on(Booking.__table__)
+event.listen(BookingDailyRollup.__table__, "after_create", DDL(CREATE_ROLLUP_TRIGGERS))
+event.listen(BookingDailyRollup.__table__, "after_create", DDL(rollup_upsert(ROLLUP_ROWS.format(sign=1, rows="bookings"))))
+event.listen(BookingDailyRollup.__table__, "before_drop", DDL(DROP_ROLLUP_TRIGGERS))
+
+
 class BookingPhoto(Base):
     __tablename__ = "booking_photos"
 
     id = Column(Integer, primary_key=True, index=True)
-    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False, index=True)
 
     # Photo details
     file_path = Column(String, nullable=False)
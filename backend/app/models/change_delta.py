@@ -0,0 +1,92 @@
+from sqlalchemy import BigInteger, Column, DDL, Index, String, event
+from app.core.database import Base
+from app.models.booking import Booking
+from app.models.customer import Customer
+from app.models.resource import Car, Driver, TourRep
+from app.models.template import Template
+
+
+class ChangeDelta(Base):
+    """Write statements that touched a tenant's rows in one table.
+
+    Triggers append a row in the transaction of every INSERT, UPDATE and
+    DELETE; nothing updates an existing row, so concurrent writers never
+    wait on each other here. The sum of ``changes`` per tenant and table
+    only grows, which makes it a list watermark whatever order writers
+    commit in. Compaction folds the rows of each tenant and table into one
+    with the same sum.
+    """
+    __tablename__ = "change_deltas"
+    __table_args__ = (
+        # Watermark sums are answered from the index alone
+        Index(
+            "ix_change_deltas_account_id_table_name", "account_id", "table_name",
+            postgresql_include=["changes"]
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    account_id = Column(String, nullable=False)
+    table_name = Column(String, nullable=False)
+    changes = Column(BigInteger, nullable=False, server_default="1")
+
+
+# Tables whose lists are served with a tenant watermark
+COUNTED_MODELS = (Booking, Template, Customer, TourRep, Car, Driver)
+
+
+def delta_append(rows: str) -> str:
+    """Statement appending one delta for each tenant among a statement's rows."""
+    return f"""
+        INSERT INTO change_deltas (account_id, table_name)
+        SELECT DISTINCT account_id, TG_TABLE_NAME FROM {rows}
+    """
+
+
+CREATE_DELTA_FUNCTION = f"""
+CREATE FUNCTION change_deltas_append() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {delta_append("new_rows")};
+    ELSIF TG_OP = 'DELETE' THEN
+        {delta_append("old_rows")};
+    ELSE
+        {delta_append("(SELECT account_id FROM old_rows UNION SELECT account_id FROM new_rows) AS changed")};
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+# Trigger suffix, event and transition tables
+DELTA_TRIGGERS = (
+    ("insert", "INSERT", "NEW TABLE AS new_rows"),
+    ("update", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("delete", "DELETE", "OLD TABLE AS old_rows"),
+)
+
+
+def create_delta_triggers(table: str) -> str:
+    return "".join(
+        f"CREATE TRIGGER {table}_changes_{suffix} AFTER {event_name} ON {table} "
+        f"REFERENCING {transitions} FOR EACH STATEMENT EXECUTE FUNCTION change_deltas_append();\n"
+        for suffix, event_name, transitions in DELTA_TRIGGERS
+    )
+
+
+def drop_delta_triggers(table: str) -> str:
+    return "".join(
+        f"DROP TRIGGER IF EXISTS {table}_changes_{suffix} ON {table};\n" for suffix, _, _ in DELTA_TRIGGERS
+    )
+
+
+# Tables made by create_all get the triggers with the deltas
+for model in COUNTED_MODELS:
+    ChangeDelta.__table__.add_is_dependent_on(model.__table__)
+event.listen(ChangeDelta.__table__, "after_create", DDL(
+    CREATE_DELTA_FUNCTION + "".join(create_delta_triggers(model.__tablename__) for model in COUNTED_MODELS)
+))
+event.listen(ChangeDelta.__table__, "before_drop", DDL(
+    "".join(drop_delta_triggers(model.__tablename__) for model in COUNTED_MODELS)
+    + "DROP FUNCTION IF EXISTS change_deltas_append();"
+))
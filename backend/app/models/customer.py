@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, prefix_index
 
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_customers_account_id_created_at_id", "account_id", "created_at", "id"),
+        # Sorting by name
+        Index("ix_customers_account_id_full_name_id", "account_id", "full_name", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(String, default="default", nullable=False, index=True)
@@ -25,3 +31,8 @@ class Customer(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+prefix_index("ix_customers_full_name_prefix", Customer.full_name)
+prefix_index("ix_customers_email_prefix", Customer.email)
+prefix_index("ix_customers_phone_prefix", Customer.phone)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """Outcome of a create request sent with an Idempotency-Key header."""
+    __tablename__ = "idempotency_keys"
+
+    account_id = Column(String, primary_key=True)
+    key = Column(String(255), primary_key=True)
+
+    # Hash of the endpoint and request body the key was first used with
+    fingerprint = Column(String(64), nullable=False)
+
+    # Response replayed to retries; written in the same transaction as the work
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSONB(none_as_null=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
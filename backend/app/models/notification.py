@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -19,6 +19,10 @@ class NotificationStatus(str, enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_notifications_account_id_created_at_id", "account_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     notification_type = Column(SQLEnum(NotificationType), nullable=False)
@@ -29,7 +33,7 @@ class Notification(Base):
     error_message = Column(Text)
 
     # Optional references
-    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
 
     # Metadata
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Numeric, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Numeric, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -22,12 +22,18 @@ class PaymentStatus(str, enum.Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_payments_account_id_created_at_id", "account_id", "created_at", "id"),
+        # Filtering and sorting by payment date
+        Index("ix_payments_account_id_payment_date_id", "account_id", "payment_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(String, default="default", nullable=False, index=True)
 
     # Booking reference
-    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False, index=True)
     booking = relationship("Booking")
 
     # Payment details
@@ -53,3 +59,8 @@ class Payment(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Optimistic concurrency: each UPDATE checks the version it read and bumps it
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
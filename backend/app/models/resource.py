@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, Text
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, prefix_index
 
 
 class Car(Base):
@@ -28,6 +28,11 @@ class Car(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Optimistic concurrency: each UPDATE checks the version it read and bumps it
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
 
 class Driver(Base):
     __tablename__ = "drivers"
@@ -52,6 +57,11 @@ class Driver(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Optimistic concurrency: each UPDATE checks the version it read and bumps it
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
 
 class TourRep(Base):
     __tablename__ = "tour_reps"
@@ -73,3 +83,13 @@ class TourRep(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Optimistic concurrency: each UPDATE checks the version it read and bumps it
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+prefix_index("ix_cars_registration_number_prefix", Car.registration_number)
+prefix_index("ix_drivers_full_name_prefix", Driver.full_name)
+prefix_index("ix_tour_reps_full_name_prefix", TourRep.full_name)
@@ -46,7 +46,7 @@ class TemplateField(Base):
     __tablename__ = "template_fields"
 
     id = Column(Integer, primary_key=True, index=True)
-    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
 
     # Field Configuration
     field_name = Column(String, nullable=False)  # e.g., "pickup_date", "car"
@@ -1,13 +1,20 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 from decimal import Decimal
 from app.models.booking import BookingStatus
+import enum
 from app.schemas.customer import CustomerResponse
 from app.schemas.resource import CarResponse, DriverResponse, TourRepResponse
 from app.schemas.template import TemplateResponse
 
 
+class BookingListView(str, enum.Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+    INCLUDED = "included"
+
+
 class BookingFieldValueCreate(BaseModel):
     field_name: str
     field_value: str
@@ -53,6 +60,17 @@ class BookingCreate(BookingBase):
     field_values: List[BookingFieldValueCreate] = []
 
 
+class BookingSeriesCreate(BookingCreate):
+    """A booking repeated at each occurrence of an iCalendar recurrence rule.
+
+    start_date is the first occurrence, e.g. start_date="2026-03-02T09:00:00"
+    with rrule="FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20260331T000000Z". Naive dates
+    are taken as UTC and UNTIL must be given in UTC. Every booking lasts as
+    long as end_date - start_date.
+    """
+    rrule: str
+
+
 class BookingUpdate(BaseModel):
     template_id: Optional[int] = None
     customer_id: Optional[int] = None
@@ -78,6 +96,7 @@ class BookingResponse(BookingBase):
     created_by: int
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int
 
     # Relationships
     customer: CustomerResponse
@@ -85,13 +104,45 @@ class BookingResponse(BookingBase):
     car: Optional[CarResponse]
     driver: Optional[DriverResponse]
     template: TemplateResponse
-    field_values: List[BookingFieldValueResponse]
+    field_values: List[BookingFieldValueResponse] = Field(validation_alias="field_value_list")
     photos: List[BookingPhotoResponse]
 
     class Config:
         from_attributes = True
 
 
+class BookingCompactResponse(BookingBase):
+    """Booking that references its related entities by id only."""
+    id: int
+    booking_number: str
+    status: BookingStatus
+    paid_amount: Decimal
+    account_id: str
+    created_by: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+    version: int
+    field_values: List[BookingFieldValueResponse] = Field(validation_alias="field_value_list")
+    photos: List[BookingPhotoResponse]
+
+    class Config:
+        from_attributes = True
+
+
+class BookingIncluded(BaseModel):
+    """Distinct related entities referenced by a page of bookings."""
+    templates: List[TemplateResponse] = []
+    customers: List[CustomerResponse] = []
+    tour_reps: List[TourRepResponse] = []
+    cars: List[CarResponse] = []
+    drivers: List[DriverResponse] = []
+
+
+class BookingIncludedListResponse(BaseModel):
+    bookings: List[BookingCompactResponse]
+    included: BookingIncluded
+
+
 class BookingListResponse(BaseModel):
     id: int
     booking_number: str
@@ -106,3 +157,88 @@ class BookingListResponse(BaseModel):
     total_amount: Optional[Decimal]
     paid_amount: Decimal
     created_at: datetime
+
+
+# Column order of the event tuples returned by the calendar endpoint
+CALENDAR_EVENT_FIELDS = [
+    "id", "booking_number", "start_date", "end_date",
+    "status", "customer_name", "car_id", "driver_id",
+]
+
+
+class BookingCalendarResponse(BaseModel):
+    fields: List[str] = CALENDAR_EVENT_FIELDS
+    events: List[Tuple[int, str, datetime, datetime, BookingStatus, str, Optional[int], Optional[int]]]
+
+
+class BookingAssignmentRequest(BaseModel):
+    """Pending bookings starting in [start_date, end_date) to assign cars and drivers to."""
+    start_date: datetime
+    end_date: datetime
+    booking_ids: Optional[List[int]] = None
+    dry_run: bool = False
+
+
+class BookingAssignment(BaseModel):
+    booking_id: int
+    car_id: Optional[int] = None
+    driver_id: Optional[int] = None
+
+
+class BookingUnassigned(BaseModel):
+    booking_id: int
+    reasons: List[str]
+
+
+class BookingAssignmentResponse(BaseModel):
+    assigned: List[BookingAssignment]
+    unassigned: List[BookingUnassigned]
+    dry_run: bool
+
+
+class BookingBulkStatusRequest(BaseModel):
+    booking_ids: List[int] = Field(min_length=1)
+    status: BookingStatus
+
+
+class BookingStatusOutcome(str, enum.Enum):
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    NOT_ALLOWED = "not_allowed"
+    NOT_FOUND = "not_found"
+
+
+class BookingBulkStatusResult(BaseModel):
+    booking_id: int
+    outcome: BookingStatusOutcome
+    previous_status: Optional[BookingStatus] = None
+    status: Optional[BookingStatus] = None
+
+
+class BookingBulkStatusResponse(BaseModel):
+    updated: int
+    results: List[BookingBulkStatusResult]
+
+
+class BookingSeriesItem(BaseModel):
+    id: int
+    booking_number: str
+    start_date: datetime
+    end_date: datetime
+
+
+class BookingSeriesResponse(BaseModel):
+    count: int
+    bookings: List[BookingSeriesItem]
+
+
+class BookingImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class BookingImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[BookingImportRowError]
+    dry_run: bool
@@ -39,6 +39,7 @@ class PaymentResponse(PaymentBase):
     recorded_by: int
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int
 
     class Config:
         from_attributes = True
@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 from decimal import Decimal
+import enum
 
 
 # Car Schemas
@@ -40,6 +41,7 @@ class CarResponse(CarBase):
     account_id: str
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int
 
     class Config:
         from_attributes = True
@@ -77,6 +79,7 @@ class DriverResponse(DriverBase):
     account_id: str
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int
 
     class Config:
         from_attributes = True
@@ -110,6 +113,13 @@ class TourRepResponse(TourRepBase):
     account_id: str
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int
 
     class Config:
         from_attributes = True
+
+
+class ResourceType(str, enum.Enum):
+    CAR = "car"
+    DRIVER = "driver"
+    TOUR_REP = "tour_rep"
@@ -0,0 +1,244 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Integer, column, func, literal_column, or_, update, values
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.booking import Booking, BookingStatus, booking_period, resource_blocked
+from app.models.resource import Car, Driver
+from app.models.template import TemplateField, FieldType
+from app.services.field_values import field_value_store
+
+
+@dataclass
+class Timeline:
+    """Non-overlapping [start, end) periods a resource is busy, kept sorted."""
+    starts: List[datetime] = field(default_factory=list)
+    ends: List[datetime] = field(default_factory=list)
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        # Periods starting before `end`; only the last of them can reach past `start`
+        i = bisect_left(self.starts, end)
+        return i == 0 or self.ends[i - 1] <= start
+
+    def add(self, start: datetime, end: datetime) -> None:
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+
+@dataclass
+class Resource:
+    id: int
+    capacity: int = 0
+    languages: Set[str] = field(default_factory=set)
+    timeline: Timeline = field(default_factory=Timeline)
+
+
+@dataclass
+class PendingBooking:
+    id: int
+    start: datetime
+    end: datetime
+    needs_car: bool
+    needs_driver: bool
+    seats: int = 0
+    language: Optional[str] = None
+
+
+def _seats(raw: Optional[str]) -> int:
+    try:
+        return max(int(Decimal(raw)), 0) if raw else 0
+    except (InvalidOperation, ValueError):
+        return 0
+
+
+def _languages(raw: Optional[str]) -> Set[str]:
+    return {language.strip().lower() for language in (raw or "").split(",") if language.strip()}
+
+
+class AssignmentService:
+    """Assigns available cars and drivers to pending bookings without overlaps.
+
+    Bookings are swept in order of start time and each one takes the
+    smallest compatible resource that is free for its whole period: the car
+    with the fewest seats that still fits the party, the driver speaking the
+    fewest languages that still covers the requested one. Earliest-start
+    greedy is optimal for interval partitioning over interchangeable
+    resources; best-fit keeps large cars and multilingual drivers free for
+    the bookings that actually need them.
+    """
+
+    def plan(
+        self,
+        bookings: Sequence[PendingBooking],
+        cars: Sequence[Resource],
+        drivers: Sequence[Resource],
+    ) -> Tuple[Dict[int, dict], Dict[int, List[str]]]:
+        """Return assignments {booking_id: {car_id, driver_id}} and reasons for anything left open."""
+        cars = sorted(cars, key=lambda car: (car.capacity, car.id))
+        drivers = sorted(drivers, key=lambda driver: (len(driver.languages), driver.id))
+
+        assignments: Dict[int, dict] = {}
+        unassigned: Dict[int, List[str]] = {}
+
+        for booking in sorted(bookings, key=lambda b: (b.start, b.end, b.id)):
+            chosen = {}
+
+            if booking.needs_car:
+                car = next((
+                    car for car in cars
+                    if car.capacity >= booking.seats and car.timeline.is_free(booking.start, booking.end)
+                ), None)
+                if car:
+                    car.timeline.add(booking.start, booking.end)
+                    chosen["car_id"] = car.id
+                else:
+                    unassigned.setdefault(booking.id, []).append(
+                        f"No free car with at least {booking.seats} seats" if booking.seats else "No free car"
+                    )
+
+            if booking.needs_driver:
+                driver = next((
+                    driver for driver in drivers
+                    if (not booking.language or booking.language in driver.languages)
+                    and driver.timeline.is_free(booking.start, booking.end)
+                ), None)
+                if driver:
+                    driver.timeline.add(booking.start, booking.end)
+                    chosen["driver_id"] = driver.id
+                else:
+                    unassigned.setdefault(booking.id, []).append(
+                        f"No free driver speaking {booking.language}" if booking.language else "No free driver"
+                    )
+
+            if chosen:
+                assignments[booking.id] = chosen
+
+        return assignments, unassigned
+
+    def assign_pending(
+        self,
+        db: Session,
+        account_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        booking_ids: Optional[List[int]] = None,
+        dry_run: bool = False,
+    ) -> Tuple[Dict[int, dict], Dict[int, List[str]]]:
+        """Fill in missing cars and drivers of pending bookings starting in [start_date, end_date).
+
+        A booking needs a car or a driver when its template has a car or
+        driver select field. Everything is read with a handful of set-based
+        queries, and the result is written with a single UPDATE in the
+        caller's transaction. The bookings are locked while planning so two
+        dispatchers cannot assign the same ones concurrently.
+        """
+        query = db.query(
+            Booking.id, Booking.template_id, Booking.start_date, Booking.end_date,
+            Booking.car_id, Booking.driver_id
+        ).filter(
+            Booking.account_id == account_id,
+            Booking.status == BookingStatus.PENDING,
+            Booking.start_date >= start_date,
+            Booking.start_date < end_date,
+            or_(Booking.car_id.is_(None), Booking.driver_id.is_(None))
+        )
+        if booking_ids:
+            query = query.filter(Booking.id.in_(booking_ids))
+        rows = query.with_for_update(of=Booking).all()
+        if not rows:
+            return {}, {}
+
+        # Which templates call for a car and which for a driver
+        needs: Dict[int, Set[FieldType]] = {}
+        for template_id, field_type in db.query(TemplateField.template_id, TemplateField.field_type).filter(
+            TemplateField.template_id.in_({row.template_id for row in rows}),
+            TemplateField.field_type.in_([FieldType.CAR_SELECT, FieldType.DRIVER_SELECT])
+        ).distinct():
+            needs.setdefault(template_id, set()).add(field_type)
+
+        # Party size and language requests from the bookings' field values
+        requirements = field_value_store.values_for(
+            db,
+            [row.id for row in rows],
+            [settings.ASSIGNMENT_SEATS_FIELD, settings.ASSIGNMENT_LANGUAGE_FIELD]
+        )
+
+        pending = []
+        for row in rows:
+            template_needs = needs.get(row.template_id, set())
+            requested = requirements.get(row.id, {})
+            language = (requested.get(settings.ASSIGNMENT_LANGUAGE_FIELD) or "").strip().lower()
+            pending.append(PendingBooking(
+                id=row.id,
+                start=row.start_date,
+                end=row.end_date,
+                needs_car=row.car_id is None and FieldType.CAR_SELECT in template_needs,
+                needs_driver=row.driver_id is None and FieldType.DRIVER_SELECT in template_needs,
+                seats=_seats(requested.get(settings.ASSIGNMENT_SEATS_FIELD)),
+                language=language or None,
+            ))
+        pending = [booking for booking in pending if booking.needs_car or booking.needs_driver]
+        if not pending:
+            return {}, {}
+
+        cars = {
+            car_id: Resource(id=car_id, capacity=seats or 0)
+            for car_id, seats in db.query(Car.id, Car.seating_capacity).filter(
+                Car.account_id == account_id, Car.is_available == True
+            )
+        }
+        drivers = {
+            driver_id: Resource(id=driver_id, languages=_languages(languages))
+            for driver_id, languages in db.query(Driver.id, Driver.languages).filter(
+                Driver.account_id == account_id, Driver.is_available == True
+            )
+        }
+
+        # Existing commitments of those resources over the planning horizon
+        horizon = func.tstzrange(
+            min(booking.start for booking in pending),
+            max(booking.end for booking in pending),
+            literal_column("'[)'")
+        )
+        for resource_column, resources in ((Booking.car_id, cars), (Booking.driver_id, drivers)):
+            for resource_id, busy_start, busy_end in db.query(
+                resource_column, Booking.start_date, Booking.end_date
+            ).filter(
+                Booking.account_id == account_id,
+                resource_blocked(resource_column),
+                booking_period.op("&&")(horizon)
+            ).order_by(Booking.start_date):
+                if resource_id in resources:
+                    resources[resource_id].timeline.add(busy_start, busy_end)
+
+        assignments, unassigned = self.plan(pending, list(cars.values()), list(drivers.values()))
+
+        if assignments and not dry_run:
+            # One UPDATE ... FROM (VALUES ...) for the whole batch
+            assigned = values(
+                column("id", Integer), column("car_id", Integer), column("driver_id", Integer),
+                name="assigned"
+            ).data([
+                (booking_id, resources.get("car_id"), resources.get("driver_id"))
+                for booking_id, resources in assignments.items()
+            ])
+            db.execute(
+                update(Booking).where(Booking.id == assigned.c.id).values(
+                    car_id=func.coalesce(assigned.c.car_id, Booking.car_id),
+                    driver_id=func.coalesce(assigned.c.driver_id, Booking.driver_id),
+                    updated_at=func.now(),
+                    version=Booking.version + 1
+                ),
+                execution_options={"synchronize_session": False}
+            )
+
+        return assignments, unassigned
+
+
+assignment_service = AssignmentService()
@@ -0,0 +1,409 @@
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException, UploadFile, status
+from openpyxl import load_workbook
+from sqlalchemy import DateTime, Integer, and_, cast, column, func, insert, literal_column, or_, select, union_all, values
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.models.booking import (
+    Booking, BookingStatus, booking_period, resource_blocked, EXCLUSION_VIOLATION, DEADLOCK_DETECTED
+)
+from app.models.customer import Customer
+from app.models.resource import Car, Driver, TourRep
+from app.services.booking_numbers import booking_numbers
+from app.services.field_validation import FieldValidator, field_validators
+from app.services.field_values import field_value_store
+
+# Rows looked up, checked and inserted together
+IMPORT_BATCH_SIZE = 1000
+
+# Rows whose errors are listed in the report; later failures are only counted
+MAX_REPORTED_ERRORS = 1000
+
+# Columns naming a booking's customer, tour rep, car and driver:
+# column -> (booking column, model, natural key, case-insensitive, description)
+NATURAL_KEYS = {
+    "customer_email": ("customer_id", Customer, Customer.email, True, "customer with email"),
+    "tour_rep": ("tour_rep_id", TourRep, TourRep.full_name, True, "tour rep named"),
+    "car": ("car_id", Car, Car.registration_number, True, "car with registration"),
+    "driver": ("driver_id", Driver, Driver.license_number, False, "driver with license"),
+}
+BOOKING_COLUMNS = ("start_date", "end_date", "status", "total_amount", "currency", "notes")
+REQUIRED_COLUMNS = ("customer_email", "tour_rep", "start_date", "end_date")
+
+
+def cell_text(value: Any) -> Optional[str]:
+    """A CSV or XLSX cell as text, None when empty."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip() or None
+
+
+def read_rows(upload: UploadFile) -> Iterator[Sequence[Any]]:
+    """Rows of an uploaded CSV or XLSX file, header first, read as they are consumed."""
+    name = (upload.filename or "").lower()
+    if name.endswith(".csv"):
+        yield from csv.reader(io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""))
+    elif name.endswith(".xlsx"):
+        try:
+            workbook = load_workbook(upload.file, read_only=True, data_only=True)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is not a valid XLSX workbook"
+            )
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import a .csv or .xlsx file"
+        )
+
+
+@dataclass
+class ImportRow:
+    number: int
+    keys: Dict[str, str] = field(default_factory=dict)
+    booking: Dict[str, Any] = field(default_factory=dict)
+    field_values: Dict[str, str] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def fail(self, row: ImportRow) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row.number, "errors": row.errors})
+
+
+class BookingImporter:
+    """Creates bookings from the rows of a spreadsheet.
+
+    The file is read row by row and handled in batches: the customers,
+    tour reps, cars and drivers a batch names are looked up with one query
+    per kind, its car and driver overlaps are found with one query, and its
+    valid rows are inserted with multi-row INSERTs and committed. Memory
+    use therefore depends on the batch size, not the file size. Rows with
+    problems are skipped and listed in the report.
+    """
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def _columns(self, header: Sequence[Any], validator: FieldValidator) -> List[Optional[str]]:
+        """Column names of the header row; raises 400 for unknown, missing or repeated ones."""
+        columns = [cell_text(cell) for cell in header]
+        named = [name for name in columns if name]
+
+        unknown = [
+            name for name in named
+            if name not in NATURAL_KEYS and name not in BOOKING_COLUMNS and name not in validator.names
+        ]
+        missing = [name for name in REQUIRED_COLUMNS if name not in named]
+        repeated = sorted({name for name in named if named.count(name) > 1})
+
+        problems = []
+        if unknown:
+            problems.append("unknown columns " + ", ".join(unknown))
+        if missing:
+            problems.append("missing columns " + ", ".join(missing))
+        if repeated:
+            problems.append("repeated columns " + ", ".join(repeated))
+        if problems:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid header row: " + "; ".join(problems)
+            )
+
+        return columns
+
+    def _parse(self, number: int, columns: List[Optional[str]], cells: Sequence[Any]) -> Optional[ImportRow]:
+        """A data row with its values converted, or None for a blank row."""
+        texts = [(name, cell_text(cell)) for name, cell in zip(columns, cells) if name]
+        if all(text is None for _, text in texts):
+            return None
+
+        row = ImportRow(number)
+        raw: Dict[str, Optional[str]] = {}
+        for name, text in texts:
+            if name in NATURAL_KEYS:
+                if text is not None:
+                    row.keys[name] = text.lower() if NATURAL_KEYS[name][3] else text
+            elif name in BOOKING_COLUMNS:
+                raw[name] = text
+            elif text is not None:
+                row.field_values[name] = text
+
+        for name in ("customer_email", "tour_rep"):
+            if name not in row.keys:
+                row.errors.append(f"{name} is required")
+
+        for name in ("start_date", "end_date"):
+            try:
+                row.booking[name] = datetime.fromisoformat(raw.get(name))
+            except (TypeError, ValueError):
+                row.errors.append(f"{name} must be a date and time (YYYY-MM-DDTHH:MM)")
+        if "start_date" in row.booking and "end_date" in row.booking:
+            start_date, end_date = row.booking["start_date"], row.booking["end_date"]
+            if (start_date.tzinfo is None) != (end_date.tzinfo is None):
+                row.errors.append("start_date and end_date must both have a time zone or neither")
+            elif end_date < start_date:
+                row.errors.append("end_date must not be before start_date")
+
+        try:
+            row.booking["status"] = BookingStatus((raw.get("status") or "pending").lower())
+        except ValueError:
+            row.errors.append("status must be one of " + ", ".join(s.value for s in BookingStatus))
+
+        try:
+            row.booking["total_amount"] = Decimal(raw["total_amount"]) if raw.get("total_amount") else None
+        except InvalidOperation:
+            row.errors.append("total_amount must be a number")
+
+        row.booking["currency"] = raw.get("currency") or "LKR"
+        row.booking["notes"] = raw.get("notes")
+        return row
+
+    def _resolve(self, db: Session, account_id: str, rows: List[ImportRow]) -> None:
+        """Set each row's customer, tour rep, car and driver ids, with one query per kind."""
+        for name, (booking_column, model, key, case_insensitive, description) in NATURAL_KEYS.items():
+            wanted = {row.keys[name] for row in rows if name in row.keys}
+            matches: Dict[str, List[int]] = {}
+            if wanted:
+                # Lowered keys are served by the tables' lower() prefix indexes
+                lookup = func.lower(key) if case_insensitive else key
+                for value, resource_id in db.query(lookup, model.id).filter(
+                    model.account_id == account_id,
+                    lookup.in_(wanted)
+                ):
+                    matches.setdefault(value, []).append(resource_id)
+
+            for row in rows:
+                value = row.keys.get(name)
+                if value is None:
+                    row.booking[booking_column] = None
+                elif len(matches.get(value, ())) == 1:
+                    row.booking[booking_column] = matches[value][0]
+                elif value in matches:
+                    row.errors.append(f"{len(matches[value])} {description} {value} exist")
+                else:
+                    row.errors.append(f"No {description} {value}")
+
+    def _check_overlaps(self, db: Session, account_id: str, rows: List[ImportRow]) -> None:
+        """Fail rows whose car or driver is booked already or by an earlier accepted row of the batch.
+
+        One query finds every row's clashes with existing bookings and with
+        earlier rows; they are then resolved in row order, so a row that
+        failed does not take its car or driver from the rows after it.
+        """
+        blocking = [
+            row for row in rows
+            if not row.errors
+            and row.booking["status"] != BookingStatus.CANCELLED
+            and (row.booking["car_id"] is not None or row.booking["driver_id"] is not None)
+        ]
+        if not blocking:
+            return
+
+        data = values(
+            column("number", Integer), column("car_id", Integer), column("driver_id", Integer),
+            column("starts", DateTime(timezone=True)), column("ends", DateTime(timezone=True)),
+            name="rows"
+        ).data([
+            (
+                row.number, row.booking["car_id"], row.booking["driver_id"],
+                row.booking["start_date"], row.booking["end_date"]
+            )
+            for row in blocking
+        ])
+        # A column that is NULL in every row would otherwise be typed text
+        batch = select(
+            data.c.number,
+            cast(data.c.car_id, Integer).label("car_id"),
+            cast(data.c.driver_id, Integer).label("driver_id"),
+            data.c.starts,
+            data.c.ends
+        ).cte("batch")
+        earlier = batch.alias("earlier")
+
+        def window(rows):
+            return func.tstzrange(rows.c.starts, rows.c.ends, literal_column("'[)'"))
+
+        existing = select(batch.c.number, Booking.booking_number, literal_column("NULL::integer")).select_from(batch).join(
+            Booking, booking_period.op("&&")(window(batch))
+        ).where(
+            Booking.account_id == account_id,
+            or_(
+                (Booking.car_id == batch.c.car_id) & resource_blocked(Booking.car_id),
+                (Booking.driver_id == batch.c.driver_id) & resource_blocked(Booking.driver_id)
+            )
+        )
+        within = select(batch.c.number, literal_column("NULL::varchar"), earlier.c.number).select_from(batch).join(
+            earlier,
+            and_(
+                earlier.c.number < batch.c.number,
+                window(earlier).op("&&")(window(batch)),
+                or_(earlier.c.car_id == batch.c.car_id, earlier.c.driver_id == batch.c.driver_id)
+            )
+        )
+
+        booked: Dict[int, str] = {}
+        clashes: Dict[int, List[int]] = {}
+        for number, booking_number, earlier_number in db.execute(union_all(existing, within)):
+            if booking_number:
+                booked.setdefault(number, booking_number)
+            else:
+                clashes.setdefault(number, []).append(earlier_number)
+
+        accepted = set()
+        for row in blocking:
+            if row.number in booked:
+                row.errors.append(f"Car or driver is already booked by {booked[row.number]}")
+                continue
+            taken = [number for number in clashes.get(row.number, ()) if number in accepted]
+            if taken:
+                row.errors.append(f"Car or driver is also booked by row {min(taken)}")
+                continue
+            accepted.add(row.number)
+
+    def _insert(self, db: Session, account_id: str, user_id: int, template_id: int, rows: List[ImportRow]) -> None:
+        """Insert the bookings of valid rows and their field values, and commit them."""
+        numbers = booking_numbers.allocate(account_id, len(rows))
+        # insertmanyvalues sends these as multi-row INSERT ... RETURNING statements
+        booking_ids = db.execute(
+            insert(Booking).returning(Booking.id, sort_by_parameter_order=True),
+            [
+                {
+                    **row.booking,
+                    "booking_number": number,
+                    "account_id": account_id,
+                    "template_id": template_id,
+                    "created_by": user_id,
+                    "field_data": field_value_store.new_document(row.field_values),
+                }
+                for number, row in zip(numbers, rows)
+            ]
+        ).scalars().all()
+        field_value_store.insert_many(
+            db, {booking_id: row.field_values for booking_id, row in zip(booking_ids, rows)}
+        )
+        db.commit()
+
+    def _import_batch(
+        self,
+        db: Session,
+        account_id: str,
+        user_id: int,
+        template_id: int,
+        validator: FieldValidator,
+        rows: List[ImportRow],
+        dry_run: bool,
+        report: ImportReport
+    ) -> None:
+        self._resolve(db, account_id, rows)
+        for row in rows:
+            row.errors.extend(validator.errors(row.field_values))
+        self._check_overlaps(db, account_id, rows)
+
+        valid = [row for row in rows if not row.errors]
+        if valid and not dry_run:
+            try:
+                self._insert(db, account_id, user_id, template_id, valid)
+            except DBAPIError as exc:
+                # A booking made while the batch was checked took one of its cars or drivers
+                if getattr(exc.orig, "pgcode", None) not in (EXCLUSION_VIOLATION, DEADLOCK_DETECTED):
+                    raise
+                db.rollback()
+                for row in valid:
+                    row.errors.append("Car or driver was booked by someone else during the import; import the row again")
+                valid = []
+
+        report.imported += len(valid)
+        for row in rows:
+            if row.errors:
+                report.fail(row)
+
+    def import_file(
+        self,
+        db: Session,
+        account_id: str,
+        user_id: int,
+        template_id: int,
+        upload: UploadFile,
+        dry_run: bool = False
+    ) -> dict:
+        """Import the rows of a CSV or XLSX file as bookings of one template.
+
+        The header row names the columns: customer_email, tour_rep (name),
+        car (registration number), driver (license number), start_date,
+        end_date, status, total_amount, currency, notes and the template's
+        field names. Each batch commits on its own, so a failure part way
+        keeps the rows imported before it. With ``dry_run`` nothing is
+        written; overlaps between rows of different batches are then not
+        detected.
+        """
+        validator = field_validators.get(db, template_id, account_id)
+        rows = read_rows(upload)
+        header = next(rows, None)
+        if header is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is empty"
+            )
+        columns = self._columns(header, validator)
+
+        report = ImportReport()
+        numbered = enumerate(rows, start=2)
+        number = 1
+        reading = True
+        while reading:
+            batch: List[ImportRow] = []
+            try:
+                for number, cells in numbered:
+                    row = self._parse(number, columns, cells)
+                    if row:
+                        batch.append(row)
+                    if len(batch) == self.batch_size:
+                        break
+                else:
+                    reading = False
+            except (UnicodeDecodeError, csv.Error) as e:
+                # Rows read before the damaged part of the file are still imported
+                report.errors.append({"row": number + 1, "errors": [f"File could not be read from here on: {e}"]})
+                reading = False
+
+            if batch:
+                self._import_batch(db, account_id, user_id, template_id, validator, batch, dry_run, report)
+
+        if dry_run:
+            db.rollback()
+
+        return {
+            "imported": report.imported,
+            "failed": report.failed,
+            "errors": report.errors,
+            "dry_run": dry_run,
+        }
+
+
+booking_importer = BookingImporter()
@@ -0,0 +1,86 @@
+import threading
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.booking import BookingNumberSequence
+
+
+# Sequence values keep this many digits, the length of the random part
+# numbers had before, so a day's numbers sort in the order they were made
+SEQUENCE_DIGITS = 8
+
+
+def format_booking_number(day: date, value: int) -> str:
+    """BK, the UTC day and a zero-padded sequence value, e.g. BK2025111100000042."""
+    if value >= 10 ** SEQUENCE_DIGITS:
+        raise ValueError(f"Booking number sequence for {day} is exhausted")
+    return f"BK{day:%Y%m%d}{value:0{SEQUENCE_DIGITS}d}"
+
+
+class BookingNumberAllocator:
+    """Hands out sequential booking numbers per tenant and day.
+
+    Each worker reserves a block of numbers with one upsert on
+    booking_number_sequences, committed on its own connection. The
+    sequence row is therefore locked for a single statement per block
+    rather than for every booking's transaction. Numbers are unique by
+    construction and grow with time, so new bookings land at the end of
+    the tenant's (account_id, booking_number) index. Concurrent workers
+    interleave their blocks, and numbers left in a block when a worker
+    stops are skipped.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        # (account_id, day) -> (next value, last reserved value)
+        self._blocks: Dict[Tuple[str, date], Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, account_id: str, day: date, count: int) -> int:
+        """Reserve the next ``count`` values of a sequence and return the last of them."""
+        statement = insert(BookingNumberSequence).values(account_id=account_id, day=day, last_value=count)
+        statement = statement.on_conflict_do_update(
+            index_elements=[BookingNumberSequence.account_id, BookingNumberSequence.day],
+            set_={"last_value": BookingNumberSequence.last_value + count}
+        ).returning(BookingNumberSequence.last_value)
+
+        with engine.begin() as connection:
+            return connection.execute(statement).scalar_one()
+
+    def allocate(self, account_id: str, count: int = 1, day: Optional[date] = None) -> List[str]:
+        """Return ``count`` new booking numbers for a tenant, in increasing order.
+
+        ``day`` defaults to today in UTC, whatever the server's time zone.
+        """
+        day = day or datetime.now(timezone.utc).date()
+        key = (account_id, day)
+        numbers: List[str] = []
+
+        with self._lock:
+            # Blocks of earlier days are never drawn from again
+            for stale in [block for block in self._blocks if block[1] != day]:
+                del self._blocks[stale]
+
+            while len(numbers) < count:
+                next_value, last_value = self._blocks.get(key, (1, 0))
+                if next_value > last_value:
+                    size = max(self.block_size, count - len(numbers))
+                    last_value = self._reserve(account_id, day, size)
+                    next_value = last_value - size + 1
+
+                taken = min(count - len(numbers), last_value - next_value + 1)
+                numbers += [format_booking_number(day, value) for value in range(next_value, next_value + taken)]
+                self._blocks[key] = (next_value + taken, last_value)
+
+        return numbers
+
+    def next(self, account_id: str) -> str:
+        """Return one new booking number for a tenant."""
+        return self.allocate(account_id)[0]
+
+
+booking_numbers = BookingNumberAllocator(settings.BOOKING_NUMBER_BLOCK_SIZE)
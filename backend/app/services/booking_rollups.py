@@ -0,0 +1,145 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select, text, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Subquery
+
+from app.models.booking import Booking, BookingDailyRollup, booking_day, booking_period
+
+# Dimensions and amounts shared by the rollup and the bookings it sums
+ROLLUP_DIMENSIONS = ("status", "template_id", "tour_rep_id", "car_id", "driver_id")
+
+
+def as_utc(moment: datetime) -> datetime:
+    """An aware datetime in UTC; naive ones are taken to be UTC already."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def midnight(day: date) -> datetime:
+    """Start of a UTC day."""
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class BookingRollupService:
+    """Reads booking counts and amounts from booking_daily_rollups.
+
+    A period's whole UTC days are summed from the rollup and only the
+    bookings of its partial first and last day are read individually, so
+    the cost of a query depends on the number of buckets rather than of
+    bookings. The rows produced add up to exactly what the same filter over
+    the bookings table gives.
+    """
+
+    def _bookings(self, account_id: str, sign: int, conditions: list, equal: dict):
+        """Signed rows of individual bookings, shaped like rollup buckets."""
+        return select(
+            *[getattr(Booking, name) for name in ROLLUP_DIMENSIONS],
+            literal(sign).label("booking_count"),
+            (Booking.total_amount * sign).label("total_amount"),
+            (Booking.paid_amount * sign).label("paid_amount")
+        ).where(
+            Booking.account_id == account_id,
+            *conditions,
+            *[getattr(Booking, name) == value for name, value in equal.items()]
+        )
+
+    def bookings(
+        self,
+        account_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        ended: bool = False,
+        **equal: int
+    ) -> Subquery:
+        """Subquery of (dimensions, booking_count, total_amount, paid_amount) rows
+        summing to a tenant's bookings that start within [start_date, end_date].
+
+        With ``ended``, bookings must also end by ``end_date``. Keyword
+        arguments restrict dimensions to one value, e.g. ``tour_rep_id=7``.
+        """
+        start = as_utc(start_date) if start_date else None
+        end = as_utc(end_date) if end_date else None
+
+        # Whole days in the period: [first_day, last_day)
+        first_day = None
+        if start:
+            first_day = start.date() if start == midnight(start.date()) else start.date() + timedelta(days=1)
+        last_day = end.date() if end else None
+
+        if first_day and last_day and first_day >= last_day:
+            conditions = [Booking.start_date >= start, Booking.start_date <= end]
+            if ended:
+                conditions.append(Booking.end_date <= end)
+            return self._bookings(account_id, 1, conditions, equal).subquery("rollup_rows")
+
+        days = select(
+            *[getattr(BookingDailyRollup, name) for name in ROLLUP_DIMENSIONS],
+            BookingDailyRollup.booking_count,
+            BookingDailyRollup.total_amount,
+            BookingDailyRollup.paid_amount
+        ).where(
+            BookingDailyRollup.account_id == account_id,
+            BookingDailyRollup.booking_count != 0,
+            *[getattr(BookingDailyRollup, name) == value for name, value in equal.items()]
+        )
+        if first_day:
+            days = days.where(BookingDailyRollup.day >= first_day)
+        if last_day:
+            days = days.where(BookingDailyRollup.day < last_day)
+        parts = [days]
+
+        # Partial first and last day, then, when bookings must have ended,
+        # those starting in the period that are still running at its end
+        if start and start < midnight(first_day):
+            parts.append(self._bookings(
+                account_id, 1, [Booking.start_date >= start, Booking.start_date < midnight(first_day)], equal
+            ))
+        if end:
+            parts.append(self._bookings(
+                account_id, 1, [Booking.start_date >= midnight(last_day), Booking.start_date <= end], equal
+            ))
+            if ended:
+                running = [booking_period.op("@>")(end)]
+                if start:
+                    running.append(Booking.start_date >= start)
+                parts.append(self._bookings(account_id, -1, running, equal))
+
+        return union_all(*parts).subquery("rollup_rows")
+
+    def rebuild(self, db: Session, account_id: Optional[str] = None) -> int:
+        """Recompute the rollup from the bookings, for one tenant or all, and
+        return the number of buckets written.
+
+        Booking writes wait for the rebuild, so none is counted twice or missed.
+        """
+        db.execute(text("LOCK TABLE bookings IN SHARE MODE"))
+
+        cleared = delete(BookingDailyRollup)
+        totals = select(
+            Booking.account_id,
+            booking_day,
+            *[getattr(Booking, name) for name in ROLLUP_DIMENSIONS],
+            func.count(),
+            func.coalesce(func.sum(Booking.total_amount), 0),
+            func.coalesce(func.sum(Booking.paid_amount), 0)
+        ).group_by(Booking.account_id, booking_day, *[getattr(Booking, name) for name in ROLLUP_DIMENSIONS])
+        if account_id:
+            cleared = cleared.where(BookingDailyRollup.account_id == account_id)
+            totals = totals.where(Booking.account_id == account_id)
+
+        db.execute(cleared)
+        written = db.execute(insert(BookingDailyRollup).from_select(
+            [
+                "account_id", "day", *ROLLUP_DIMENSIONS,
+                "booking_count", "total_amount", "paid_amount"
+            ],
+            totals
+        )).rowcount
+        db.commit()
+        return written
+
+
+booking_rollups = BookingRollupService()
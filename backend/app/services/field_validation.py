@@ -0,0 +1,189 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.models.booking import NUMBER_PATTERN
+from app.models.template import Template, TemplateField, FieldType
+
+# Templates whose compiled validators are kept per process
+MAX_CACHED_TEMPLATES = 1024
+
+# Field types whose value is submitted in field_values. Files are uploaded
+# as photos and resource selects set the booking's own foreign keys, so
+# those are neither required nor type-checked here.
+VALUE_FIELD_TYPES = {
+    FieldType.TEXT,
+    FieldType.NUMBER,
+    FieldType.DATE,
+    FieldType.DATETIME,
+    FieldType.DROPDOWN,
+    FieldType.TEXTAREA,
+}
+
+NUMBER_VALUE = re.compile(NUMBER_PATTERN)
+
+Check = Callable[[str], Optional[str]]
+
+
+def _number(value: str) -> Optional[str]:
+    # The pattern the typed field filters compare numbers by
+    return None if NUMBER_VALUE.match(value) else "must be a number"
+
+
+def _date(value: str) -> Optional[str]:
+    try:
+        date.fromisoformat(value)
+        return None
+    except ValueError:
+        return "must be a date (YYYY-MM-DD)"
+
+
+def _datetime(value: str) -> Optional[str]:
+    try:
+        datetime.fromisoformat(value)
+        return None
+    except ValueError:
+        return "must be a date and time (YYYY-MM-DDTHH:MM)"
+
+
+def _checkbox(value: str) -> Optional[str]:
+    return None if value in ("true", "false") else "must be true or false"
+
+
+def _one_of(options: Iterable[str]) -> Check:
+    allowed = frozenset(options)
+
+    def check(value: str) -> Optional[str]:
+        return None if value in allowed else "is not one of the options"
+
+    return check
+
+
+TYPE_CHECKS: Dict[FieldType, Check] = {
+    FieldType.NUMBER: _number,
+    FieldType.DATE: _date,
+    FieldType.DATETIME: _datetime,
+    FieldType.CHECKBOX: _checkbox,
+}
+
+
+class FieldValidator:
+    """Field value rules of one template, compiled to plain lookups.
+
+    Built once per template version; validating a booking is a dictionary
+    walk over its values with no database access.
+    """
+
+    def __init__(self, fields: Iterable[TemplateField]):
+        self.names: Set[str] = set()
+        self.required: List[Tuple[str, str]] = []
+        self.checks: Dict[str, Tuple[str, Check]] = {}
+
+        for field in fields:
+            self.names.add(field.field_name)
+            if field.is_required and field.field_type in VALUE_FIELD_TYPES:
+                self.required.append((field.field_name, field.field_label))
+
+            if field.field_type == FieldType.DROPDOWN and field.options:
+                self.checks[field.field_name] = (field.field_label, _one_of(field.options))
+            elif field.field_type in TYPE_CHECKS:
+                self.checks[field.field_name] = (field.field_label, TYPE_CHECKS[field.field_type])
+
+    def errors(self, values: Dict[str, Optional[str]]) -> List[str]:
+        """Messages for every rule the values break. Names the template lacks are not checked."""
+        errors = [
+            f"{label} is required"
+            for name, label in self.required
+            if not (values.get(name) or "").strip()
+        ]
+        for name, value in values.items():
+            if not value or name not in self.checks:
+                continue
+            label, check = self.checks[name]
+            message = check(value)
+            if message:
+                errors.append(f"{label} {message}")
+        return errors
+
+
+class FieldValidatorCache:
+    """Compiled validators keyed by template id, served without a query.
+
+    Template writes drop the template's entry in this process; other
+    processes recompile it once their entry is FIELD_VALIDATOR_TTL_SECONDS
+    old, so until then they may validate against the previous fields.
+    """
+
+    def __init__(
+        self,
+        max_templates: int = MAX_CACHED_TEMPLATES,
+        ttl_seconds: float = settings.FIELD_VALIDATOR_TTL_SECONDS
+    ):
+        self.max_templates = max_templates
+        self.ttl_seconds = ttl_seconds
+        # template_id -> (account_id, compiled at, validator)
+        self._validators: "OrderedDict[int, Tuple[str, float, FieldValidator]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, template_id: int, account_id: str) -> FieldValidator:
+        """Validator for a tenant's template. Raises 400 if the template is not theirs."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._validators.get(template_id)
+            if cached and cached[0] == account_id and now - cached[1] < self.ttl_seconds:
+                self._validators.move_to_end(template_id)
+                return cached[2]
+
+        template = db.query(Template).options(selectinload(Template.fields)).filter(
+            Template.id == template_id,
+            Template.account_id == account_id
+        ).first()
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Template not found"
+            )
+        validator = FieldValidator(template.fields)
+
+        with self._lock:
+            self._validators[template_id] = (account_id, now, validator)
+            self._validators.move_to_end(template_id)
+            while len(self._validators) > self.max_templates:
+                self._validators.popitem(last=False)
+
+        return validator
+
+    def invalidate(self, template_id: int) -> None:
+        """Forget a template's validator after the template was written."""
+        with self._lock:
+            self._validators.pop(template_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._validators.clear()
+
+    def validate(self, db: Session, template_id: int, account_id: str, field_values: Iterable) -> None:
+        """Raise 400 listing every problem with a booking's field values."""
+        self.check_values(
+            db, template_id, account_id,
+            {field_value.field_name: field_value.field_value for field_value in field_values}
+        )
+
+    def check_values(self, db: Session, template_id: int, account_id: str, values: Dict[str, Optional[str]]) -> None:
+        """Like ``validate``, for values already keyed by field name."""
+        errors = self.get(db, template_id, account_id).errors(values)
+        if errors:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid field values: " + "; ".join(errors)
+            )
+
+
+field_validators = FieldValidatorCache()
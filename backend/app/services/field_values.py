@@ -0,0 +1,365 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import (
+    String, Text, and_, column, delete, exists, func, literal, literal_column, or_, select, update, values
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, lazyload, selectinload
+
+from app.core.config import settings
+from app.models.booking import (
+    Booking, BookingFieldValue, field_text, field_number, field_moment
+)
+from app.models.template import Template, TemplateField, FieldType
+from app.utils.filters import split_filter, split_values, split_range, escape_like
+
+FIELD_STORAGE_ROWS = "rows"
+FIELD_STORAGE_JSONB = "jsonb"
+
+# Operators for dynamic field filters by declared field type. Any other
+# field type is matched as text.
+TYPED_FIELD_OPERATORS = {
+    FieldType.NUMBER: ("eq", "in", "range"),
+    FieldType.DATE: ("eq", "in", "range"),
+    FieldType.DATETIME: ("range",),
+}
+TEXT_FIELD_OPERATORS = ("eq", "in", "prefix")
+
+# Bookings moved from rows to a field document per backfill statement
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _field_value_bound(field_type: FieldType, name: str, raw: str):
+    """Parse a dynamic field filter value into the form its index compares."""
+    try:
+        if field_type == FieldType.NUMBER:
+            return Decimal(raw)
+        if field_type == FieldType.DATE:
+            return date.fromisoformat(raw).isoformat()
+        # Stored datetimes are wall-clock ISO text, minutes or seconds precision
+        moment = datetime.fromisoformat(raw).replace(tzinfo=None)
+        return moment.strftime("%Y-%m-%dT%H:%M:%S" if moment.second else "%Y-%m-%dT%H:%M")
+    except (ValueError, InvalidOperation):
+        raise _bad_request(f"Invalid {field_type.value} value for {name}: {raw}")
+
+
+def _typed_condition(expression, field_type: FieldType, name: str, operator: str, raw: str):
+    """Compare a typed field expression with the bound(s) of one filter."""
+    if operator == "eq":
+        return expression == _field_value_bound(field_type, name, raw)
+    if operator == "in":
+        return expression.in_([_field_value_bound(field_type, name, value) for value in split_values(raw)])
+
+    low, high = split_range(raw)
+    bounds = []
+    if low:
+        bounds.append(expression >= _field_value_bound(field_type, name, low))
+    if high:
+        bounds.append(expression <= _field_value_bound(field_type, name, high))
+    return and_(*bounds)
+
+
+class FieldValueStore:
+    """Reads, writes and filters booking field values.
+
+    In "rows" mode each value is a booking_field_values row; in "jsonb"
+    mode the values of a booking are one document in ``bookings.field_data``,
+    read with the booking itself. Either way a write is one statement. Reads
+    follow the data: a booking whose field_data is set is served from it,
+    any other from its rows, so switching modes never hides values.
+    """
+
+    def __init__(self, mode: str):
+        if mode not in (FIELD_STORAGE_ROWS, FIELD_STORAGE_JSONB):
+            raise ValueError(f"Unknown field value storage: {mode}")
+        self.mode = mode
+
+    @property
+    def uses_jsonb(self) -> bool:
+        return self.mode == FIELD_STORAGE_JSONB
+
+    def loader(self):
+        """Loader option for the field value rows of a page of bookings.
+
+        Documents are columns of the booking, so in "jsonb" mode nothing
+        beyond the booking SELECT is needed.
+        """
+        if self.uses_jsonb:
+            return lazyload(Booking.field_values)
+        return selectinload(Booking.field_values)
+
+    def write(self, db: Session, booking: Booking, field_values: Iterable) -> bool:
+        """Store the complete field values of a booking, touching only what differs.
+
+        Fields missing from ``field_values`` are removed, new ones added and
+        changed ones updated in place, keeping their id and created_at;
+        unchanged fields are not written at all. A name given twice keeps
+        its last value. Returns whether anything changed.
+        """
+        incoming = {field_value.field_name: field_value.field_value for field_value in field_values}
+
+        if self.uses_jsonb:
+            return self._write_document(db, booking, incoming)
+
+        if booking.id is None:
+            for name, value in incoming.items():
+                db.add(BookingFieldValue(booking=booking, field_name=name, field_value=value))
+            return bool(incoming)
+
+        if booking.field_data is not None:
+            # Backfilled or written in jsonb mode: the rows may be stale, so
+            # patch them to the incoming values and let them take over
+            self._patch_rows(db, booking.id, incoming)
+            booking.field_data = None
+            return True
+
+        return self._patch_rows(db, booking.id, incoming) > 0
+
+    def _patch_rows(self, db: Session, booking_id: int, incoming: Dict[str, str]) -> int:
+        """Diff a booking's field value rows against ``incoming`` in one statement.
+
+        A DELETE of removed names and an INSERT ... ON CONFLICT DO UPDATE of
+        the rest run as data-modifying CTEs of a single SELECT. The upsert
+        only rewrites rows whose value differs. Returns the number of rows
+        deleted, inserted or updated.
+        """
+        removed = delete(BookingFieldValue).where(
+            BookingFieldValue.booking_id == booking_id,
+            BookingFieldValue.field_name.not_in(list(incoming))
+        ).returning(BookingFieldValue.id).cte("removed")
+        changed = select(func.count()).select_from(removed).scalar_subquery()
+
+        if incoming:
+            rows = values(
+                column("field_name", String), column("field_value", Text), name="incoming"
+            ).data(list(incoming.items()))
+            upsert = insert(BookingFieldValue).from_select(
+                ["booking_id", "field_name", "field_value"],
+                select(literal(booking_id), rows.c.field_name, rows.c.field_value)
+            )
+            upsert = upsert.on_conflict_do_update(
+                constraint="uq_booking_field_values_booking_id_field_name",
+                set_={"field_value": upsert.excluded.field_value},
+                where=BookingFieldValue.field_value.is_distinct_from(upsert.excluded.field_value)
+            ).returning(BookingFieldValue.id).cte("upserted")
+            changed = changed + select(func.count()).select_from(upsert).scalar_subquery()
+
+        return db.execute(select(changed)).scalar()
+
+    def _write_document(self, db: Session, booking: Booking, incoming: Dict[str, str]) -> bool:
+        """Diff a booking's field document against ``incoming`` and set the result."""
+        current = booking.field_data
+        from_rows = current is None and booking.id is not None
+        if from_rows:
+            current = {
+                field_value.field_name: {
+                    "id": field_value.id,
+                    "value": field_value.field_value,
+                    "created_at": field_value.created_at.isoformat(),
+                }
+                for field_value in db.query(BookingFieldValue).filter(
+                    BookingFieldValue.booking_id == booking.id
+                ).order_by(BookingFieldValue.id)
+            }
+
+        current = current or {}
+        now = datetime.now(timezone.utc).isoformat()
+        next_id = max((entry["id"] for entry in current.values()), default=0) + 1
+        document = {}
+        for name, value in incoming.items():
+            entry = current.get(name)
+            if entry is None:
+                entry = {"id": next_id, "value": value, "created_at": now}
+                next_id += 1
+            elif entry["value"] != value:
+                entry = {**entry, "value": value}
+            document[name] = entry
+
+        if booking.field_data is not None and document == booking.field_data:
+            return False
+
+        if from_rows:
+            db.query(BookingFieldValue).filter(
+                BookingFieldValue.booking_id == booking.id
+            ).delete(synchronize_session=False)
+        booking.field_data = document
+        return True
+
+    def new_document(self, values: Dict[str, str]) -> Optional[dict]:
+        """field_data of a booking inserted with ``values``: its document in "jsonb" mode, else None."""
+        if not self.uses_jsonb:
+            return None
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            name: {"id": position, "value": value, "created_at": now}
+            for position, (name, value) in enumerate(values.items(), start=1)
+        }
+
+    def insert_many(self, db: Session, values_by_booking: Dict[int, Dict[str, str]]) -> None:
+        """Field value rows of many new bookings as one multi-row INSERT.
+
+        Only "rows" mode stores anything here; in "jsonb" mode the values
+        went into the bookings' own rows through ``new_document``.
+        """
+        if self.uses_jsonb:
+            return
+        rows = [
+            {"booking_id": booking_id, "field_name": name, "field_value": value}
+            for booking_id, values in values_by_booking.items()
+            for name, value in values.items()
+        ]
+        if rows:
+            db.execute(insert(BookingFieldValue), rows)
+
+    def values_for(self, db: Session, booking_ids: List[int], names: List[str]) -> Dict[int, Dict[str, str]]:
+        """Selected field values of many bookings, {booking_id: {name: value}}, in two queries at most."""
+        result: Dict[int, Dict[str, str]] = {}
+        for booking_id, *values in db.query(
+            Booking.id, *[Booking.field_data[name]["value"].astext for name in names]
+        ).filter(Booking.id.in_(booking_ids), Booking.field_data.isnot(None)):
+            result[booking_id] = {name: value for name, value in zip(names, values) if value is not None}
+
+        from_rows = [booking_id for booking_id in booking_ids if booking_id not in result]
+        if from_rows:
+            for booking_id, field_name, field_value in db.query(
+                BookingFieldValue.booking_id, BookingFieldValue.field_name, BookingFieldValue.field_value
+            ).filter(
+                BookingFieldValue.booking_id.in_(from_rows),
+                BookingFieldValue.field_name.in_(names)
+            ):
+                result.setdefault(booking_id, {})[field_name] = field_value
+
+        return result
+
+    def _text_condition(self, name: str, operator: str, raw: str):
+        """Exact or prefix match on a text field value."""
+        if operator == "prefix":
+            if not raw:
+                raise _bad_request("'prefix' needs a value")
+            pattern = escape_like(raw.lower()) + "%"
+            if self.uses_jsonb:
+                return func.lower(Booking.field_data[name]["value"].astext).like(pattern)
+            # The first LIKE is served by the text index, the second rechecks past its length
+            return and_(
+                field_text(BookingFieldValue.field_value).like(field_text(literal(pattern))),
+                func.lower(BookingFieldValue.field_value).like(pattern)
+            )
+
+        values = split_values(raw) if operator == "in" else [raw]
+        if self.uses_jsonb:
+            # Containment is answered by the GIN index on field_data
+            return or_(*[Booking.field_data.contains({name: {"value": value}}) for value in values])
+        return and_(
+            field_text(BookingFieldValue.field_value).in_([field_text(literal(value)) for value in values]),
+            BookingFieldValue.field_value.in_(values)
+        )
+
+    def filters(self, db: Session, account_id: str, filters: List[str]) -> list:
+        """Compile ``name:operator:value`` filters on dynamic template fields.
+
+        In "rows" mode each filter is an EXISTS over booking_field_values,
+        answered by the (field_name, value) expression indexes. In "jsonb"
+        mode exact matches are containment tests on the GIN-indexed
+        document; prefix and range filters are evaluated on the document of
+        the bookings the other conditions select. Number, date and datetime
+        fields are compared by value, any other field type as text.
+        """
+        if not filters:
+            return []
+
+        parsed = [split_filter(expression) for expression in filters]
+        declared = {}
+        for field_name, field_type in db.query(TemplateField.field_name, TemplateField.field_type).join(
+            Template, TemplateField.template_id == Template.id
+        ).filter(
+            Template.account_id == account_id,
+            TemplateField.field_name.in_({name for name, _, _ in parsed})
+        ).distinct():
+            declared.setdefault(field_name, set()).add(field_type)
+
+        conditions = []
+        for name, operator, raw in parsed:
+            if name not in declared:
+                raise _bad_request(f"Unknown template field: {name}")
+
+            typed = {field_type for field_type in declared[name] if field_type in TYPED_FIELD_OPERATORS}
+            if typed and (len(typed) > 1 or len(declared[name]) > 1):
+                raise _bad_request(f"Template field {name} is declared with different types")
+            field_type = typed.pop() if typed else None
+
+            allowed = TYPED_FIELD_OPERATORS[field_type] if field_type else TEXT_FIELD_OPERATORS
+            if operator not in allowed:
+                raise _bad_request(f"Operator {operator} not supported for {name}. Supported: {', '.join(allowed)}")
+
+            if field_type is None:
+                condition = self._text_condition(name, operator, raw)
+            else:
+                value = Booking.field_data[name]["value"].astext if self.uses_jsonb else BookingFieldValue.field_value
+                expression = field_number(value) if field_type == FieldType.NUMBER else field_moment(value)
+                condition = _typed_condition(expression, field_type, name, operator, raw)
+
+            if self.uses_jsonb:
+                conditions.append(condition)
+            else:
+                conditions.append(exists().where(
+                    BookingFieldValue.booking_id == Booking.id,
+                    BookingFieldValue.field_name == name,
+                    condition
+                ))
+
+        return conditions
+
+    def backfill(self, db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+        """Move the field values of bookings without a document into field_data.
+
+        Works through the bookings in id order, one UPDATE and commit per
+        batch, so no batch holds its locks for long. Rows are kept; they
+        are ignored once the document exists. Returns the number of
+        bookings moved.
+        """
+        moved = 0
+        last_id = 0
+        while True:
+            ids = [booking_id for booking_id, in db.query(Booking.id).filter(
+                Booking.id > last_id,
+                Booking.field_data.is_(None)
+            ).order_by(Booking.id).limit(batch_size)]
+            if not ids:
+                return moved
+
+            # One entry per name (booking_field_values is unique on it), built
+            # for the booking being updated
+            document = select(
+                func.jsonb_object_agg(
+                    BookingFieldValue.field_name,
+                    func.jsonb_build_object(
+                        "id", BookingFieldValue.id,
+                        "value", BookingFieldValue.field_value,
+                        "created_at", BookingFieldValue.created_at,
+                    )
+                )
+            ).where(
+                BookingFieldValue.booking_id == Booking.id
+            ).scalar_subquery()
+
+            # Moving storage is not an edit: updated_at keeps its value
+            db.execute(
+                update(Booking).where(Booking.id.in_(ids)).values(
+                    field_data=func.coalesce(document, literal_column("'{}'::jsonb")),
+                    updated_at=Booking.updated_at
+                ),
+                execution_options={"synchronize_session": False}
+            )
+            db.commit()
+            moved += len(ids)
+            last_id = ids[-1]
+
+
+field_value_store = FieldValueStore(settings.BOOKING_FIELD_STORAGE)
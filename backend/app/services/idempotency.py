@@ -0,0 +1,110 @@
+import hashlib
+import json
+from datetime import timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.idempotency import IdempotencyKey
+
+# Header marking a response as the stored result of an earlier request
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(endpoint: str, payload: BaseModel) -> str:
+    """Hash of an endpoint and request body, to spot a key reused for another request."""
+    body = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{endpoint}\n{body}".encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Per-tenant record of create requests sent with an Idempotency-Key.
+
+    A request claims its key by inserting the key row in its own
+    transaction and stores its response in that row before committing.
+    A duplicate arriving meanwhile blocks on the row's unique index until
+    the first request commits, then replays the stored response; if the
+    first request fails, its row is rolled back and the duplicate does
+    the work instead. Keys older than the TTL are reclaimed by new
+    requests and can be purged.
+    """
+
+    def __init__(self, ttl_hours: int):
+        self.ttl = timedelta(hours=ttl_hours)
+
+    def claim(self, db: Session, account_id: str, key: str, fingerprint: str) -> Optional[JSONResponse]:
+        """Claim a key for this request, or return the response stored for it.
+
+        Raises 422 when the key was used for a different request.
+        """
+        expired = IdempotencyKey.created_at < func.now() - self.ttl
+        statement = insert(IdempotencyKey).values(account_id=account_id, key=key, fingerprint=fingerprint)
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.account_id, IdempotencyKey.key],
+            set_={
+                "fingerprint": statement.excluded.fingerprint,
+                "status_code": None,
+                "response": None,
+                "created_at": func.now(),
+            },
+            where=expired
+        ).returning(IdempotencyKey.key)
+
+        if db.execute(statement).first():
+            return None
+
+        record = db.query(IdempotencyKey).filter(
+            IdempotencyKey.account_id == account_id,
+            IdempotencyKey.key == key
+        ).one()
+        if record.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        if record.status_code is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+
+        return JSONResponse(
+            content=record.response,
+            status_code=record.status_code,
+            headers={REPLAYED_HEADER: "true"}
+        )
+
+    def complete(
+        self,
+        db: Session,
+        account_id: str,
+        key: str,
+        result: BaseModel,
+        status_code: int = status.HTTP_201_CREATED
+    ) -> JSONResponse:
+        """Store a claimed key's response, commit it with the request's work and return it."""
+        content = result.model_dump(mode="json")
+        db.query(IdempotencyKey).filter(
+            IdempotencyKey.account_id == account_id,
+            IdempotencyKey.key == key
+        ).update({"status_code": status_code, "response": content}, synchronize_session=False)
+        db.commit()
+
+        return JSONResponse(content=content, status_code=status_code)
+
+    def purge(self, db: Session) -> int:
+        """Delete expired keys and return how many were removed."""
+        deleted = db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.created_at < func.now() - self.ttl)
+        ).rowcount
+        db.commit()
+        return deleted
+
+
+idempotency_keys = IdempotencyStore(settings.IDEMPOTENCY_KEY_TTL_HOURS)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.booking import Booking, BookingStatus
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock held by the worker running a lifecycle pass
+LIFECYCLE_LOCK_KEY = 0x6E696C75
+
+
+class BookingLifecycleService:
+    """Moves confirmed bookings to ongoing and then completed as their dates pass.
+
+    A pass is two set-based UPDATEs across all tenants, each answered from
+    a (status, date) index. Only bookings whose status is behind their
+    dates match, so repeating a pass changes nothing and a pass with nothing
+    to do is two index probes.
+    """
+
+    def advance(self, db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Run one pass and return how many bookings were started and completed."""
+        now = now or datetime.now(timezone.utc)
+
+        # With several workers running the job, one of them does each pass
+        if not db.execute(select(func.pg_try_advisory_xact_lock(LIFECYCLE_LOCK_KEY))).scalar():
+            db.rollback()
+            return {"started": 0, "completed": 0}
+
+        completed = db.execute(
+            update(Booking).where(
+                Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.ONGOING]),
+                Booking.end_date <= now
+            ).values(
+                status=BookingStatus.COMPLETED,
+                updated_at=func.now(),
+                version=Booking.version + 1
+            ),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+
+        started = db.execute(
+            update(Booking).where(
+                Booking.status == BookingStatus.CONFIRMED,
+                Booking.start_date <= now,
+                Booking.end_date > now
+            ).values(
+                status=BookingStatus.ONGOING,
+                updated_at=func.now(),
+                version=Booking.version + 1
+            ),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+
+        db.commit()
+        return {"started": started, "completed": completed}
+
+    def run_once(self) -> Dict[str, int]:
+        """Run one pass in its own session."""
+        db = SessionLocal()
+        try:
+            return self.advance(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def run_forever(self, interval: int) -> None:
+        """Run a pass every ``interval`` seconds, off the event loop."""
+        while True:
+            try:
+                counts = await asyncio.to_thread(self.run_once)
+                if counts["started"] or counts["completed"]:
+                    logger.info(
+                        "Bookings started: %s, completed: %s", counts["started"], counts["completed"]
+                    )
+            except Exception as e:
+                logger.error("Booking lifecycle pass failed: %s", e)
+            await asyncio.sleep(interval)
+
+
+booking_lifecycle = BookingLifecycleService()
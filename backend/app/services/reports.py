@@ -2,7 +2,7 @@ import io
 from datetime import datetime, timedelta
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 from reportlab.lib import colors
@@ -14,6 +14,8 @@ from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 
 from app.models.booking import Booking
 from app.models.payment import Payment
+from app.models.resource import TourRep
+from app.services.booking_rollups import booking_rollups
 
 
 class ReportService:
@@ -96,20 +98,21 @@ class ReportService:
         end_date: Optional[datetime] = None
     ) -> bytes:
         """Generate Excel report for revenue by tour rep"""
-        # Query bookings with aggregation
-        query = db.query(
-            Booking.tour_rep_id,
-            func.count(Booking.id).label('booking_count'),
-            func.sum(Booking.total_amount).label('total_revenue'),
-            func.sum(Booking.paid_amount).label('total_paid')
-        ).filter(Booking.account_id == account_id)
-
-        if start_date:
-            query = query.filter(Booking.start_date >= start_date)
-        if end_date:
-            query = query.filter(Booking.end_date <= end_date)
-
-        results = query.group_by(Booking.tour_rep_id).all()
+        # Totals per tour rep, with whole days of the period read from the daily rollup
+        source = booking_rollups.bookings(account_id, start_date, end_date, ended=True)
+        booking_count = func.sum(source.c.booking_count)
+        totals = select(
+            source.c.tour_rep_id,
+            booking_count.label('booking_count'),
+            func.sum(source.c.total_amount).label('total_revenue'),
+            func.sum(source.c.paid_amount).label('total_paid')
+        ).group_by(source.c.tour_rep_id).having(booking_count > 0).subquery()
+
+        results = db.query(
+            totals, TourRep.full_name.label('tour_rep_name')
+        ).outerjoin(
+            TourRep, TourRep.id == totals.c.tour_rep_id
+        ).order_by(totals.c.tour_rep_id).all()
 
         # Create workbook
         wb = Workbook()
@@ -130,10 +133,7 @@ class ReportService:
 
         # Add data
         for row_idx, result in enumerate(results, start=2):
-            booking = db.query(Booking).filter(Booking.tour_rep_id == result.tour_rep_id).first()
-            tour_rep_name = booking.tour_rep.full_name if booking else "Unknown"
-
-            ws.cell(row=row_idx, column=1, value=tour_rep_name)
+            ws.cell(row=row_idx, column=1, value=result.tour_rep_name or "Unknown")
             ws.cell(row=row_idx, column=2, value=result.booking_count)
             ws.cell(row=row_idx, column=3, value=float(result.total_revenue or 0))
             ws.cell(row=row_idx, column=4, value=float(result.total_paid or 0))
@@ -0,0 +1,46 @@
+from typing import Any, List
+
+from fastapi import HTTPException, status
+
+# Upper bound on ids resolved by one batch request
+MAX_BATCH_IDS = 500
+
+
+def parse_ids(ids: str) -> List[int]:
+    """Parse a comma-separated id list, dropping duplicates but keeping order."""
+    parsed = []
+    seen = set()
+    for part in ids.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            value = int(part)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid id: {part}"
+            )
+        if value not in seen:
+            seen.add(value)
+            parsed.append(value)
+
+    if not parsed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No ids given"
+        )
+
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_IDS} ids can be fetched at once"
+        )
+
+    return parsed
+
+
+def in_id_order(items: List[Any], ids: List[int]) -> List[Any]:
+    """Return items in the order their ids were requested. Missing ids are skipped."""
+    by_id = {item.id: item for item in items}
+    return [by_id[item_id] for item_id in ids if item_id in by_id]
@@ -0,0 +1,139 @@
+import hashlib
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.models.change_delta import ChangeDelta
+
+# Reads are revalidated on every use but may be served from the client cache
+# when the server answers 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def row_version(model):
+    """Last write time of a row. Rows never updated fall back to created_at."""
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag hashed from the values that determine a representation."""
+    def encode(part: Any) -> str:
+        if part is None:
+            return ""
+        if isinstance(part, (datetime, date)):
+            return part.isoformat()
+        return str(part)
+
+    digest = hashlib.sha1("|".join(encode(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def request_etag(request: Request, account_id: str, *versions: Any) -> str:
+    """ETag of a read: the URL with its query string plus the data versions it depends on."""
+    return make_etag(request.url.path, request.url.query, account_id, *versions)
+
+
+def entity_etag(request: Request, account_id: str, version: int, *versions: Any) -> str:
+    """ETag of a versioned entity's read: ``"<version>-<digest>"``.
+
+    The digest is the request_etag of the read, so embedded entities and
+    sparse fieldsets still tell representations apart, while the leading
+    version lets a write echo the tag back in If-Match (see check_version).
+    """
+    digest = request_etag(request, account_id, *versions).strip('"')
+    return f'"{version}-{digest}"'
+
+
+def tenant_watermark(db: Session, account_id: str, *models) -> list:
+    """Number of write statements on each model's table for one tenant.
+
+    Triggers append a delta on every write statement touching the tenant's
+    rows in a table (see ChangeDelta), so the sum changes whenever any row
+    does. It is read from the deltas' covering index, which compaction
+    keeps short.
+    """
+    tables = [model.__tablename__ for model in models]
+    sums = dict(db.query(ChangeDelta.table_name, func.sum(ChangeDelta.changes)).filter(
+        ChangeDelta.account_id == account_id,
+        ChangeDelta.table_name.in_(tables)
+    ).group_by(ChangeDelta.table_name).all())
+    return [int(sums.get(table, 0)) for table in tables]
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Tag the response with its ETag and return a 304 if the client already has it.
+
+    Endpoints return the 304 as is, before loading or serializing anything.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+
+    # If-None-Match uses weak comparison, so a W/ prefix still matches
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    if "*" in candidates or etag in candidates:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+
+    return None
+
+
+def if_match_versions(request: Request) -> Optional[list]:
+    """Versions a write is conditional on, from its If-Match header.
+
+    Accepts the ETags sent by entity reads (``"<version>-<digest>"``) as
+    well as a bare ``"<version>"``. Returns None when the write is
+    unconditional.
+    """
+    header = request.headers.get("if-match")
+    if not header or header.strip() == "*":
+        return None
+
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        try:
+            versions.append(int(tag.split("-", 1)[0]))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="If-Match must hold an ETag read from the resource being changed"
+            )
+    return versions
+
+
+def check_version(request: Request, entity: Any, name: str) -> None:
+    """Reject a write whose If-Match does not name the entity's current version."""
+    expected = if_match_versions(request)
+    if expected is not None and entity.version not in expected:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{name} was changed by someone else (version {entity.version}). Reload and try again."
+        )
+
+
+@contextmanager
+def version_conflicts(db: Session, name: str):
+    """Report an UPDATE that lost a race on the version column as 409.
+
+    The ORM adds ``WHERE version = <version read>`` to every UPDATE of a
+    versioned row and raises StaleDataError when no row matched.
+    """
+    try:
+        yield
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{name} was changed by someone else. Reload and try again."
+        )
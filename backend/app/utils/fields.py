@@ -0,0 +1,85 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Parse a ``?fields=a,b`` parameter into field names of a response schema.
+
+    Returns None when no fieldset was requested. The id is always included.
+    """
+    if not fields:
+        return None
+
+    names = []
+    for name in fields.split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    if "id" not in names:
+        names.insert(0, "id")
+
+    return names
+
+
+def load_only_columns(model, names: Iterable[str], extra: Iterable[str] = ("created_at",)):
+    """Loader option restricting the SELECT to the requested column attributes.
+
+    ``extra`` columns are loaded but not serialized, e.g. pagination keys.
+    """
+    columns = inspect(model).column_attrs.keys()
+    wanted = [name for name in [*names, *extra] if name in columns]
+    return load_only(*[getattr(model, name) for name in wanted])
+
+
+@lru_cache(maxsize=256)
+def _sparse_schema(schema: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """Subset of a response schema holding only the requested fields."""
+    definitions = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in names
+    }
+    return create_model(
+        f"{schema.__name__}Sparse",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+
+def sparse_response(
+    items: Any,
+    schema: Type[BaseModel],
+    names: List[str],
+    response: Optional[Response] = None
+) -> JSONResponse:
+    """Serialize an object or list of objects with only the requested fields.
+
+    Only the requested attributes are read, so nothing outside the loaded
+    columns and relationships is lazy-loaded. Headers already set on the
+    endpoint's ``response`` are carried over.
+    """
+    sparse = _sparse_schema(schema, tuple(names))
+    if isinstance(items, list):
+        content = [sparse.model_validate(item).model_dump(mode="json") for item in items]
+    else:
+        content = sparse.model_validate(items).model_dump(mode="json")
+
+    result = JSONResponse(content=content)
+    if response is not None:
+        for key, value in response.headers.items():
+            if key not in ("content-length", "content-type"):
+                result.headers[key] = value
+    return result
@@ -0,0 +1,166 @@
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Query
+
+from app.utils.pagination import SortKey, recency_keys
+
+# Filter grammar, one ``filter`` query parameter per condition:
+#
+#   filter=field:eq:value          equality
+#   filter=field:in:a,b,c          membership
+#   filter=field:range:lo..hi      inclusive range, either bound may be empty
+#   filter=field:prefix:value      case-insensitive prefix match
+#
+# and a comma-separated ``sort`` parameter such as ``sort=-start_date``
+# where a leading ``-`` sorts descending.
+FILTER_OPERATORS = ("eq", "in", "range", "prefix")
+MAX_IN_VALUES = 100
+
+
+class ListSpec:
+    """Filter and sort keys a list endpoint accepts.
+
+    Only fields backed by an index are whitelisted, so no combination of
+    filters and sort keys forces a sequential scan of a tenant's rows.
+    Prefix fields need an index on ``lower(column) text_pattern_ops``.
+    """
+
+    def __init__(
+        self,
+        model,
+        filters: Dict[str, Tuple[str, ...]],
+        sorts: Sequence[str] = (),
+        default_sort: Optional[Sequence[SortKey]] = None,
+    ):
+        self.model = model
+        self.filters = filters
+        self.sorts = tuple(sorts)
+        self.default_sort = tuple(default_sort) if default_sort else recency_keys(model)
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def parse_value(column, raw: str) -> Any:
+    """Convert a raw query string value to the column's Python type."""
+    python_type = column.type.python_type
+    try:
+        if python_type is bool:
+            if raw.lower() not in ("true", "false"):
+                raise ValueError(raw)
+            return raw.lower() == "true"
+        if python_type is datetime:
+            return datetime.fromisoformat(raw)
+        if python_type is date:
+            return date.fromisoformat(raw)
+        if python_type is Decimal:
+            return Decimal(raw)
+        return python_type(raw)
+    except (ValueError, TypeError, InvalidOperation):
+        raise _bad_request(f"Invalid value for {column.key}: {raw}")
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so a value only matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def filter_condition(column, operator: str, raw: str):
+    """Compile one filter to a SQL condition. Values are always bound parameters."""
+    if operator == "eq":
+        return column == parse_value(column, raw)
+
+    if operator == "in":
+        return column.in_([parse_value(column, value) for value in split_values(raw)])
+
+    if operator == "range":
+        low, high = split_range(raw)
+        conditions = []
+        if low:
+            conditions.append(column >= parse_value(column, low))
+        if high:
+            conditions.append(column <= parse_value(column, high))
+        return and_(*conditions)
+
+    if operator == "prefix":
+        if not raw:
+            raise _bad_request("'prefix' needs a value")
+        return func.lower(column).like(escape_like(raw.lower()) + "%")
+
+    raise _bad_request(f"Unknown filter operator: {operator}")
+
+
+def split_filter(expression: str) -> Tuple[str, str, str]:
+    """Split a ``field:operator:value`` filter. The value may contain colons."""
+    parts = expression.split(":", 2)
+    if len(parts) != 3:
+        raise _bad_request(f"Filters look like field:operator:value, got: {expression}")
+    if parts[1] not in FILTER_OPERATORS:
+        raise _bad_request(f"Unknown filter operator: {parts[1]}")
+    return parts[0], parts[1], parts[2]
+
+
+def split_values(raw: str) -> List[str]:
+    """Split the comma-separated values of an ``in`` filter."""
+    values = [value for value in raw.split(",") if value != ""]
+    if not values or len(values) > MAX_IN_VALUES:
+        raise _bad_request(f"'in' takes between 1 and {MAX_IN_VALUES} values")
+    return values
+
+
+def split_range(raw: str) -> Tuple[str, str]:
+    """Split the ``low..high`` bounds of a range filter. One bound may be empty."""
+    if ".." not in raw:
+        raise _bad_request("'range' values look like low..high")
+    low, high = raw.split("..", 1)
+    if not low and not high:
+        raise _bad_request("'range' needs at least one bound")
+    return low, high
+
+
+def apply_filters(query: Query, spec: ListSpec, filters: List[str]) -> Query:
+    """Apply ``field:operator:value`` filters after checking them against the spec."""
+    for expression in filters:
+        name, operator, raw = split_filter(expression)
+        if name not in spec.filters:
+            allowed = ", ".join(sorted(spec.filters)) or "none"
+            raise _bad_request(f"Cannot filter on {name}. Filterable fields: {allowed}")
+        if operator not in spec.filters[name]:
+            allowed = ", ".join(spec.filters[name])
+            raise _bad_request(f"Operator {operator} not supported for {name}. Supported: {allowed}")
+
+        query = query.filter(filter_condition(getattr(spec.model, name), operator, raw))
+
+    return query
+
+
+def sort_keys(spec: ListSpec, sort: Optional[str]) -> Tuple[SortKey, ...]:
+    """Translate a ``sort`` parameter to pagination sort keys.
+
+    The primary key is appended as a tie-breaker in the direction of the
+    last key, so uniform orderings stay answerable by a single index scan.
+    """
+    if not sort:
+        return spec.default_sort
+
+    keys = []
+    for name in sort.split(","):
+        name = name.strip()
+        descending = name.startswith("-")
+        name = name.lstrip("-+")
+        if name not in spec.sorts:
+            allowed = ", ".join(spec.sorts) or "none"
+            raise _bad_request(f"Cannot sort on {name}. Sortable fields: {allowed}")
+        if any(column.key == name for column, _ in keys):
+            raise _bad_request(f"Duplicate sort key: {name}")
+        keys.append((getattr(spec.model, name), descending))
+
+    if not any(column.key == "id" for column, _ in keys):
+        keys.append((spec.model.id, keys[-1][1]))
+
+    return tuple(keys)
@@ -0,0 +1,130 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query
+
+# Response header carrying the cursor for the next page of a list endpoint
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Largest page a list endpoint returns
+MAX_PAGE_SIZE = 1000
+
+# A sort key is a column plus whether it is sorted descending
+SortKey = Tuple[Any, bool]
+
+
+def recency_keys(model) -> Tuple[SortKey, ...]:
+    """Newest-first ordering with the primary key as a unique tie-breaker."""
+    return ((model.created_at, True), (model.id, True))
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "value"):  # Enum members
+        return value.value
+    return value
+
+
+def _decode_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(keys: Sequence[SortKey], row: Any) -> str:
+    """Build an opaque cursor pointing just after the given row."""
+    payload = {
+        "k": [column.key for column, _ in keys],
+        "v": [_encode_value(getattr(row, column.key)) for column, _ in keys],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(keys: Sequence[SortKey], cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor for the same sort keys."""
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        names, values = payload["k"], payload["v"]
+    except (ValueError, TypeError, KeyError):
+        raise invalid_cursor
+
+    # A cursor is only meaningful for the ordering it was created with
+    if names != [column.key for column, _ in keys] or len(values) != len(keys):
+        raise invalid_cursor
+
+    try:
+        return [_decode_value(column, value) for (column, _), value in zip(keys, values)]
+    except (ValueError, TypeError):
+        raise invalid_cursor
+
+
+def keyset_condition(keys: Sequence[SortKey], values: Sequence[Any]):
+    """Condition selecting the rows that sort strictly after the given values."""
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        # Uniform direction compiles to a row comparison that a composite
+        # index on the same columns can answer with a single range scan.
+        columns = tuple_(*[column for column, _ in keys])
+        bound = tuple_(*values)
+        return columns < bound if directions.pop() else columns > bound
+
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[j][0] == values[j] for j in range(i)]
+        after = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+def paginate(
+    query: Query,
+    keys: Sequence[SortKey],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[list, Optional[str]]:
+    """Order a query by the sort keys and return one page plus the next cursor.
+
+    With a cursor the page starts right after the row it points to, which
+    keeps deep pages as cheap as the first one. Without a cursor the legacy
+    ``skip`` offset is applied.
+    """
+    query = query.order_by(*[
+        column.desc() if descending else column.asc()
+        for column, descending in keys
+    ])
+
+    if cursor:
+        query = query.filter(keyset_condition(keys, decode_cursor(keys, cursor)))
+    elif skip:
+        query = query.offset(skip)
+
+    # Fetch one extra row to find out whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(keys, rows[-1])
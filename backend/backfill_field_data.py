@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Field value backfill script.
+Moves booking field values still stored as rows into the JSONB field_data
+document. The field_data migration converts the bookings that existed then;
+run this after switching BOOKING_FIELD_STORAGE to "jsonb" to convert the
+bookings created or written in "rows" mode since.
+"""
+from app.core.database import SessionLocal
+from app.services.field_values import field_value_store
+
+
+def backfill_field_data():
+    """Convert every booking without a field_data document, in batches."""
+    db = SessionLocal()
+
+    try:
+        print("Backfilling booking field values...")
+        moved = field_value_store.backfill(db)
+        print(f"Moved field values of {moved} bookings")
+    except Exception as e:
+        print(f"Error backfilling field values: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_field_data()
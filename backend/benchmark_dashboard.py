@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Dashboard statistics benchmark.
+Seeds a tenant with bookings spread over the last four years, then reports
+how many queries GET /dashboard/stats sends and how long it takes for a few
+typical filters. Run it against a scratch database: the tenant is seeded
+once and reused by later runs.
+
+    python benchmark_dashboard.py [bookings] [runs]
+"""
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, text
+
+from app.api.v1.endpoints.dashboard import get_dashboard_stats
+from app.core.database import SessionLocal, engine
+from app.models.user import User
+
+ACCOUNT_ID = "dashboard-benchmark"
+
+SEED_RESOURCES = """
+    INSERT INTO users (username, email, hashed_password, full_name, role, account_id, is_active, can_view_analytics)
+    VALUES (:account_id, :account_id || '@example.com', 'x', 'Benchmark', 'ADMIN', :account_id, true, true);
+    INSERT INTO templates (name, account_id) VALUES ('Benchmark', :account_id);
+    INSERT INTO customers (full_name, email, account_id)
+    SELECT 'Customer ' || g, 'customer' || g || '@example.com', :account_id FROM generate_series(1, 5000) g;
+    INSERT INTO tour_reps (full_name, phone, account_id)
+    SELECT 'Tour rep ' || g, '1', :account_id FROM generate_series(1, 50) g;
+    INSERT INTO cars (registration_number, make, model, account_id, is_available)
+    SELECT 'BENCH-' || g, 'Toyota', 'Prius', :account_id, g % 4 <> 0 FROM generate_series(1, 100) g;
+    INSERT INTO drivers (full_name, phone, license_number, account_id, is_available)
+    SELECT 'Driver ' || g, '1', 'BENCH-' || g, :account_id, g % 3 <> 0 FROM generate_series(1, 120) g;
+"""
+
+# Bookings follow each other evenly and last four minutes, so a car or
+# driver comes round again long after its previous booking ended
+SEED_BOOKINGS = """
+    WITH ids AS (
+        SELECT
+            (SELECT min(id) FROM users WHERE account_id = :account_id) AS user_id,
+            (SELECT min(id) FROM templates WHERE account_id = :account_id) AS template_id,
+            (SELECT array_agg(id ORDER BY id) FROM customers WHERE account_id = :account_id) AS customers,
+            (SELECT array_agg(id ORDER BY id) FROM tour_reps WHERE account_id = :account_id) AS tour_reps,
+            (SELECT array_agg(id ORDER BY id) FROM cars WHERE account_id = :account_id) AS cars,
+            (SELECT array_agg(id ORDER BY id) FROM drivers WHERE account_id = :account_id) AS drivers
+    )
+    INSERT INTO bookings (
+        booking_number, account_id, template_id, customer_id, tour_rep_id, car_id, driver_id,
+        start_date, end_date, status, total_amount, paid_amount, currency, created_by, created_at
+    )
+    SELECT
+        'BENCH' || lpad(g::text, 9, '0'), :account_id, template_id,
+        customers[1 + g % 5000], tour_reps[1 + g % 50],
+        CASE WHEN g % 7 = 0 THEN NULL ELSE cars[1 + g % 100] END,
+        CASE WHEN g % 5 = 0 THEN NULL ELSE drivers[1 + g % 120] END,
+        starts, starts + interval '4 minutes',
+        (ARRAY['PENDING', 'CONFIRMED', 'ONGOING', 'COMPLETED', 'CANCELLED'])[1 + g % 5]::bookingstatus,
+        100 + g % 900, (g % 3) * 50, 'LKR', user_id, starts - interval '10 days'
+    FROM ids, generate_series(1, :bookings) g,
+        LATERAL (SELECT now() - (:bookings - g) * (interval '1461 days' / :bookings) AS starts) s
+"""
+
+
+def seed(bookings):
+    """Create the benchmark tenant unless an earlier run did."""
+    with engine.begin() as connection:
+        seeded = connection.execute(
+            text("SELECT count(*) FROM bookings WHERE account_id = :account_id"), {"account_id": ACCOUNT_ID}
+        ).scalar()
+        if seeded:
+            print(f"Using the {seeded} bookings seeded before")
+            return
+
+        started = time.perf_counter()
+        for statement in SEED_RESOURCES.split(";"):
+            if statement.strip():
+                connection.execute(text(statement), {"account_id": ACCOUNT_ID})
+        connection.execute(text(SEED_BOOKINGS), {"account_id": ACCOUNT_ID, "bookings": bookings})
+        print(f"Seeded {bookings} bookings in {time.perf_counter() - started:.0f} s")
+
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM ANALYZE"))
+
+
+def benchmark_dashboard(bookings=100000, runs=5):
+    """Print the query count and median time of the dashboard statistics."""
+    seed(bookings)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == ACCOUNT_ID).one()
+        tour_rep_id = db.execute(
+            text("SELECT min(id) FROM tour_reps WHERE account_id = :account_id"), {"account_id": ACCOUNT_ID}
+        ).scalar()
+
+        now = datetime.now(timezone.utc)
+        cases = {
+            "last 30 days": {},
+            "whole history": {"start_date": now - timedelta(days=5 * 365), "end_date": now},
+            "one year, tour rep": {"start_date": now - timedelta(days=365), "end_date": now, "tour_rep_id": tour_rep_id},
+        }
+
+        for name, filters in cases.items():
+            timings = []
+            for _ in range(runs):
+                statements.clear()
+                started = time.perf_counter()
+                stats = get_dashboard_stats(
+                    start_date=filters.get("start_date"),
+                    end_date=filters.get("end_date"),
+                    driver_id=None,
+                    tour_rep_id=filters.get("tour_rep_id"),
+                    car_id=None,
+                    db=db,
+                    current_user=user
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+
+            print(
+                f"{name:20} {stats['bookings']['total']:>9} bookings  "
+                f"median {statistics.median(timings):8.1f} ms  {len(statements)} queries"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    benchmark_dashboard(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    )
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Change delta compaction script.
+Folds the change deltas behind list ETags into one row per tenant and table.
+Run it from cron every few minutes; list reads sum the deltas written since.
+"""
+from app.core.database import SessionLocal
+from app.services.change_deltas import change_deltas
+
+
+def compact_change_deltas():
+    """Compact the change deltas."""
+    db = SessionLocal()
+
+    try:
+        folded = change_deltas.compact(db)
+        print(f"Compacted change deltas into {folded} rows")
+    except Exception as e:
+        print(f"Error compacting change deltas: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    compact_change_deltas()
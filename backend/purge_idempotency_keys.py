@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Idempotency key purge script.
+Deletes Idempotency-Key records older than IDEMPOTENCY_KEY_TTL_HOURS.
+Run it daily from cron.
+"""
+from app.core.database import SessionLocal
+from app.services.idempotency import idempotency_keys
+
+
+def purge_idempotency_keys():
+    """Delete expired idempotency keys."""
+    db = SessionLocal()
+
+    try:
+        deleted = idempotency_keys.purge(db)
+        print(f"Deleted {deleted} expired idempotency keys")
+    except Exception as e:
+        print(f"Error purging idempotency keys: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    purge_idempotency_keys()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Booking rollup rebuild script.
+Recomputes booking_daily_rollups from the bookings table, for every tenant
+or the one given as an argument. Run it after loading bookings with the
+rollup triggers disabled, or to clear out emptied buckets.
+"""
+import sys
+
+from app.core.database import SessionLocal
+from app.services.booking_rollups import booking_rollups
+
+
+def rebuild_booking_rollups(account_id=None):
+    """Rebuild the daily booking rollup."""
+    db = SessionLocal()
+
+    try:
+        written = booking_rollups.rebuild(db, account_id)
+        print(f"Wrote {written} booking rollup buckets")
+    except Exception as e:
+        print(f"Error rebuilding booking rollups: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_booking_rollups(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,40 @@
+"""
+Rows of an import only lose their car or driver to bookings that exist or
+to earlier rows that were accepted.
+"""
+HEADER = "customer_email,tour_rep,car,start_date,end_date,pickup_location\n"
+
+
+def import_csv(client, headers, template_id, lines):
+    return client.post(
+        "/api/v1/bookings/import",
+        params={"template_id": template_id},
+        files={"file": ("bookings.csv", HEADER + "".join(line + "\n" for line in lines), "text/csv")},
+        headers=headers,
+    )
+
+
+def test_failed_rows_do_not_block_later_rows(client, db, seed, auth_headers, make_bookings):
+    # Books CAR-0 on 2030-01-01 from 00:00 to 08:00
+    make_bookings(1)
+
+    response = import_csv(client, auth_headers, seed["template"], [
+        # Row 2 clashes with the existing booking
+        "c0@example.com,Rep 0,CAR-0,2030-01-01T06:00:00+00:00,2030-01-01T10:00:00+00:00,Airport",
+        # Row 3 only clashes with row 2
+        "c1@example.com,Rep 0,CAR-0,2030-01-01T09:00:00+00:00,2030-01-01T12:00:00+00:00,Airport",
+        # Row 4 is missing its pickup location
+        "c2@example.com,Rep 0,CAR-1,2030-02-01T09:00:00+00:00,2030-02-01T12:00:00+00:00,",
+        # Row 5 only clashes with row 4
+        "c3@example.com,Rep 0,CAR-1,2030-02-01T10:00:00+00:00,2030-02-01T11:00:00+00:00,Hotel",
+        # Row 6 clashes with row 3
+        "c4@example.com,Rep 0,CAR-0,2030-01-01T11:00:00+00:00,2030-01-01T13:00:00+00:00,Airport",
+    ])
+    assert response.status_code == 200
+
+    report = response.json()
+    assert report["imported"] == 2
+    errors = {error["row"]: error["errors"] for error in report["errors"]}
+    assert sorted(errors) == [2, 4, 6]
+    assert errors[2] == ["Car or driver is already booked by BKTEST00000"]
+    assert errors[6] == ["Car or driver is also booked by row 3"]
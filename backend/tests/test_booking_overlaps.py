@@ -0,0 +1,61 @@
+"""
+Concurrent writers cannot double-book a car or driver.
+
+The exclusion constraints decide between racing transactions, and
+overlap_conflicts reports the losers as 409.
+"""
+import threading
+
+import pytest
+from sqlalchemy import text
+
+WRITERS = 8
+
+OVERLAPPING_ACTIVE_PAIRS = """
+    SELECT count(*) FROM bookings a JOIN bookings b
+      ON a.id < b.id
+     AND (a.{column} = b.{column})
+     AND tstzrange(a.start_date, a.end_date, '[)') && tstzrange(b.start_date, b.end_date, '[)')
+   WHERE a.status <> 'CANCELLED' AND b.status <> 'CANCELLED'
+"""
+
+
+@pytest.mark.parametrize("resources", ["car", "driver", "both"])
+def test_concurrent_overlapping_bookings(client, db, seed, auth_headers, resources):
+    barrier = threading.Barrier(WRITERS)
+    statuses = []
+    details = []
+
+    def book(i: int):
+        payload = {
+            "template_id": seed["template"],
+            "customer_id": seed["customers"][i % 5],
+            "tour_rep_id": seed["tour_reps"][i % 3],
+            # Each period overlaps all the others
+            "start_date": f"2031-03-01T{8 + i % 3:02d}:00:00Z",
+            "end_date": f"2031-03-01T{14 + i % 3:02d}:00:00Z",
+            "field_values": [{"field_name": "pickup_location", "field_value": "Airport"}],
+        }
+        if resources in ("car", "both"):
+            payload["car_id"] = seed["cars"][0]
+        if resources in ("driver", "both"):
+            payload["driver_id"] = seed["drivers"][0]
+
+        barrier.wait()
+        response = client.post("/api/v1/bookings/", json=payload, headers=auth_headers)
+        statuses.append(response.status_code)
+        if response.status_code == 409:
+            details.append(response.json()["detail"])
+
+    threads = [threading.Thread(target=book, args=(i,)) for i in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201] + [409] * (WRITERS - 1)
+    assert all("already booked" in detail for detail in details)
+
+    for column in ("car_id", "driver_id"):
+        assert db.execute(text(OVERLAPPING_ACTIVE_PAIRS.format(column=column))).scalar() == 0
+    assert db.execute(text("SELECT count(*) FROM bookings")).scalar() == 1
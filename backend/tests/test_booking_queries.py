@@ -0,0 +1,49 @@
+"""
+Query counts of the booking endpoints.
+
+Relationships are eager-loaded, so a page of bookings costs the same fixed
+number of statements however many rows it holds. A lazy load slipping back
+in shows up here as a count that grows with the page.
+"""
+import pytest
+
+# Authentication, the list watermark, the page and its selectin loads
+MAX_LIST_QUERIES = 6
+# Authentication, the booking's versions, the booking and its selectin loads
+MAX_GET_QUERIES = 6
+
+
+@pytest.mark.parametrize("rows", [10, 100])
+def test_list_bookings_query_count_is_fixed(client, auth_headers, make_bookings, count_queries, rows):
+    make_bookings(rows)
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/bookings/", params={"limit": rows}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == rows
+    assert len(statements) <= MAX_LIST_QUERIES, "\n\n".join(statements)
+
+
+def test_list_bookings_query_count_does_not_grow_with_page(client, auth_headers, make_bookings, count_queries):
+    make_bookings(100)
+    counts = []
+    for rows in (10, 100):
+        with count_queries() as statements:
+            response = client.get("/api/v1/bookings/", params={"limit": rows}, headers=auth_headers)
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.parametrize("rows", [10, 100])
+def test_get_booking_query_count_is_fixed(client, auth_headers, make_bookings, count_queries, rows):
+    booking_ids = make_bookings(rows)
+
+    with count_queries() as statements:
+        response = client.get(f"/api/v1/bookings/{booking_ids[-1]}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["field_values"]) == 2
+    assert len(statements) <= MAX_GET_QUERIES, "\n\n".join(statements)
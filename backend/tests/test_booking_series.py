@@ -0,0 +1,35 @@
+"""
+Recurring booking series with the UTC UNTIL values the API documents.
+"""
+import pytest
+
+
+def series_payload(seed, start_date, end_date, rrule):
+    return {
+        "template_id": seed["template"],
+        "customer_id": seed["customers"][0],
+        "tour_rep_id": seed["tour_reps"][0],
+        "start_date": start_date,
+        "end_date": end_date,
+        "rrule": rrule,
+        "field_values": [{"field_name": "pickup_location", "field_value": "Airport"}],
+    }
+
+
+@pytest.mark.parametrize("start_date, end_date", [
+    ("2026-03-02T09:00:00", "2026-03-02T11:00:00"),
+    ("2026-03-02T09:00:00Z", "2026-03-02T11:00:00Z"),
+    ("2026-03-02T14:30:00+05:30", "2026-03-02T16:30:00+05:30"),
+])
+def test_series_until_in_utc(client, db, seed, auth_headers, start_date, end_date):
+    response = client.post(
+        "/api/v1/bookings/series",
+        json=series_payload(seed, start_date, end_date, "FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20260331T000000Z"),
+        headers=auth_headers
+    )
+
+    assert response.status_code == 201, response.text
+    series = response.json()
+    # Mondays and Thursdays from 2 to 30 March 2026
+    assert series["count"] == 9
+    assert min(booking["start_date"] for booking in series["bookings"]) == "2026-03-02T09:00:00Z"
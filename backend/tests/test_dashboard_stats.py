@@ -0,0 +1,62 @@
+"""
+Query count of the dashboard statistics.
+
+The totals, top performers and resource counts come from one grouped query
+and the recent bookings from another, whatever the number of bookings.
+benchmark_dashboard.py times the same endpoint on a seeded tenant.
+"""
+import pytest
+from sqlalchemy import event
+
+# Authentication, the grouped statistics and the recent bookings
+DASHBOARD_QUERIES = 3
+
+PERIOD = {"start_date": "2030-01-01T00:00:00Z", "end_date": "2031-01-01T00:00:00Z"}
+
+
+@pytest.mark.parametrize("rows", [10, 100])
+def test_dashboard_stats_query_count_is_fixed(client, auth_headers, make_bookings, count_queries, rows):
+    make_bookings(rows)
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/dashboard/stats", params=PERIOD, headers=auth_headers)
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["bookings"]["total"] == rows
+    assert stats["bookings"]["by_status"]["pending"] == rows
+    assert stats["revenue"]["total"] == sum(100 + i for i in range(rows))
+    assert sum(car["booking_count"] for car in stats["top_performers"]["cars"]) == rows
+    assert stats["resources"]["cars"] == {"total": 4, "available": 4}
+    assert len(stats["recent_bookings"]) == 10
+    assert len(statements) == DASHBOARD_QUERIES, "\n\n".join(statements)
+
+
+@pytest.fixture
+def colombo_sessions(engine):
+    """Database sessions whose time zone is not UTC."""
+    def set_time_zone(connection, record):
+        with connection.cursor() as cursor:
+            cursor.execute("SET TIME ZONE 'Asia/Colombo'")
+
+    engine.dispose()
+    event.listen(engine, "connect", set_time_zone)
+    yield
+    event.remove(engine, "connect", set_time_zone)
+    engine.dispose()
+
+
+def test_dashboard_stats_take_naive_dates_as_utc(client, auth_headers, make_bookings, colombo_sessions):
+    # Bookings start at midnight UTC on 2030-01-01 and 2030-01-02
+    second = make_bookings(2)[1]
+
+    response = client.get(
+        "/api/v1/dashboard/stats",
+        params={"start_date": "2030-01-01T03:00:00", "end_date": "2030-01-02T03:00:00"},
+        headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["bookings"]["total"] == 1
+    assert [booking["id"] for booking in stats["recent_bookings"]] == [second]
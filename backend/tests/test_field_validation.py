@@ -0,0 +1,46 @@
+"""
+Field values are checked against their template's compiled validator.
+"""
+import pytest
+from fastapi import HTTPException
+
+from conftest import ACCOUNT_ID
+
+
+def test_cached_validator_is_used_without_a_query(db, seed, count_queries):
+    from app.services.field_validation import field_validators
+
+    validator = field_validators.get(db, seed["template"], ACCOUNT_ID)
+    with count_queries() as statements:
+        assert field_validators.get(db, seed["template"], ACCOUNT_ID) is validator
+    assert statements == []
+
+    # Another tenant's request for the template still looks it up, and fails
+    with pytest.raises(HTTPException) as raised:
+        field_validators.get(db, seed["template"], "other")
+    assert raised.value.status_code == 400
+
+    field_validators.invalidate(seed["template"])
+    assert field_validators.get(db, seed["template"], ACCOUNT_ID) is not validator
+
+
+def test_changing_template_checks_kept_values(client, db, auth_headers, make_bookings):
+    from app.models.template import FieldType, Template, TemplateField
+
+    template = Template(name="Airport Transfer", account_id=ACCOUNT_ID, fields=[
+        TemplateField(field_name="flight", field_label="Flight", field_type=FieldType.TEXT, is_required=True),
+    ])
+    db.add(template)
+    db.commit()
+    path = f"/api/v1/bookings/{make_bookings(1)[0]}"
+
+    response = client.put(path, json={"template_id": template.id}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "Flight is required" in response.json()["detail"]
+
+    response = client.put(path, json={
+        "template_id": template.id,
+        "field_values": [{"field_name": "flight", "field_value": "UL 504"}],
+    }, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["template_id"] == template.id
@@ -0,0 +1,56 @@
+"""
+Moving booking field values between rows and the field_data document.
+"""
+from sqlalchemy import text
+
+
+def test_backfill_builds_each_bookings_own_document(db, make_bookings):
+    from app.models.booking import Booking
+    from app.services.field_values import field_value_store
+
+    booking_ids = make_bookings(3)
+    db.execute(text("DELETE FROM booking_field_values WHERE booking_id = :id"), {"id": booking_ids[2]})
+    db.commit()
+
+    assert field_value_store.backfill(db, batch_size=2) == 3
+
+    bookings = db.query(Booking).filter(Booking.id.in_(booking_ids)).order_by(Booking.id).all()
+    assert [
+        {name: entry["value"] for name, entry in booking.field_data.items()} for booking in bookings
+    ] == [
+        {"pickup_location": "Airport", "passengers": "1"},
+        {"pickup_location": "Airport", "passengers": "2"},
+        {},
+    ]
+    assert [booking.updated_at for booking in bookings] == [None, None, None]
+    assert field_value_store.backfill(db) == 0
+
+
+def test_rows_mode_write_after_backfill_patches_the_rows(client, db, auth_headers, make_bookings):
+    from app.models.booking import Booking, BookingFieldValue
+    from app.services.field_values import field_value_store
+
+    booking_id = make_bookings(1)[0]
+    field_value_store.backfill(db)
+    row_ids = dict(db.query(BookingFieldValue.field_name, BookingFieldValue.id).filter(
+        BookingFieldValue.booking_id == booking_id
+    ))
+
+    response = client.put(f"/api/v1/bookings/{booking_id}", json={"field_values": [
+        {"field_name": "pickup_location", "field_value": "Hotel"},
+        {"field_name": "passengers", "field_value": "1"},
+    ]}, headers=auth_headers)
+    assert response.status_code == 200
+
+    db.expire_all()
+    assert db.get(Booking, booking_id).field_data is None
+    rows = {
+        field_name: (row_id, field_value)
+        for row_id, field_name, field_value in db.query(
+            BookingFieldValue.id, BookingFieldValue.field_name, BookingFieldValue.field_value
+        ).filter(BookingFieldValue.booking_id == booking_id)
+    }
+    assert rows == {
+        "pickup_location": (row_ids["pickup_location"], "Hotel"),
+        "passengers": (row_ids["passengers"], "1"),
+    }
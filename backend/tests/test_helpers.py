@@ -0,0 +1,78 @@
+"""
+Helpers that need no database: these run even where Postgres is missing.
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+
+def request_with(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_cursor_round_trip():
+    from app.models.booking import Booking
+    from app.utils.pagination import decode_cursor, encode_cursor, recency_keys
+
+    keys = recency_keys(Booking)
+    row = SimpleNamespace(created_at=datetime(2030, 1, 1, 8, 30, tzinfo=timezone.utc), id=42)
+
+    assert decode_cursor(keys, encode_cursor(keys, row)) == [row.created_at, 42]
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(keys, "not-a-cursor")
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("header, versions", [
+    (None, None),
+    ("*", None),
+    ('"3"', [3]),
+    ('"3-0a1b2c"', [3]),
+    ('W/"3-0a1b2c", "4-d3e4f5"', [3, 4]),
+])
+def test_if_match_versions(header, versions):
+    from app.utils.etag import if_match_versions
+
+    request = request_with(if_match=header) if header else request_with()
+    assert if_match_versions(request) == versions
+
+
+def test_if_match_rejects_other_tags():
+    from app.utils.etag import if_match_versions
+
+    with pytest.raises(HTTPException) as raised:
+        if_match_versions(request_with(if_match='"0a1b2c"'))
+    assert raised.value.status_code == 400
+
+
+def test_series_takes_naive_dates_as_utc():
+    from app.api.v1.endpoints.bookings import expand_series
+
+    occurrences = expand_series(
+        datetime(2026, 3, 2, 9), datetime(2026, 3, 2, 17), "FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20260331T000000Z"
+    )
+
+    assert len(occurrences) == 9
+    assert occurrences[0] == (datetime(2026, 3, 2, 9, tzinfo=timezone.utc), datetime(2026, 3, 2, 17, tzinfo=timezone.utc))
+    assert all(end - start == timedelta(hours=8) for start, end in occurrences)
+
+
+def test_booking_numbers_sort_in_sequence_order():
+    from datetime import date
+
+    from app.services.booking_numbers import SEQUENCE_DIGITS, format_booking_number
+
+    day = date(2025, 11, 11)
+    numbers = [format_booking_number(day, value) for value in (9, 99_999, 100_000, 10 ** SEQUENCE_DIGITS - 1)]
+
+    assert numbers[0] == "BK2025111100000009"
+    assert numbers == sorted(numbers)
+    assert len(set(map(len, numbers))) == 1
+    with pytest.raises(ValueError):
+        format_booking_number(day, 10 ** SEQUENCE_DIGITS)
@@ -0,0 +1,33 @@
+"""
+Writes accept the ETag their entity's read returned as If-Match.
+"""
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/api/v1/bookings/{booking}", "/api/v1/resources/cars/{car}"])
+def test_etag_read_is_accepted_as_if_match(client, db, seed, auth_headers, make_bookings, path):
+    path = path.format(booking=make_bookings(1)[0], car=seed["cars"][0])
+    body = {"notes": "changed"} if "bookings" in path else {"color": "Red"}
+
+    etag = client.get(path, headers=auth_headers).headers["ETag"]
+    response = client.put(path, json=body, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
+
+    # The read ETag now names a version that has been replaced
+    response = client.put(path, json=body, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 409
+
+    etag = client.get(path, headers=auth_headers).headers["ETag"]
+    response = client.put(path, json=body, headers={**auth_headers, "If-Match": f"W/{etag}"})
+    assert response.status_code == 200
+
+
+def test_if_match_takes_a_bare_version_or_rejects_garbage(client, db, auth_headers, make_bookings):
+    path = f"/api/v1/bookings/{make_bookings(1)[0]}"
+    version = client.get(path, headers=auth_headers).json()["version"]
+
+    response = client.put(path, json={"notes": "a"}, headers={**auth_headers, "If-Match": f'"{version}"'})
+    assert response.status_code == 200
+
+    response = client.put(path, json={"notes": "b"}, headers={**auth_headers, "If-Match": '"not-a-tag"'})
+    assert response.status_code == 400
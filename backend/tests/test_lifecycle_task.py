@@ -0,0 +1,19 @@
+"""
+The in-process lifecycle job is kept alive for the app's lifetime and
+stopped on shutdown.
+"""
+from fastapi.testclient import TestClient
+
+
+def test_lifecycle_task_is_kept_and_cancelled_on_shutdown(engine, monkeypatch):
+    from app.core.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "BOOKING_LIFECYCLE_INTERVAL", 3600)
+
+    with TestClient(app):
+        task = app.state.booking_lifecycle_task
+        assert task is not None
+        assert not task.done()
+
+    assert task.cancelled()
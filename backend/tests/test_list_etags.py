@@ -0,0 +1,70 @@
+"""
+List ETags follow the per-tenant change deltas appended by triggers.
+"""
+from sqlalchemy import text
+
+
+def list_etag(client, headers, path="/api/v1/bookings/"):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_list_etag_changes_with_every_write(client, db, auth_headers, make_bookings):
+    booking_ids = make_bookings(3)
+    etag = list_etag(client, auth_headers)
+
+    response = client.get("/api/v1/bookings/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    seen = {etag}
+    for method, path, body in (
+        ("put", f"/api/v1/bookings/{booking_ids[0]}", {"notes": "changed"}),
+        ("delete", f"/api/v1/bookings/{booking_ids[1]}", None),
+    ):
+        response = client.request(method, path, json=body, headers=auth_headers)
+        assert response.status_code in (200, 204)
+        etag = list_etag(client, auth_headers)
+        assert etag not in seen
+        seen.add(etag)
+
+    make_bookings(1)
+    assert list_etag(client, auth_headers) not in seen
+
+
+def test_list_etag_ignores_other_tenants(client, db, auth_headers, make_bookings):
+    from app.models.resource import Car
+
+    make_bookings(2)
+    etag = list_etag(client, auth_headers)
+
+    db.add(Car(registration_number="OTHER-1", make="Kia", model="Rio", seating_capacity=4, account_id="other"))
+    db.commit()
+
+    assert list_etag(client, auth_headers) == etag
+    assert list_etag(client, auth_headers, "/api/v1/resources/cars") != list_etag(client, auth_headers)
+
+
+def test_list_etag_survives_compaction(client, db, auth_headers, make_bookings):
+    from app.services.change_deltas import change_deltas
+
+    booking_ids = make_bookings(2)
+    for booking_id in booking_ids:
+        client.put(f"/api/v1/bookings/{booking_id}", json={"notes": "changed"}, headers=auth_headers)
+    etag = list_etag(client, auth_headers)
+
+    assert change_deltas.compact(db) > 0
+    assert db.execute(text("SELECT count(*) FROM change_deltas WHERE table_name = 'bookings'")).scalar() == 1
+    assert list_etag(client, auth_headers) == etag
+
+
+def test_tenant_writers_do_not_wait_for_each_other(engine, db, make_bookings):
+    first, second = make_bookings(2)
+
+    with engine.connect() as holding, engine.connect() as writer:
+        holding.execute(text("UPDATE bookings SET notes = 'a' WHERE id = :id"), {"id": first})
+        # Fails with a lock timeout if the writer queues behind the open transaction
+        writer.execute(text("SET lock_timeout = '2s'"))
+        writer.execute(text("UPDATE bookings SET notes = 'b' WHERE id = :id"), {"id": second})
+        writer.commit()
+        holding.rollback()
@@ -0,0 +1,33 @@
+"""
+Cursor pagination of the list endpoints.
+"""
+import pytest
+
+from app.utils.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+
+
+def test_cursor_pages_cover_every_row_once(client, auth_headers, make_bookings):
+    booking_ids = make_bookings(5)
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/api/v1/bookings/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        seen += [booking["id"] for booking in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+    assert sorted(seen) == booking_ids
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/bookings/", "/api/v1/customers/", "/api/v1/payments/", "/api/v1/notifications",
+    "/api/v1/resources/cars", "/api/v1/templates/",
+])
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": -1}, {"limit": MAX_PAGE_SIZE + 1}, {"skip": -1}])
+def test_out_of_range_pages_are_rejected(client, auth_headers, path, params):
+    response = client.get(path, params=params, headers=auth_headers)
+    assert response.status_code == 422